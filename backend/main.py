@@ -5,6 +5,7 @@ Simple backend that works with existing RAG system
 
 import os
 import time
+import asyncio
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -44,6 +45,19 @@ except ImportError as e:
                 "sources": []
             }
 
+try:
+    from shard_coordinator import ShardCoordinator, parse_nodes
+    from document_chunks import result_to_dict
+except ImportError as e:
+    print(f"⚠️ Shard coordinator unavailable: {e}")
+    ShardCoordinator = None
+
+try:
+    from integrated_analyzer import IntegratedAnalyzer
+except ImportError as e:
+    print(f"⚠️ PDF analyzer unavailable, uploads are only stored: {e}")
+    IntegratedAnalyzer = None
+
 app = FastAPI(title="Turkish Financial PDF RAG API", version="1.0.0")
 
 # CORS configuration
@@ -57,12 +71,19 @@ app.add_middleware(
 
 # Global instances
 rag_system: Optional[GroqOptimizedSimpleRAG] = None
+shard_coordinator = None  # ShardCoordinator over remote shard servers, if SHARD_NODES is set
 
 # Request models
 class QueryRequest(BaseModel):
     question: str
     language: str = "tr"
 
+class SearchRequest(BaseModel):
+    question: str
+    k: int = 5
+    filters: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = None  # seconds; slower shards are left out of the results
+
 # Performance monitoring
 performance_stats = {
     "total_queries": 0,
@@ -88,6 +109,23 @@ def initialize_rag_system():
         print(f"❌ Error initializing RAG system: {e}")
         return False
 
+def initialize_shard_coordinator():
+    """Connect to shard servers listed in SHARD_NODES (name=url,name=url,...)"""
+    global shard_coordinator
+    
+    nodes = os.getenv("SHARD_NODES")
+    if not nodes or ShardCoordinator is None:
+        return False
+    
+    try:
+        shard_coordinator = ShardCoordinator(parse_nodes(nodes), timeout=float(os.getenv("SHARD_TIMEOUT", "2.0")))
+        print(f"✅ Shard coordinator initialized: {len(shard_coordinator.nodes)} nodes")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error initializing shard coordinator: {e}")
+        return False
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize systems on startup"""
@@ -95,6 +133,7 @@ async def startup_event():
     success = initialize_rag_system()
     if not success:
         print("⚠️ Warning: RAG system failed to initialize")
+    initialize_shard_coordinator()
 
 @app.get("/api/health")
 async def health_check():
@@ -102,6 +141,7 @@ async def health_check():
     return {
         "status": "healthy",
         "rag_system": "operational" if rag_system else "not initialized",
+        "shard_coordinator": "operational" if shard_coordinator else "not configured",
         "version": "1.0.0"
     }
 
@@ -160,9 +200,49 @@ async def query_documents(request: QueryRequest):
         query_time = time.time() - start_time
         raise HTTPException(status_code=500, detail=f"Query processing error: {str(e)}")
 
+@app.post("/api/search")
+def search_shards(request: SearchRequest):
+    """Scatter-gather retrieval over all shard servers (partial if some shards are slow or down)"""
+    if not shard_coordinator:
+        raise HTTPException(status_code=503, detail="Shard coordinator not configured (set SHARD_NODES)")
+    
+    start_time = time.time()
+    
+    try:
+        gathered = shard_coordinator.scatter([request.question], k=request.k, filters=request.filters,
+                                             timeout=request.timeout)
+        return {
+            "results": [result_to_dict(result) for result in gathered.results[0]],
+            "partial": gathered.partial,
+            "responded_shards": gathered.responded,
+            "missing_shards": gathered.failed,
+            "response_time": time.time() - start_time
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Shard search error: {str(e)}")
+
+@app.get("/api/shards")
+def get_shards():
+    """Health of every shard server"""
+    if not shard_coordinator:
+        raise HTTPException(status_code=503, detail="Shard coordinator not configured (set SHARD_NODES)")
+    return {
+        "nodes": shard_coordinator.health(),
+        "stats": shard_coordinator.get_statistics()
+    }
+
+def analyze_upload(upload_path: str, filename: str) -> Dict[str, Any]:
+    """Complete analysis of an uploaded PDF (also saved to analysis_output), sourced by its filename"""
+    analysis = IntegratedAnalyzer(output_dir="analysis_output").analyze_pdf_complete(upload_path)
+    if analysis.get('error'):
+        raise RuntimeError(analysis.get('error_message', 'PDF analysis failed'))
+    analysis['document_info']['filename'] = filename
+    return analysis
+
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
-    """Upload file endpoint (simplified)"""
+    """Upload file endpoint; with shard servers configured the PDF is analyzed and indexed on its shard"""
     if not file.filename or not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
@@ -175,14 +255,31 @@ async def upload_file(file: UploadFile = File(...)):
             content = await file.read()
             buffer.write(content)
         
-        return {
-            "message": "File uploaded successfully",
-            "filename": file.filename,
-            "status": "uploaded"
-        }
+        if not shard_coordinator:
+            return {
+                "message": "File uploaded successfully",
+                "filename": file.filename,
+                "status": "uploaded"
+            }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
+    
+    if IntegratedAnalyzer is None:
+        raise HTTPException(status_code=503, detail="PDF analyzer not available for shard ingestion")
+    try:
+        # Analysis and ingestion block, so they run off the event loop
+        analysis = await asyncio.to_thread(analyze_upload, upload_path, file.filename)
+        shard = await asyncio.to_thread(shard_coordinator.add_pdf_content, analysis)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Shard ingestion error: {str(e)}")
+    
+    return {
+        "message": "File uploaded and indexed successfully",
+        "filename": file.filename,
+        "status": "indexed",
+        "shard": shard
+    }
 
 @app.get("/api/stats")
 async def get_stats():
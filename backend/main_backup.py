@@ -11,6 +11,7 @@ from typing import List, Optional, Dict, Any
 import os
 import sys
 import json
+import shutil
 import uuid
 import time
 from datetime import datetime
@@ -30,15 +31,22 @@ sys.path.insert(0, scripts_path)
 
 # Import our existing RAG system
 try:
-    from scripts.groq_optimized_simple_rag import GroqOptimizedSimpleRAG  # type: ignore
+    from scripts.groq_optimized_simple_rag import (GroqOptimizedSimpleRAG, INDEX_CACHE_SUFFIX,  # type: ignore
+                                                   document_id_for)
     ORIGINAL_RAG_AVAILABLE = True
 except ImportError:
     try:
-        from groq_optimized_simple_rag import GroqOptimizedSimpleRAG  # type: ignore
+        from groq_optimized_simple_rag import (GroqOptimizedSimpleRAG, INDEX_CACHE_SUFFIX,  # type: ignore
+                                               document_id_for)
         ORIGINAL_RAG_AVAILABLE = True
     except ImportError:
         ORIGINAL_RAG_AVAILABLE = False
         GroqOptimizedSimpleRAG = None  # type: ignore
+        INDEX_CACHE_SUFFIX = ".rag_index"
+        
+        def document_id_for(analysis_path: str) -> str:
+            """Corpus document id of an analysis file"""
+            return os.path.basename(analysis_path).replace('_complete_analysis.json', '')
 
 try:
     from scripts.memory_optimized_groq_rag import MemoryOptimizedGroqRAG  # type: ignore
@@ -54,6 +62,8 @@ except ImportError:
         MemoryOptimizedGroqRAG = None
 
 from scripts.hybrid_pdf_extractor import HybridPDFExtractor  # type: ignore
+from scripts.turkish_chunker import TokenAwareChunker  # type: ignore
+from scripts.model_registry import get_registry  # type: ignore
 # Additional modules imported at startup
 
 # Configure logging
@@ -74,6 +84,10 @@ VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "../vector_store")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2048"))
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.1"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "128"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "16"))
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch | int8 | onnx
 
 # Validate required environment variables
 if not GROQ_API_KEY or GROQ_API_KEY == "your_groq_api_key_here":
@@ -112,9 +126,18 @@ app.add_middleware(
 )
 
 # Initialize components  
+# The serving RAG. Uploads publish new corpus generations inside it (or, without
+# incremental support, swap in a rebuilt pipeline); requests read this reference
+# once, so in-flight queries finish on the generation they started with.
 rag_system = None  # Will be initialized based on available modules
+# One ingestion at a time: at most one new generation is being built
+ingest_lock = asyncio.Lock()
 USE_MEMORY_OPTIMIZED = os.getenv("USE_MEMORY_OPTIMIZED", "false").lower() == "true"
 
+# Upload chunker; loads only the embedding model's tokenizer
+chunker = TokenAwareChunker.from_pretrained(EMBEDDING_MODEL, max_seq_length=EMBEDDING_MAX_SEQ_LENGTH,
+                                           overlap_tokens=CHUNK_OVERLAP_TOKENS)
+
 # In-memory storage for demo (replace with database in production)
 documents_store: Dict[str, Dict[str, Any]] = {}
 query_history: List[Dict[str, Any]] = []
@@ -146,6 +169,8 @@ class SystemStats(BaseModel):
     avg_response_time: float
     avg_confidence: float
     system_status: str
+    embedding_models: Optional[Dict[str, Any]] = None
+    corpus: Optional[Dict[str, Any]] = None
 
 # Utility Functions
 async def load_existing_documents():
@@ -193,7 +218,8 @@ async def load_existing_documents():
                 "uploaded_at": processed_at,
                 "processed_at": processed_at,
                 "status": "processed",
-                "analysis_file": analysis_path
+                "analysis_file": analysis_path,
+                "corpus_id": document_id_for(analysis_path)
             }
             
             logger.info(f"📄 Loaded document: {filename} ({doc_id})")
@@ -218,7 +244,7 @@ async def startup_event():
         # Load existing documents from analysis output
         await load_existing_documents()
         
-        # Check if there are existing analysis files and load the latest one
+        # The memory optimized RAG serves only the latest analysis file
         analysis_dir = "analysis_output"
         latest_path = None
         
@@ -240,10 +266,9 @@ async def startup_event():
             )
         elif ORIGINAL_RAG_AVAILABLE:
             logger.info("� Using Original RAG System")
-            if latest_path:
-                rag_system = GroqOptimizedSimpleRAG(groq_api_key=GROQ_API_KEY, specific_analysis_file=latest_path)
-            else:
-                rag_system = GroqOptimizedSimpleRAG(groq_api_key=GROQ_API_KEY)
+            # One corpus across every ingested document; per-file index caches avoid re-encoding
+            rag_system = GroqOptimizedSimpleRAG(groq_api_key=GROQ_API_KEY, analysis_dir=analysis_dir,
+                                                encoder_backend=EMBEDDING_BACKEND)
         elif MEMORY_RAG_AVAILABLE:
             logger.warning("⚠️ Falling back to Memory Optimized RAG (Original not available)")
             rag_system = MemoryOptimizedGroqRAG(
@@ -352,6 +377,72 @@ async def upload_pdf(
         logger.error(f"PDF upload failed: {e}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+def build_analysis_file(doc_id: str, filename: str, file_path: str) -> Dict[str, Any]:
+    """Extract, chunk and save an uploaded PDF as an analysis file (blocking; run in a thread)."""
+    # Extract content from PDF
+    logger.info(f"📖 Extracting content from: {file_path}")
+    extractor = HybridPDFExtractor(file_path)
+    
+    # Get text content
+    text_data = extractor.extract_text_pdfplumber()
+    
+    # Calculate pages
+    pages_count = len(text_data)
+    
+    # Extract all text content
+    full_text = ""
+    for page_data in text_data:
+        full_text += f"\n{page_data.get('metin', '')}"
+    
+    # Create analysis output file for the new document
+    analysis_file = f"analysis_output/{doc_id}_complete_analysis.json"
+    os.makedirs("analysis_output", exist_ok=True)
+    
+    # Save extracted content
+    analysis_data = {
+        "document_id": doc_id,
+        "filename": filename,
+        "processed_at": datetime.now().isoformat(),
+        "pages": pages_count,
+        "content": {
+            "full_text": full_text,
+            "pages_data": text_data
+        },
+        "chunks": []
+    }
+    
+    # Create chunks for RAG system. Chunks are sentence-aligned, sized by the embedding
+    # model's tokenizer, and restart at every page so an edit on one page leaves the
+    # other pages' chunks (and their cached embeddings) unchanged.
+    for page_data in text_data:
+        for text_chunk in chunker.chunk_text(page_data.get('metin', '')):
+            analysis_data["chunks"].append({
+                "chunk_id": f"{doc_id}_chunk_{len(analysis_data['chunks'])}",
+                "text": text_chunk.text,
+                "metadata": {
+                    "document_id": doc_id,
+                    "filename": filename,
+                    "page": page_data.get('sayfa', 0),
+                    "chunk_index": len(analysis_data["chunks"]),
+                    "token_count": text_chunk.token_count
+                }
+            })
+    
+    # Save analysis file
+    with open(analysis_file, 'w', encoding='utf-8') as f:
+        json.dump(analysis_data, f, ensure_ascii=False, indent=2)
+    
+    return {"analysis_file": analysis_file, "pages": pages_count, "chunks": len(analysis_data["chunks"])}
+
+def remove_analysis_files(analysis_file: str):
+    """Delete a document's analysis file and its persisted index cache"""
+    try:
+        if os.path.exists(analysis_file):
+            os.remove(analysis_file)
+        shutil.rmtree(os.path.splitext(analysis_file)[0] + INDEX_CACHE_SUFFIX, ignore_errors=True)
+    except Exception as e:
+        logger.warning(f"Failed to delete analysis file: {e}")
+
 async def process_pdf_background(doc_id: str, file_path: str):
     """Background task to process uploaded PDF and integrate into RAG system."""
     global rag_system
@@ -362,80 +453,36 @@ async def process_pdf_background(doc_id: str, file_path: str):
         # Update status
         documents_store[doc_id]["status"] = "processing"
         
-        # Extract content from PDF
-        logger.info(f"📖 Extracting content from: {file_path}")
-        extractor = HybridPDFExtractor(file_path)
-        
-        # Get text content
-        text_data = extractor.extract_text_pdfplumber()
-        
-        # Calculate pages
-        pages_count = len(text_data)
-        documents_store[doc_id]["pages"] = pages_count
-        
-        # Extract all text content
-        full_text = ""
-        for page_data in text_data:
-            full_text += f"\n{page_data.get('metin', '')}"
-        
-        # Create new RAG system with the uploaded document
-        logger.info(f"🤖 Initializing new RAG system with uploaded document...")
-        
-        # Create analysis output file for the new document
-        analysis_file = f"analysis_output/{doc_id}_complete_analysis.json"
-        os.makedirs("analysis_output", exist_ok=True)
-        
-        # Save extracted content
-        analysis_data = {
-            "document_id": doc_id,
-            "filename": documents_store[doc_id]["filename"],
-            "processed_at": datetime.now().isoformat(),
-            "pages": pages_count,
-            "content": {
-                "full_text": full_text,
-                "pages_data": text_data
-            },
-            "chunks": []
-        }
-        
-        # Create chunks for RAG system
-        chunk_size = 1000
-        overlap = 200
-        words = full_text.split()
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_words = words[i:i + chunk_size]
-            chunk_text = " ".join(chunk_words)
+        async with ingest_lock:
+            # Extraction, chunking and encoding run off the event loop so queries are not stalled
+            result = await asyncio.to_thread(build_analysis_file, doc_id, documents_store[doc_id]["filename"],
+                                             file_path)
+            documents_store[doc_id]["pages"] = result["pages"]
+            documents_store[doc_id]["analysis_file"] = result["analysis_file"]
+            documents_store[doc_id]["corpus_id"] = document_id_for(result["analysis_file"])
             
-            if chunk_text.strip():
-                analysis_data["chunks"].append({
-                    "chunk_id": f"{doc_id}_chunk_{len(analysis_data['chunks'])}",
-                    "text": chunk_text,
-                    "metadata": {
-                        "document_id": doc_id,
-                        "filename": documents_store[doc_id]["filename"],
-                        "chunk_index": len(analysis_data["chunks"])
-                    }
-                })
-        
-        # Save analysis file
-        with open(analysis_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis_data, f, ensure_ascii=False, indent=2)
-        
-        # Reinitialize RAG system with new document
-        logger.info(f"🔄 Reinitializing RAG system with {len(analysis_data['chunks'])} chunks...")
-        
-        # Create new RAG instance with specific analysis file
-        assert GROQ_API_KEY is not None, "GROQ_API_KEY should be available"
-        rag_system = GroqOptimizedSimpleRAG(groq_api_key=GROQ_API_KEY, specific_analysis_file=analysis_file)
+            if hasattr(rag_system, 'add_document'):
+                # Indexed into a new corpus generation and published atomically when complete
+                logger.info(f"➕ Adding {result['chunks']} chunks to the RAG corpus...")
+                await asyncio.to_thread(rag_system.add_document, result["analysis_file"])
+            else:
+                # Build the replacement fully before the flip; the old pipeline is released
+                # once the queries still holding it finish
+                logger.info(f"🔄 Reinitializing RAG system with {result['chunks']} chunks...")
+                assert GROQ_API_KEY is not None, "GROQ_API_KEY should be available"
+                new_rag_system = await asyncio.to_thread(
+                    GroqOptimizedSimpleRAG, groq_api_key=GROQ_API_KEY, analysis_dir="analysis_output",
+                    encoder_backend=EMBEDDING_BACKEND
+                )
+                rag_system = new_rag_system
         
         # Update document status
         documents_store[doc_id]["status"] = "processed"
         documents_store[doc_id]["processed_at"] = datetime.now().isoformat()
-        documents_store[doc_id]["message"] = f"Processing completed successfully. {len(analysis_data['chunks'])} chunks created and integrated into RAG system."
-        documents_store[doc_id]["chunks_count"] = len(analysis_data["chunks"])
+        documents_store[doc_id]["message"] = f"Processing completed successfully. {result['chunks']} chunks created and integrated into RAG system."
+        documents_store[doc_id]["chunks_count"] = result["chunks"]
         
-        logger.info(f"✅ PDF processing completed: {doc_id} - {len(analysis_data['chunks'])} chunks")
+        logger.info(f"✅ PDF processing completed: {doc_id} - {result['chunks']} chunks")
         
     except Exception as e:
         logger.error(f"❌ PDF processing failed for {doc_id}: {e}")
@@ -447,7 +494,9 @@ async def process_pdf_background(doc_id: str, file_path: str):
 async def query_rag(request: QueryRequest):
     """Submit query to RAG system."""
     try:
-        if rag_system is None:
+        # Read once: an upload swapping the pipeline does not affect this request
+        rag = rag_system
+        if rag is None:
             raise HTTPException(status_code=503, detail="RAG system not initialized")
             
         logger.info(f"🔍 Processing query: {request.question[:50]}...")
@@ -457,15 +506,21 @@ async def query_rag(request: QueryRequest):
         # Query RAG system based on type
         if USE_MEMORY_OPTIMIZED:
             response_text = await asyncio.to_thread(
-                rag_system.retrieve_and_generate,
+                rag.retrieve_and_generate,
                 request.question
             )
             # Memory optimized returns string, convert to dict format
             response = {"answer": response_text, "confidence": 0.8, "context_length": len(response_text)}
         else:
+            # A document_id scopes retrieval to that document's chunks (by its corpus id)
+            document_ids = None
+            if request.document_id:
+                document = documents_store.get(request.document_id, {})
+                document_ids = [document.get("corpus_id", request.document_id)]
             response = await asyncio.to_thread(
-                rag_system.query,
-                request.question
+                rag.query,
+                request.question,
+                document_ids=document_ids
             )
         
         end_time = datetime.now()
@@ -535,8 +590,14 @@ async def delete_document(document_id: str):
     except Exception as e:
         logger.warning(f"Failed to delete file: {e}")
     
-    # Remove from store
+    # Remove from store, from the served corpus and from what is reloaded at startup.
+    # The corpus id and analysis path were recorded when the document was loaded or processed.
     del documents_store[document_id]
+    async with ingest_lock:
+        if hasattr(rag_system, 'remove_document') and doc_data.get("corpus_id"):
+            await asyncio.to_thread(rag_system.remove_document, doc_data["corpus_id"])
+        if doc_data.get("analysis_file"):
+            await asyncio.to_thread(remove_analysis_files, doc_data["analysis_file"])
     
     return {"message": "Document deleted successfully"}
 
@@ -562,7 +623,9 @@ async def get_system_stats():
         total_queries=total_queries,
         avg_response_time=avg_response_time,
         avg_confidence=avg_confidence,
-        system_status="operational"
+        system_status="operational",
+        embedding_models=get_registry().get_stats(),
+        corpus=rag_system.get_corpus_stats() if hasattr(rag_system, 'get_corpus_stats') else None
     )
 
 @app.get("/api/config")
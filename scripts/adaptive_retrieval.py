@@ -0,0 +1,106 @@
+"""
+🎯 Adaptive Retrieval
+====================
+Score-aware selection of how many retrieved chunks to send to the LLM.
+
+A fixed top-k sends the same number of chunks whether one or five are
+relevant. Here the cut-off follows the similarity scores instead:
+- an absolute floor (`min_score`) drops chunks that are not relevant at all
+- a relative floor (`max_drop` below the best score) drops the long tail
+- a cliff in the score curve (a gap much larger than the typical gap)
+  ends the evidence set at the cliff
+
+Also tracks how many context tokens are sent per query type, using the
+token counts stored with each chunk at ingestion time.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .turkish_chunker import APPROX_CHARS_PER_TOKEN
+except ImportError:
+    from turkish_chunker import APPROX_CHARS_PER_TOKEN
+
+@dataclass
+class AdaptiveKConfig:
+    """Cut-off parameters for adaptive k (cosine similarities of normalized embeddings)"""
+    min_k: int = 1
+    max_k: int = 8
+    min_score: float = 0.25
+    max_drop: float = 0.15
+    min_gap: float = 0.05
+    gap_factor: float = 2.5
+
+def select_adaptive_k(scores: Sequence[float], config: Optional[AdaptiveKConfig] = None) -> int:
+    """
+    Choose how many of the best-first scored results to keep
+
+    Args:
+        scores: Similarity scores sorted best first
+        config: Cut-off parameters
+
+    Returns:
+        Number of leading results to keep (0 only when nothing passes min_score)
+    """
+    config = config or AdaptiveKConfig()
+    values = np.asarray(scores[:config.max_k], dtype=np.float32)
+    if len(values) == 0 or values[0] < config.min_score:
+        return 0
+
+    # Absolute and relative floors
+    keep = int(np.sum((values >= config.min_score) & (values >= values[0] - config.max_drop)))
+    keep = max(keep, min(config.min_k, len(values)))
+
+    # Cut at a cliff: the largest gap, if it clearly stands out from the typical gap
+    if keep > config.min_k:
+        gaps = values[:keep - 1] - values[1:keep]
+        typical = float(np.median(gaps)) if len(gaps) > 1 else 0.0
+        start = max(config.min_k, 1) - 1
+        cliff = int(np.argmax(gaps[start:])) + start
+        if gaps[cliff] >= config.min_gap and gaps[cliff] >= config.gap_factor * typical:
+            keep = cliff + 1
+    return keep
+
+def estimate_tokens(text: str) -> int:
+    """Token estimate for text without a stored token count"""
+    return math.ceil(len(text) / APPROX_CHARS_PER_TOKEN)
+
+class ContextTokenStats:
+    """Thread-safe per-query-type counters of retrieved chunks and context tokens"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type: Dict[str, Dict[str, int]] = {}
+
+    def record(self, query_type: str, chunks: int, tokens: int):
+        """Record one query's evidence set"""
+        with self._lock:
+            entry = self._by_type.setdefault(query_type, {'queries': 0, 'chunks': 0, 'tokens': 0})
+            entry['queries'] += 1
+            entry['chunks'] += chunks
+            entry['tokens'] += tokens
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Average chunks and context tokens per query, by query type and overall"""
+        with self._lock:
+            entries = {query_type: dict(entry) for query_type, entry in self._by_type.items()}
+        total = {'queries': 0, 'chunks': 0, 'tokens': 0}
+        for entry in entries.values():
+            for key in total:
+                total[key] += entry[key]
+        if total['queries']:
+            entries['all'] = total
+
+        report = {}
+        for query_type, entry in entries.items():
+            report[query_type] = {
+                'queries': entry['queries'],
+                'avg_chunks': entry['chunks'] / entry['queries'],
+                'avg_context_tokens': entry['tokens'] / entry['queries']
+            }
+        return report
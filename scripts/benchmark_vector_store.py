@@ -0,0 +1,960 @@
+"""
+📏 Vector Store Benchmark
+========================
+Latency and recall benchmarks for FAISS vector store index types.
+
+Uses synthetic clustered, L2-normalized embeddings (same dimension as the
+mpnet model) so index behaviour can be measured without loading the
+embedding model. Exact flat inner-product search is the ground truth.
+
+Usage:
+    python scripts/benchmark_vector_store.py hnsw --n 200000 --k 10
+    python scripts/benchmark_vector_store.py quantization --n 100000
+    python scripts/benchmark_vector_store.py batch --n 2000 --queries 256
+    python scripts/benchmark_vector_store.py mmr --n 100000
+    python scripts/benchmark_vector_store.py encoders --n 2000 --queries 200
+    python scripts/benchmark_vector_store.py projection --n 100000 [--vectors vector_store/vectors.f32]
+    python scripts/benchmark_vector_store.py bulk --n 5000 [--workers 1 2 4 8]
+    python scripts/benchmark_vector_store.py binary --n 200000 [--vectors vector_store/vectors.f32]
+    python scripts/benchmark_vector_store.py concurrency --n 100000 [--workers 1 2 4 8]
+    python scripts/benchmark_vector_store.py hierarchical --n 200000 --k 10
+    python scripts/benchmark_vector_store.py dedup --n 60
+    python scripts/benchmark_vector_store.py numpy --n 1000000 --k 10
+    python scripts/benchmark_vector_store.py shards --n 30 --nodes 3 --queries 100
+
+Benchmarks marked "model" load the sentence-transformers model and index
+synthetic Turkish financial text instead of random vectors.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import faiss
+
+try:
+    from .faiss_vector_store import (HNSW_PROFILES, PROJECTION_TYPES, DocumentChunk, FAISSVectorStore,
+                                     binarize, build_faiss_index, mmr_select, resolve_index_params, rerank_with_vectors)
+    from .embedding_backends import OnnxEncoder, cosine_agreement, default_onnx_dir, load_encoder
+    from .bulk_embedder import BulkEmbedder
+    from .hierarchical_index import HierarchyState
+    from .numpy_vector_index import NumpyFlatIndex
+    from .shard_coordinator import ShardCoordinator
+except ImportError:
+    from faiss_vector_store import (HNSW_PROFILES, PROJECTION_TYPES, DocumentChunk, FAISSVectorStore,
+                                    binarize, build_faiss_index, mmr_select, resolve_index_params, rerank_with_vectors)
+    from embedding_backends import OnnxEncoder, cosine_agreement, default_onnx_dir, load_encoder
+    from bulk_embedder import BulkEmbedder
+    from hierarchical_index import HierarchyState
+    from numpy_vector_index import NumpyFlatIndex
+    from shard_coordinator import ShardCoordinator
+
+# Acceptance targets per HNSW profile (recall@k vs flat, p99 relative to flat p99)
+PROFILE_TARGETS: Dict[str, Dict[str, float]] = {
+    'latency': {'min_recall': 0.85, 'max_p99_ratio': 0.5},
+    'recall': {'min_recall': 0.97, 'max_p99_ratio': 1.0},
+}
+
+# Vocabulary for synthetic bulletin-like text
+FINANCE_VOCABULARY = (
+    "enflasyon TÜFE ÜFE faiz politika PPK Merkez Bankası BIST-100 endeks hisse tahvil "
+    "bono getiri döviz kur dolar euro altın petrol bütçe açık fazla cari denge ihracat "
+    "ithalat büyüme GSYH sanayi üretim işsizlik güven endeksi kredi mevduat rezerv yüzde "
+    "puan artış azalış yükseldi geriledi beklenti piyasa haftalık günlük aylık yıllık "
+    "bankacılık sektör talep arz fiyat maliyet vergi harcama gelir borç risk").split()
+
+def make_synthetic_texts(n: int, min_words: int = 8, max_words: int = 40, seed: int = 42) -> List[str]:
+    """Generate bulletin-like Turkish sentences of varying length"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(min_words, max_words + 1, size=n)
+    return [' '.join(rng.choice(FINANCE_VOCABULARY, size=length)) for length in lengths]
+
+def build_text_store(n_chunks: int, store_path: str, **store_kwargs) -> FAISSVectorStore:
+    """Create a vector store populated with synthetic text chunks"""
+    logging.getLogger('faiss_vector_store').setLevel(logging.WARNING)
+    store = FAISSVectorStore(vector_store_path=store_path, **store_kwargs)
+    chunks = [DocumentChunk(id=f"synthetic_{i}", text=text, source=f"bulletin_{i % 30}.pdf",
+                            page_number=i % 12, chunk_type='text', metadata={})
+              for i, text in enumerate(make_synthetic_texts(n_chunks))]
+    store._add_chunks(chunks)
+    return store
+
+def make_synthetic_embeddings(n: int, dim: int = 768, n_clusters: int = 256,
+                              latent_dim: int = 64, seed: int = 42) -> np.ndarray:
+    """
+    Generate normalized float32 embeddings resembling sentence vectors
+
+    Sentence embeddings have a low intrinsic dimension, so vectors are drawn from
+    topic clusters in a small latent space and projected up to `dim`.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, latent_dim)).astype(np.float32)
+    projection = rng.standard_normal((latent_dim, dim)).astype(np.float32) / np.sqrt(latent_dim)
+    assignments = rng.integers(0, n_clusters, size=n)
+    latent = centers[assignments] + 0.5 * rng.standard_normal((n, latent_dim)).astype(np.float32)
+    vectors = latent @ projection + 0.05 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def make_corpus_and_queries(n: int, n_queries: int, dim: int = 768,
+                            latent_dim: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """Corpus and held-out queries drawn from the same distribution"""
+    vectors = make_synthetic_embeddings(n + n_queries, dim, latent_dim=latent_dim)
+    return vectors[:n], np.ascontiguousarray(vectors[n:])
+
+def ground_truth(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-k ids via flat inner-product search"""
+    index = faiss.IndexFlatIP(corpus.shape[1])
+    index.add(corpus)  # type: ignore
+    _, ids = index.search(queries, k)  # type: ignore
+    return ids
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """Mean fraction of true top-k ids present in the returned top-k"""
+    hits = [len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth)]
+    return float(np.mean(hits)) / truth.shape[1]
+
+def measure_latency(search_fn, queries: np.ndarray, k: int) -> Tuple[Dict[str, float], np.ndarray]:
+    """
+    Run single-query searches (as in serving) and collect latency percentiles
+
+    Returns:
+        Latency stats in milliseconds and the returned ids
+    """
+    latencies = []
+    found = []
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = search_fn(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+    latencies_arr = np.array(latencies)
+    stats = {
+        'p50_ms': float(np.percentile(latencies_arr, 50)),
+        'p99_ms': float(np.percentile(latencies_arr, 99)),
+        'mean_ms': float(latencies_arr.mean()),
+    }
+    return stats, np.array(found)
+
+def benchmark_hnsw(n: int, dim: int, k: int, n_queries: int) -> List[Dict[str, Any]]:
+    """Compare HNSW profiles against flat search"""
+    print(f"🔄 Building synthetic corpus: {n} x {dim}")
+    corpus, queries = make_corpus_and_queries(n, n_queries, dim)
+    truth = ground_truth(corpus, queries, k)
+
+    flat = build_faiss_index("flat", dim)
+    flat.add(corpus)  # type: ignore
+    flat_stats, flat_ids = measure_latency(flat.search, queries, k)
+    rows = [{'name': 'flat', 'build_s': 0.0, 'recall': recall_at_k(flat_ids, truth), **flat_stats}]
+
+    for profile in HNSW_PROFILES:
+        params = resolve_index_params("hnsw", profile)
+        index = build_faiss_index("hnsw", dim, params)
+        start = time.perf_counter()
+        index.add(corpus)  # type: ignore
+        build_s = time.perf_counter() - start
+        stats, ids = measure_latency(index.search, queries, k)
+        row = {'name': f"hnsw/{profile}", 'build_s': build_s, 'recall': recall_at_k(ids, truth), **stats}
+
+        targets = PROFILE_TARGETS[profile]
+        row['passed'] = (row['recall'] >= targets['min_recall'] and
+                         row['p99_ms'] <= flat_stats['p99_ms'] * targets['max_p99_ratio'])
+        rows.append(row)
+
+    print(f"\n📊 HNSW vs flat (n={n}, k={k}, queries={n_queries})")
+    print(f"{'index':<16}{'build s':>10}{'p50 ms':>10}{'p99 ms':>10}{'recall@' + str(k):>12}  status")
+    for row in rows:
+        status = '' if 'passed' not in row else ('✅ PASS' if row['passed'] else '❌ FAIL')
+        print(f"{row['name']:<16}{row['build_s']:>10.2f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+              f"{row['recall']:>12.3f}  {status}")
+    return rows
+
+def index_bytes_per_vector(index) -> float:
+    """Measured serialized index size per stored vector"""
+    return len(faiss.serialize_index(index)) / max(index.ntotal, 1)
+
+def benchmark_quantization(n: int, dim: int, k: int, n_queries: int,
+                           rerank_factor: int = 4) -> List[Dict[str, Any]]:
+    """Report memory per chunk and recall@k for each quantization mode"""
+    print(f"🔄 Building synthetic corpus: {n} x {dim}")
+    corpus, queries = make_corpus_and_queries(n, n_queries, dim)
+    truth = ground_truth(corpus, queries, k)
+
+    rows = []
+    for index_type in ("flat", "fp16", "sq8", "pq"):
+        params = resolve_index_params(index_type)
+        index = build_faiss_index(index_type, dim, params)
+        start = time.perf_counter()
+        if not index.is_trained:
+            index.train(corpus[:min(n, 50000)])  # type: ignore
+        index.add(corpus)  # type: ignore
+        build_s = time.perf_counter() - start
+        bytes_per_vector = index_bytes_per_vector(index)
+
+        stats, ids = measure_latency(index.search, queries, k)
+        rows.append({'name': index_type, 'bytes': bytes_per_vector, 'build_s': build_s,
+                     'recall': recall_at_k(ids, truth), **stats})
+
+        if index_type != "flat":
+            def rerank_search(q, k_):
+                _, shortlist = index.search(q, k_ * rerank_factor)  # type: ignore
+                return rerank_with_vectors(q, shortlist, corpus, k_)
+            stats, ids = measure_latency(rerank_search, queries, k)
+            # Float vectors live on disk in the store, so resident memory is unchanged
+            rows.append({'name': f"{index_type}+rerank", 'bytes': bytes_per_vector, 'build_s': build_s,
+                         'recall': recall_at_k(ids, truth), **stats})
+
+    print(f"\n📊 Quantization modes (n={n}, k={k}, rerank shortlist={rerank_factor}k)")
+    print(f"{'mode':<14}{'bytes/chunk':>12}{'vs flat':>9}{'p50 ms':>10}{'recall@' + str(k):>12}")
+    flat_bytes = rows[0]['bytes']
+    for row in rows:
+        print(f"{row['name']:<14}{row['bytes']:>12.1f}{flat_bytes / row['bytes']:>8.1f}x"
+              f"{row['p50_ms']:>10.3f}{row['recall']:>12.3f}")
+    return rows
+
+def benchmark_batch_search(n_chunks: int, n_queries: int, k: int) -> Dict[str, float]:
+    """Compare one-at-a-time search() with batched search_many() (model)"""
+    with tempfile.TemporaryDirectory() as store_path:
+        print(f"🔄 Indexing {n_chunks} synthetic chunks")
+        store = build_text_store(n_chunks, store_path)
+        queries = make_synthetic_texts(n_queries, min_words=3, max_words=12, seed=7)
+
+        # Warm up model and index
+        store.search_many(queries[:8], k=k)
+
+        start = time.perf_counter()
+        single = [store.search(q, k=k) for q in queries]
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = store.search_many(queries, k=k)
+        batched_s = time.perf_counter() - start
+
+    agreement = np.mean([[r.chunk.id for r in a] == [r.chunk.id for r in b]
+                         for a, b in zip(single, batched)])
+    results = {
+        'single_qps': n_queries / single_s,
+        'batched_qps': n_queries / batched_s,
+        'speedup': single_s / batched_s,
+        'identical_results': float(agreement),
+    }
+    print(f"\n📊 Batched search ({n_queries} queries, {n_chunks} chunks, k={k})")
+    print(f"  One-at-a-time: {results['single_qps']:.1f} queries/s")
+    print(f"  search_many:   {results['batched_qps']:.1f} queries/s ({results['speedup']:.1f}x)")
+    print(f"  Identical top-k: {results['identical_results']:.1%}")
+    return results
+
+def benchmark_mmr(n: int, dim: int, k: int, n_queries: int,
+                  pool_sizes: Tuple[int, ...] = (100, 200, 300, 500),
+                  lambda_mult: float = 0.5) -> List[Dict[str, Any]]:
+    """Added latency of MMR re-ranking relative to the FAISS search it follows"""
+    print(f"🔄 Building synthetic corpus: {n} x {dim}")
+    corpus, queries = make_corpus_and_queries(n, n_queries, dim)
+    index = build_faiss_index("flat", dim)
+    index.add(corpus)  # type: ignore
+
+    rows = []
+    for pool in pool_sizes:
+        search_ms, mmr_ms, redundancy_before, redundancy_after = [], [], [], []
+        for i in range(n_queries):
+            query = queries[i:i + 1]
+            start = time.perf_counter()
+            _, ids = index.search(query, pool)  # type: ignore
+            search_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            candidates = corpus[ids[0]]
+            order = mmr_select(query[0], candidates, k, lambda_mult)
+            mmr_ms.append((time.perf_counter() - start) * 1000)
+
+            # Mean pairwise similarity inside the returned top-k (lower = more diverse)
+            for chosen, bucket in ((np.arange(k), redundancy_before), (order, redundancy_after)):
+                sims = candidates[chosen] @ candidates[chosen].T
+                bucket.append((sims.sum() - k) / (k * (k - 1)))
+        rows.append({
+            'pool': pool,
+            'search_p50_ms': float(np.percentile(search_ms, 50)),
+            'mmr_p50_ms': float(np.percentile(mmr_ms, 50)),
+            'mmr_p99_ms': float(np.percentile(mmr_ms, 99)),
+            'redundancy_before': float(np.mean(redundancy_before)),
+            'redundancy_after': float(np.mean(redundancy_after)),
+        })
+
+    print(f"\n📊 MMR re-ranking (n={n}, k={k}, lambda={lambda_mult})")
+    print(f"{'pool':>6}{'search p50':>12}{'mmr p50':>10}{'mmr p99':>10}{'overhead':>10}{'redundancy':>20}")
+    for row in rows:
+        overhead = row['mmr_p50_ms'] / row['search_p50_ms']
+        print(f"{row['pool']:>6}{row['search_p50_ms']:>10.3f}ms{row['mmr_p50_ms']:>8.3f}ms{row['mmr_p99_ms']:>8.3f}ms"
+              f"{overhead:>9.1%}{row['redundancy_before']:>10.3f} → {row['redundancy_after']:.3f}")
+    return rows
+
+def benchmark_encoders(n_texts: int, n_queries: int, k: int, model_name: str,
+                       onnx_path: Optional[str] = None, batch_size: int = 32) -> List[Dict[str, Any]]:
+    """Throughput and agreement of CPU encoder backends against the PyTorch model (model)"""
+    texts = make_synthetic_texts(n_texts)
+    queries = make_synthetic_texts(n_queries, min_words=3, max_words=12, seed=7)
+
+    encoders: Dict[str, Any] = {
+        'torch': load_encoder(model_name, 'torch'),
+        'int8': load_encoder(model_name, 'int8'),
+    }
+    onnx_dir = onnx_path or default_onnx_dir(model_name)
+    try:
+        encoders['onnx-fp32'] = OnnxEncoder(onnx_dir, quantized=False)
+        encoders['onnx-int8'] = OnnxEncoder(onnx_dir, quantized=True)
+    except (FileNotFoundError, OSError):
+        print(f"⚠️ No ONNX export at {onnx_dir}; run scripts/embedding_backends.py export to include it")
+
+    rows, reference_docs, reference_top = [], None, None
+    for name, encoder in encoders.items():
+        encoder.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+
+        start = time.perf_counter()
+        doc_embeddings = encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        encode_s = time.perf_counter() - start
+
+        latencies = []
+        query_embeddings = []
+        for query in queries:
+            start = time.perf_counter()
+            query_embeddings.append(encoder.encode([query], normalize_embeddings=True)[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        top = np.argsort(-(query_embeddings @ doc_embeddings.T), axis=1)[:, :k]
+
+        if reference_docs is None:
+            reference_docs, reference_top = doc_embeddings, top
+        agreement = cosine_agreement(reference_docs, doc_embeddings)
+        rows.append({
+            'backend': name,
+            'texts_per_s': n_texts / encode_s,
+            'query_p50_ms': float(np.percentile(latencies, 50)),
+            'query_p99_ms': float(np.percentile(latencies, 99)),
+            'cosine_mean': agreement['mean'],
+            'cosine_min': agreement['min'],
+            'topk_overlap': recall_at_k(top, reference_top),
+        })
+
+    print(f"\n📊 Encoder backends ({n_texts} texts, batch {batch_size}, {n_queries} queries, k={k})")
+    print(f"{'backend':<12}{'texts/s':>10}{'speedup':>9}{'q p50':>10}{'q p99':>10}"
+          f"{'cos mean':>10}{'cos min':>10}{'top-k':>8}")
+    base = rows[0]['texts_per_s']
+    for row in rows:
+        print(f"{row['backend']:<12}{row['texts_per_s']:>10.1f}{row['texts_per_s'] / base:>8.2f}x"
+              f"{row['query_p50_ms']:>8.2f}ms{row['query_p99_ms']:>8.2f}ms"
+              f"{row['cosine_mean']:>10.4f}{row['cosine_min']:>10.4f}{row['topk_overlap']:>8.3f}")
+    return rows
+
+def load_vectors(path: str, dim: int, n: int, n_queries: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Corpus and held-out queries from real embeddings (.npy, or a raw float32 file such as vectors.f32)"""
+    vectors = np.load(path) if path.endswith('.npy') else np.fromfile(path, dtype=np.float32).reshape(-1, dim)
+    vectors = np.ascontiguousarray(vectors[:n + n_queries], dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    n_queries = min(n_queries, len(vectors) // 10)
+    return vectors[:-n_queries], np.ascontiguousarray(vectors[-n_queries:])
+
+def benchmark_projection(n: int, dim: int, k: int, n_queries: int,
+                         out_dims: Tuple[int, ...] = (64, 128, 192, 256, 384),
+                         vectors_path: Optional[str] = None, latent_dim: int = 256,
+                         rerank_factor: int = 4) -> List[Dict[str, Any]]:
+    """Recall@k, latency and memory of PCA/OPQ-projected flat indexes against full-dimension search"""
+    if vectors_path:
+        print(f"🔄 Loading embeddings from {vectors_path}")
+        corpus, queries = load_vectors(vectors_path, dim, n, n_queries)
+    else:
+        # A wider latent space than the other benchmarks, so projection loss is not hidden
+        print(f"🔄 Building synthetic corpus: {n} x {dim} (latent dimension {latent_dim})")
+        corpus, queries = make_corpus_and_queries(n, n_queries, dim, latent_dim)
+    truth = ground_truth(corpus, queries, k)
+
+    flat = build_faiss_index("flat", dim)
+    flat.add(corpus)  # type: ignore
+    flat_stats, _ = measure_latency(flat.search, queries, k)
+    rows = [{'name': f"flat-{dim}", 'bytes': index_bytes_per_vector(flat), 'recall': 1.0,
+             'rerank_recall': 1.0, 'train_s': 0.0, **flat_stats}]
+
+    for projection in PROJECTION_TYPES:
+        for out_dim in out_dims:
+            if out_dim >= dim:
+                continue
+            params = {'projection': projection, 'projection_dim': out_dim}
+            index = build_faiss_index("flat", dim, params)
+            start = time.perf_counter()
+            index.train(corpus[:min(len(corpus), 50000)])  # type: ignore
+            train_s = time.perf_counter() - start
+            index.add(corpus)  # type: ignore
+            stats, ids = measure_latency(index.search, queries, k)
+
+            def rerank_search(q, k_):
+                _, shortlist = index.search(q, k_ * rerank_factor)  # type: ignore
+                return rerank_with_vectors(q, shortlist, corpus, k_)
+            _, rerank_ids = measure_latency(rerank_search, queries, k)
+            rows.append({'name': f"{projection}-{out_dim}", 'bytes': index_bytes_per_vector(index),
+                         'recall': recall_at_k(ids, truth), 'rerank_recall': recall_at_k(rerank_ids, truth),
+                         'train_s': train_s, **stats})
+
+    print(f"\n📊 Projection (n={len(corpus)}, k={k}, rerank shortlist={rerank_factor}k)")
+    print(f"{'index':<12}{'bytes/chunk':>12}{'vs full':>9}{'p50 ms':>10}{'train s':>9}"
+          f"{'recall@' + str(k):>11}{'+rerank':>9}")
+    full_bytes = rows[0]['bytes']
+    for row in rows:
+        print(f"{row['name']:<12}{row['bytes']:>12.1f}{full_bytes / row['bytes']:>8.1f}x{row['p50_ms']:>10.3f}"
+              f"{row['train_s']:>9.2f}{row['recall']:>11.3f}{row['rerank_recall']:>9.3f}")
+    return rows
+
+def benchmark_bulk(n_texts: int, model_name: str, workers: Tuple[int, ...] = (1, 2, 4, 8),
+                   backend: str = "torch", batch_size: int = 32) -> List[Dict[str, Any]]:
+    """Chunks/s of the multi-process bulk embedder against plain model.encode (model)"""
+    # Short lines mixed with long table-like chunks, as in a real bulletin archive
+    rng = np.random.default_rng(3)
+    texts = make_synthetic_texts(n_texts, min_words=3, max_words=20)
+    for i in rng.choice(n_texts, size=n_texts // 5, replace=False):
+        texts[i] = ' '.join([texts[i]] * 6)
+
+    model = load_encoder(model_name, backend)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    rows = [{'mode': f'encode (batch {batch_size})', 'workers': 1,
+             'chunks_per_s': n_texts / (time.perf_counter() - start), 'padding_efficiency': float('nan')}]
+
+    for n_workers in workers:
+        with BulkEmbedder(model_name, workers=n_workers, encoder_backend=backend,
+                          model=model if n_workers == 1 else None) as embedder:
+            if n_workers > 1:
+                embedder.encode(texts[:n_workers * 8])  # start workers and load models
+            start = time.perf_counter()
+            embedder.encode(texts)
+            elapsed = time.perf_counter() - start
+            rows.append({'mode': 'bulk', 'workers': n_workers, 'chunks_per_s': n_texts / elapsed,
+                         'padding_efficiency': embedder.stats['padding_efficiency']})
+
+    print(f"\n📊 Bulk embedding ({n_texts} mixed-length texts, {backend}, {os.cpu_count()} CPUs)")
+    print(f"{'mode':<20}{'workers':>8}{'chunks/s':>11}{'speedup':>9}{'padding eff':>13}")
+    base = rows[0]['chunks_per_s']
+    for row in rows:
+        print(f"{row['mode']:<20}{row['workers']:>8}{row['chunks_per_s']:>11.1f}"
+              f"{row['chunks_per_s'] / base:>8.2f}x{row['padding_efficiency']:>13.2f}")
+    return rows
+
+def benchmark_binary(n: int, dim: int, k: int, n_queries: int,
+                     candidates: Tuple[int, ...] = (50, 100, 200, 400, 800),
+                     vectors_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Recall@k and latency of Hamming search over sign codes, with and without float re-ranking"""
+    if vectors_path:
+        corpus, queries = load_vectors(vectors_path, dim, n, n_queries)
+    else:
+        print(f"🔄 Building synthetic corpus: {n} x {dim}")
+        corpus, queries = make_corpus_and_queries(n, n_queries, dim)
+    truth = ground_truth(corpus, queries, k)
+
+    flat = build_faiss_index("flat", dim)
+    flat.add(corpus)  # type: ignore
+    stats, ids = measure_latency(flat.search, queries, k)
+    rows = [{'name': 'flat', 'bytes': index_bytes_per_vector(flat), 'recall': recall_at_k(ids, truth), **stats}]
+
+    index = build_faiss_index("binary", dim)
+    start = time.perf_counter()
+    index.add(binarize(corpus))  # type: ignore
+    build_s = time.perf_counter() - start
+    bytes_per_vector = len(faiss.serialize_index_binary(index)) / max(index.ntotal, 1)
+    stats, ids = measure_latency(lambda q, k_: index.search(binarize(q), k_), queries, k)
+    rows.append({'name': 'binary', 'bytes': bytes_per_vector, 'recall': recall_at_k(ids, truth), **stats})
+
+    for shortlist in candidates:
+        def rerank_search(q, k_, shortlist=shortlist):
+            _, candidate_ids = index.search(binarize(q), max(shortlist, k_))  # type: ignore
+            return rerank_with_vectors(q, candidate_ids, corpus, k_)
+        stats, ids = measure_latency(rerank_search, queries, k)
+        # Float vectors live on disk in the store, so resident memory is the binary codes
+        rows.append({'name': f'binary+rerank@{shortlist}', 'bytes': bytes_per_vector,
+                     'recall': recall_at_k(ids, truth), **stats})
+
+    print(f"\n📊 Binary coarse search (n={len(corpus)}, dim={dim}, k={k}, build {build_s:.2f}s)")
+    print(f"{'mode':<22}{'bytes/vec':>10}{'p50 ms':>10}{'p99 ms':>10}{'recall@k':>10}")
+    for row in rows:
+        print(f"{row['name']:<22}{row['bytes']:>10.1f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+              f"{row['recall']:>10.3f}")
+    return rows
+
+def benchmark_concurrency(n: int, k: int, n_queries: int, model_name: str,
+                          readers: Tuple[int, ...] = (1, 2, 4, 8), batch: int = 256,
+                          checks_per_run: int = 200) -> List[Dict[str, Any]]:
+    """
+    Stress test of concurrent ingestion and search on one store (model)
+
+    Half the corpus is loaded up front; during each run one thread streams further
+    batches into the store while reader threads search it. Every sampled result must
+    equal brute-force search over a state the store published while that search ran
+    (a prefix of the corpus), so torn or mixed states are detected. Read throughput is
+    reported with and without ingestion for each reader count.
+    """
+    logging.getLogger('faiss_vector_store').setLevel(logging.WARNING)
+    omp_threads = faiss.omp_get_max_threads()
+    # One FAISS thread per search, so reader threads are the only source of parallelism
+    faiss.omp_set_num_threads(1)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FAISSVectorStore(model_name=model_name, vector_store_path=tmp,
+                                 embedding_cache_path=None, result_cache_size=0)
+        print(f"🔄 Building synthetic corpus: {n} x {store.embedding_dim}")
+        corpus, queries = make_corpus_and_queries(n, n_queries, store.embedding_dim)
+        chunks = [DocumentChunk(id=f"synthetic_{i}", text=f"chunk {i}", source="synthetic.pdf",
+                                page_number=0, chunk_type='text', metadata={}) for i in range(n)]
+        loaded = n // 2
+        store._index_chunks(chunks[:loaded], corpus[:loaded])
+        store.compact()
+        per_run = (n - loaded) // len(readers)
+        rng = np.random.default_rng(11)
+
+        def run(n_readers: int, ingest_until: int) -> Dict[str, Any]:
+            nonlocal loaded
+            done = threading.Event()
+            latencies: List[List[float]] = [[] for _ in range(n_readers)]
+            samples: List[List[Tuple[int, int, int, np.ndarray]]] = [[] for _ in range(n_readers)]
+            errors: List[BaseException] = []
+
+            def reader(slot: int):
+                try:
+                    for i in range(n_queries):
+                        qi = (slot * 7919 + i) % n_queries
+                        before = store.total_vectors
+                        start = time.perf_counter()
+                        results = store.search_embeddings(queries[qi:qi + 1], k)[0]
+                        latencies[slot].append((time.perf_counter() - start) * 1000)
+                        ids = np.array([int(r.chunk.id.split('_')[1]) for r in results])
+                        samples[slot].append((qi, before, store.total_vectors, ids))
+                except BaseException as e:
+                    errors.append(e)
+
+            def writer():
+                nonlocal loaded
+                while loaded < ingest_until and not done.is_set():
+                    end = min(loaded + batch, ingest_until)
+                    store._index_chunks(chunks[loaded:end], corpus[loaded:end])
+                    loaded = end
+
+            start_size = loaded
+            threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(n_readers)]
+            ingest = threading.Thread(target=writer)
+            start = time.perf_counter()
+            ingest.start()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            done.set()
+            ingest.join()
+
+            # Published sizes are the batch boundaries of this run
+            boundaries = sorted(set(range(start_size, loaded, batch)) | {loaded})
+            flat = [sample for slot_samples in samples for sample in slot_samples]
+            mismatches = 0
+            for position in rng.choice(len(flat), size=min(checks_per_run, len(flat)), replace=False):
+                qi, before, after, ids = flat[position]
+                candidates = [size for size in boundaries if before <= size <= after]
+                expected = [np.argsort(-(corpus[:size] @ queries[qi]))[:k] for size in candidates]
+                if not any(set(ids) == set(truth) for truth in expected):
+                    mismatches += 1
+            all_latencies = np.concatenate([np.array(l) for l in latencies])
+            return {'readers': n_readers, 'ingest': ingest_until > start_size, 'errors': len(errors),
+                    'mismatches': mismatches, 'qps': len(all_latencies) / elapsed,
+                    'p50_ms': float(np.percentile(all_latencies, 50)),
+                    'p99_ms': float(np.percentile(all_latencies, 99)),
+                    'ingested': loaded - start_size, 'ingest_per_s': (loaded - start_size) / elapsed}
+
+        for n_readers in readers:
+            rows.append(run(n_readers, loaded))
+            rows.append(run(n_readers, min(n, loaded + per_run)))
+        stats = store.get_statistics()['concurrency']
+        store.close()
+    faiss.omp_set_num_threads(omp_threads)
+
+    print(f"\n📊 Concurrent ingest + search (n={n}, k={k}, batch={batch}, {os.cpu_count()} CPUs)")
+    print(f"{'readers':>8}{'ingest':>8}{'QPS':>10}{'scaling':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'added/s':>10}{'errors':>8}{'wrong':>7}")
+    base = {ingest: row['qps'] for row in rows if row['readers'] == readers[0] for ingest in [row['ingest']]}
+    for row in rows:
+        print(f"{row['readers']:>8}{'yes' if row['ingest'] else 'no':>8}{row['qps']:>10.1f}"
+              f"{row['qps'] / base[row['ingest']]:>8.2f}x{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['ingest_per_s']:>10.0f}{row['errors']:>8}{row['mismatches']:>7}")
+    print(f"Writer: {stats['writer']}, compactions: {stats['compactions']}, "
+          f"delta at end: {stats['delta_vectors']} vectors in {stats['delta_pieces']} pieces")
+    return rows
+
+def make_hierarchical_corpus(n_documents: int, sections: int, chunks_per_section: int, n_queries: int,
+                             dim: int = 768, latent_dim: int = 64,
+                             seed: int = 7) -> Tuple[List[DocumentChunk], np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """
+    Synthetic bulletins: chunks scattered around section topics, sections around document topics
+
+    Returns:
+        Chunks, their embeddings, title embeddings (document and section headings near
+        their topics) and queries drawn near random chunks
+    """
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((latent_dim, dim)).astype(np.float32) / np.sqrt(latent_dim)
+
+    def embed(latent: np.ndarray) -> np.ndarray:
+        vectors = latent @ projection + 0.05 * rng.standard_normal((len(latent), dim)).astype(np.float32)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    documents = rng.standard_normal((n_documents, latent_dim)).astype(np.float32)
+    section_topics = documents[:, None] + 0.7 * rng.standard_normal((n_documents, sections, latent_dim)).astype(np.float32)
+    latent = (section_topics[:, :, None] + 0.6 * rng.standard_normal(
+        (n_documents, sections, chunks_per_section, latent_dim)).astype(np.float32)).reshape(-1, latent_dim)
+    vectors = embed(latent)
+    queries = embed(latent[rng.integers(0, len(latent), size=n_queries)] +
+                    0.4 * rng.standard_normal((n_queries, latent_dim)).astype(np.float32))
+
+    title_vectors = dict(zip((f"bulletin {d}" for d in range(n_documents)), embed(documents)))
+    title_vectors.update(zip((f"bulletin {d} section {s}" for d in range(n_documents) for s in range(sections)),
+                             embed(section_topics.reshape(-1, latent_dim))))
+    per_document = sections * chunks_per_section
+    chunks = [DocumentChunk(id=f"synthetic_{i}", text="", source=f"bulletin_{i // per_document}.pdf",
+                            page_number=0, chunk_type='text',
+                            metadata={'document_title': f"bulletin {i // per_document}",
+                                      'section': f"bulletin {i // per_document} section "
+                                                 f"{(i % per_document) // chunks_per_section}"})
+              for i in range(len(vectors))]
+    return chunks, vectors, title_vectors, queries
+
+def benchmark_hierarchical(n: int, dim: int, k: int, n_queries: int, sections: int = 8,
+                           chunks_per_section: int = 6, top_documents: int = 5,
+                           top_sections: int = 10) -> List[Dict[str, Any]]:
+    """
+    Hierarchical document → section → chunk search vs flat search as the corpus grows
+
+    Flat search cost grows linearly with the number of chunks. Hierarchical search
+    scans HNSW summary indexes, then only the chunks of the selected documents and
+    sections, so its latency should stay nearly flat. Recall is measured against
+    exact flat search.
+    """
+    per_document = sections * chunks_per_section
+    rows = []
+    for size in sorted({max(per_document, n // 16), max(per_document, n // 4), n}):
+        n_documents = max(1, size // per_document)
+        print(f"🔄 {n_documents} documents x {sections} sections x {chunks_per_section} chunks")
+        chunks, vectors, title_vectors, queries = make_hierarchical_corpus(
+            n_documents, sections, chunks_per_section, n_queries, dim)
+
+        start = time.perf_counter()
+        hierarchy = HierarchyState().add(chunks, 0, vectors, title_vectors)
+        build_s = time.perf_counter() - start
+
+        flat = faiss.IndexFlatIP(dim)
+        flat.add(vectors)  # type: ignore
+        flat_stats, truth = measure_latency(lambda q, kk: flat.search(q, kk), queries, k)  # type: ignore
+
+        def hierarchical_search(q: np.ndarray, kk: int) -> Tuple[np.ndarray, np.ndarray]:
+            scores, positions = hierarchy.search(q, kk, top_documents, top_sections)
+            ids = np.full((1, kk), -1, dtype=np.int64)
+            ids[0, :len(positions)] = positions
+            return scores[None], ids
+        hier_stats, found = measure_latency(hierarchical_search, queries, k)
+
+        searched = []
+        for i in range(min(len(queries), 100)):
+            selected = hierarchy.select(queries[i:i + 1], top_documents, top_sections)
+            searched.append(sum(len(hierarchy.documents[key].positions) if picked is None
+                                else int(np.isin(hierarchy.documents[key].section_of, list(picked)).sum())
+                                for key, picked in selected.items()))
+        rows.append({'chunks': len(vectors), 'documents': n_documents, 'build_s': build_s,
+                     'flat_p50_ms': flat_stats['p50_ms'], 'flat_p99_ms': flat_stats['p99_ms'],
+                     'hier_p50_ms': hier_stats['p50_ms'], 'hier_p99_ms': hier_stats['p99_ms'],
+                     'recall': recall_at_k(found, truth), 'searched': float(np.mean(searched))})
+
+    print(f"\n📊 Hierarchical vs flat search (k={k}, top_documents={top_documents}, top_sections={top_sections})")
+    print(f"{'chunks':>10}{'docs':>8}{'build s':>9}{'flat p50':>10}{'flat p99':>10}"
+          f"{'hier p50':>10}{'hier p99':>10}{'recall':>8}{'searched':>10}")
+    for row in rows:
+        print(f"{row['chunks']:>10}{row['documents']:>8}{row['build_s']:>9.1f}{row['flat_p50_ms']:>10.2f}"
+              f"{row['flat_p99_ms']:>10.2f}{row['hier_p50_ms']:>10.2f}{row['hier_p99_ms']:>10.2f}"
+              f"{row['recall']:>8.3f}{row['searched']:>10.0f}")
+    return rows
+
+def make_daily_bulletins(days: int, paragraphs: int = 12, boilerplate: int = 3, carried: float = 0.5,
+                         seed: int = 5) -> List[Dict[str, Any]]:
+    """
+    Synthetic consecutive daily bulletins as hybrid extractor analyses
+
+    Every day repeats the same disclaimer paragraphs and carries over a share of the
+    previous day's commentary, slightly reworded (one inserted word) or unchanged.
+    Carried paragraphs keep their figures; the rest of the day is new text.
+    """
+    rng = np.random.default_rng(seed)
+    disclaimers = make_synthetic_texts(boilerplate, 30, 40, seed=seed)
+    previous: List[str] = []
+    bulletins = []
+    for day in range(days):
+        commentary = []
+        for text in previous[:int(carried * len(previous))]:
+            if rng.random() < 0.5:
+                words = text.split()
+                words.insert(int(rng.integers(0, len(words))), str(rng.choice(FINANCE_VOCABULARY)))
+                text = ' '.join(words)
+            commentary.append(text)
+        fresh = make_synthetic_texts(paragraphs - len(commentary), 30, 60, seed=seed * 1000 + day)
+        commentary += [f"{text} {rng.integers(1, 99)},{rng.integers(0, 9)}" for text in fresh]
+        previous = commentary
+        pages = [{'sayfa': 1, 'başlık': 'Günlük Bülten', 'paragraflar': disclaimers + commentary}]
+        bulletins.append({'document_info': {'filename': f"2025{day // 28 + 7:02d}{day % 28 + 1:02d}_Gunluk_Bulten.pdf"},
+                          'pdf_content': {'pages': pages}})
+    return bulletins
+
+def benchmark_dedup(days: int, model_name: str, threshold: float = 0.8) -> List[Dict[str, Any]]:
+    """
+    Near-duplicate suppression on consecutive daily bulletins (model)
+
+    Ingests the same synthetic bulletin series with and without the MinHash LSH
+    detector and compares indexed vectors, index bytes and ingestion time.
+    """
+    logging.getLogger('faiss_vector_store').setLevel(logging.WARNING)
+    bulletins = make_daily_bulletins(days)
+    rows = []
+    for label, kwargs in (('all chunks', {}), (f"dedup >= {threshold}", {'near_duplicate_threshold': threshold})):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FAISSVectorStore(model_name=model_name, vector_store_path=tmp, embedding_cache_path=None, **kwargs)
+            start = time.perf_counter()
+            for bulletin in bulletins:
+                store.add_pdf_content(bulletin)
+            elapsed = time.perf_counter() - start
+            stats = store.get_statistics()
+            report = stats['near_duplicates'] or {}
+            rows.append({'mode': label, 'chunks': stats['performance_stats']['chunks_processed'],
+                         'vectors': store.total_vectors,
+                         'index_mb': store.total_vectors * stats['index_info']['bytes_per_chunk'] / 2 ** 20,
+                         'encode_s': stats['performance_stats']['encoding_seconds'], 'ingest_s': elapsed,
+                         'exact': report.get('exact_duplicates', 0), 'near': report.get('near_duplicates', 0),
+                         'saved_s': report.get('embedding_seconds_saved', 0.0)})
+            store.close()
+
+    print(f"\n📊 Near-duplicate suppression ({days} daily bulletins)")
+    print(f"{'mode':>14}{'chunks':>8}{'vectors':>9}{'index MB':>10}{'encode s':>10}{'ingest s':>10}"
+          f"{'exact':>7}{'near':>6}{'est. saved s':>14}")
+    for row in rows:
+        print(f"{row['mode']:>14}{row['chunks']:>8}{row['vectors']:>9}{row['index_mb']:>10.2f}{row['encode_s']:>10.2f}"
+              f"{row['ingest_s']:>10.2f}{row['exact']:>7}{row['near']:>6}{row['saved_s']:>14.2f}")
+    return rows
+
+def batch_latency(search_fn, queries: np.ndarray, k: int) -> float:
+    """Milliseconds per query of one batched search over all queries"""
+    start = time.perf_counter()
+    search_fn(queries, k)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+def benchmark_numpy(n: int, dim: int, k: int, n_queries: int) -> List[Dict[str, Any]]:
+    """
+    Pure-NumPy float16 flat index vs FAISS flat at n/100, n/10 and n vectors
+
+    The NumPy index (the fallback used when faiss cannot be installed) is measured
+    in memory and memory-mapped from a file, as NumpyVectorStore uses it. Recall
+    is measured against exact FAISS flat search; float16 storage only perturbs
+    near-ties. Converting float16 blocks to float32 dominates single-query
+    latency, so per-query time of one batched search (search_many) is reported too.
+    """
+    print(f"🔄 Building synthetic corpus: {n} x {dim}")
+    corpus, queries = make_corpus_and_queries(n, n_queries, dim)
+    rows = []
+    for size in sorted({max(1000, n // 100), max(1000, n // 10), n}):
+        vectors = corpus[:size]
+        flat = faiss.IndexFlatIP(dim)
+        flat.add(vectors)  # type: ignore
+        flat_stats, truth = measure_latency(lambda q, kk: flat.search(q, kk), queries, k)  # type: ignore
+        rows.append({'vectors': size, 'name': 'faiss flat', 'mb': size * dim * 4 / 2 ** 20,
+                     'recall': 1.0, 'batch_ms': batch_latency(flat.search, queries, k), **flat_stats})
+        del flat
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, path in (('numpy f16', None), ('numpy f16 mmap', os.path.join(tmp, "vectors.f16"))):
+                index = NumpyFlatIndex(dim, path)
+                for start in range(0, size, 65536):
+                    index.add(vectors[start:start + 65536])
+                stats, found = measure_latency(index.search, queries, k)
+                rows.append({'vectors': size, 'name': name, 'mb': index.nbytes / 2 ** 20,
+                             'recall': recall_at_k(found, truth), 'batch_ms': batch_latency(index.search, queries, k),
+                             **stats})
+                del index
+
+    print(f"\n📊 NumPy fallback vs FAISS flat (k={k}, queries={n_queries})")
+    print(f"{'vectors':>10}  {'index':<16}{'MB':>10}{'p50 ms':>10}{'p99 ms':>10}{'batch ms/q':>12}"
+          f"{'recall@' + str(k):>12}")
+    for row in rows:
+        print(f"{row['vectors']:>10}  {row['name']:<16}{row['mb']:>10.1f}{row['p50_ms']:>10.2f}"
+              f"{row['p99_ms']:>10.2f}{row['batch_ms']:>12.3f}{row['recall']:>12.3f}")
+    return rows
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_shard_servers(n_nodes: int, root: str, model_name: str,
+                        startup_timeout: float = 300.0) -> Tuple[Dict[str, str], Dict[str, subprocess.Popen]]:
+    """
+    Start shard_server.py processes on local ports, standing in for nodes
+
+    Returns:
+        (node name -> URL, node name -> process)
+    """
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shard_server.py")
+    nodes, processes = {}, {}
+    for i in range(n_nodes):
+        name, port = f"node{i + 1}", _free_port()
+        path = os.path.join(root, name)
+        processes[name] = subprocess.Popen(
+            [sys.executable, server, '--name', name, '--port', str(port), '--vector-store-path', path,
+             '--model', model_name, '--embedding-cache-path', os.path.join(path, "embeddings.sqlite"),
+             '--flush-interval', '3600'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        nodes[name] = f"http://127.0.0.1:{port}"
+
+    coordinator = ShardCoordinator(nodes, timeout=1.0)
+    deadline = time.time() + startup_timeout
+    while True:
+        health = coordinator.health()
+        if all(node['status'] == 'healthy' for node in health.values()):
+            break
+        if time.time() > deadline or any(process.poll() is not None for process in processes.values()):
+            for process in processes.values():
+                process.kill()
+            raise RuntimeError(f"Shard servers did not start: {health}")
+        time.sleep(0.5)
+    coordinator.close()
+    return nodes, processes
+
+def benchmark_shards(days: int, k: int, n_queries: int, model_name: str, n_nodes: int = 3,
+                     timeout: float = 1.0, degraded_queries: int = 30) -> List[Dict[str, Any]]:
+    """
+    Scatter-gather search over local shard server processes (model)
+
+    Bulletins are routed to nodes by consistent hashing. Merged results are
+    compared with one store holding every bulletin: all healthy, one node
+    stopped with SIGSTOP (slow: answers never arrive before the deadline) and
+    one node killed (missing). Healthy recall should be 1.0; degraded scenarios
+    must still answer within the deadline, with partial results.
+    """
+    logging.getLogger('faiss_vector_store').setLevel(logging.WARNING)
+    logging.getLogger('shard_coordinator').setLevel(logging.ERROR)
+    # No repeated paragraphs: identical texts in several bulletins would tie and make recall ambiguous
+    bulletins = make_daily_bulletins(days, boilerplate=0, carried=0.0)
+    queries = make_synthetic_texts(n_queries, 4, 10, seed=7)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = FAISSVectorStore(model_name=model_name, vector_store_path=os.path.join(tmp, "reference"),
+                                     embedding_cache_path=None)
+        for bulletin in bulletins:
+            reference.add_pdf_content(bulletin)
+        truth = [[r.chunk.id for r in results] for results in reference.search_many(queries, k=k)]
+        reference.close()
+
+        print(f"🔄 Starting {n_nodes} shard servers")
+        nodes, processes = start_shard_servers(n_nodes, tmp, model_name)
+        coordinator = ShardCoordinator(nodes, timeout=timeout)
+        try:
+            placement: Dict[str, int] = {}
+            for bulletin in bulletins:
+                name = coordinator.add_pdf_content(bulletin)
+                placement[name] = placement.get(name, 0) + 1
+            print(f"📦 Documents per node: {dict(sorted(placement.items()))}")
+
+            def run(scenario: str, count: int):
+                latencies, recalls, partial = [], [], 0
+                for qi in range(count):
+                    start = time.perf_counter()
+                    gathered = coordinator.scatter([queries[qi]], k)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    found = {r.chunk.id for r in gathered.results[0]}
+                    recalls.append(len(found & set(truth[qi])) / max(len(truth[qi]), 1))
+                    partial += gathered.partial
+                rows.append({'scenario': scenario, 'queries': count,
+                             'p50_ms': float(np.percentile(latencies, 50)),
+                             'p99_ms': float(np.percentile(latencies, 99)),
+                             'recall': float(np.mean(recalls)), 'partial': partial / count})
+
+            run("healthy", n_queries)
+            victim = sorted(nodes)[0]
+            if hasattr(signal, 'SIGSTOP'):
+                processes[victim].send_signal(signal.SIGSTOP)
+                run(f"{victim} slow", min(n_queries, degraded_queries))
+                processes[victim].send_signal(signal.SIGCONT)
+            processes[victim].kill()
+            processes[victim].wait()
+            run(f"{victim} down", min(n_queries, degraded_queries))
+            stats = coordinator.get_statistics()
+        finally:
+            coordinator.close()
+            for process in processes.values():
+                process.kill()
+                process.wait()
+
+    print(f"\n📊 Scatter-gather over {n_nodes} local shard servers ({days} bulletins, k={k}, deadline {timeout:.1f}s)")
+    print(f"{'scenario':>14}{'queries':>9}{'p50 ms':>10}{'p99 ms':>10}{'recall@' + str(k):>12}{'partial':>9}")
+    for row in rows:
+        print(f"{row['scenario']:>14}{row['queries']:>9}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+              f"{row['recall']:>12.3f}{row['partial']:>8.0%}")
+    print(f"Coordinator: {stats}")
+    return rows
+
+def main():
+    """Run vector store benchmarks"""
+    parser = argparse.ArgumentParser(description="FAISS vector store benchmarks")
+    parser.add_argument('benchmark', choices=['hnsw', 'quantization', 'batch', 'mmr', 'encoders', 'projection', 'bulk', 'binary',
+                                              'concurrency', 'hierarchical', 'dedup', 'numpy', 'shards'])
+    parser.add_argument('--n', type=int, default=100000, help="Corpus size (bulletin days for dedup, shards)")
+    parser.add_argument('--dim', type=int, default=768, help="Embedding dimension")
+    parser.add_argument('--k', type=int, default=10, help="Top-k")
+    parser.add_argument('--queries', type=int, default=500, help="Number of queries")
+    parser.add_argument('--model', default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                        help="Embedding model (encoders, bulk, concurrency, dedup, shards)")
+    parser.add_argument('--onnx-path', help="ONNX export directory (encoders)")
+    parser.add_argument('--backend', default="torch", help="Encoder backend (bulk)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts (bulk), reader threads (concurrency)")
+    parser.add_argument('--nodes', type=int, default=3, help="Local shard server processes (shards)")
+    parser.add_argument('--vectors', help="Real embeddings (.npy or raw float32) instead of synthetic (projection, binary)")
+    args = parser.parse_args()
+
+    print("🚀 Vector Store Benchmark")
+    print("=" * 40)
+
+    if args.benchmark == 'hnsw':
+        benchmark_hnsw(args.n, args.dim, args.k, args.queries)
+    elif args.benchmark == 'quantization':
+        benchmark_quantization(args.n, args.dim, args.k, args.queries)
+    elif args.benchmark == 'batch':
+        benchmark_batch_search(args.n, args.queries, args.k)
+    elif args.benchmark == 'mmr':
+        benchmark_mmr(args.n, args.dim, args.k, args.queries)
+    elif args.benchmark == 'encoders':
+        benchmark_encoders(args.n, args.queries, args.k, args.model, args.onnx_path)
+    elif args.benchmark == 'projection':
+        benchmark_projection(args.n, args.dim, args.k, args.queries, vectors_path=args.vectors)
+    elif args.benchmark == 'bulk':
+        benchmark_bulk(args.n, args.model, tuple(args.workers), args.backend)
+    elif args.benchmark == 'binary':
+        benchmark_binary(args.n, args.dim, args.k, args.queries, vectors_path=args.vectors)
+    elif args.benchmark == 'concurrency':
+        benchmark_concurrency(args.n, args.k, args.queries, args.model, tuple(args.workers))
+    elif args.benchmark == 'hierarchical':
+        benchmark_hierarchical(args.n, args.dim, args.k, args.queries)
+    elif args.benchmark == 'dedup':
+        benchmark_dedup(args.n, args.model)
+    elif args.benchmark == 'numpy':
+        benchmark_numpy(args.n, args.dim, args.k, args.queries)
+    elif args.benchmark == 'shards':
+        benchmark_shards(args.n, args.k, args.queries, args.model, args.nodes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+🏭 Bulk Embedder
+===============
+Multi-process embedding for bulk backfills of the bulletin archive.
+
+Texts are sorted by token length and cut into batches under a padded-token
+budget (batch size x longest text), so short lines are not padded up to the
+length of a table JSON chunk. Batches are spread over a pool of worker
+processes, each with its own model copy and a share of the CPU threads, and
+results are yielded as soon as each batch finishes so they can be streamed
+into the index.
+
+Usage:
+    python scripts/bulk_embedder.py backfill --analysis-dir analysis_output \\
+        --vector-store vector_store --workers 8
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .model_registry import acquire_encoder
+    from .turkish_chunker import TokenAwareChunker, SPECIAL_TOKENS_PER_INPUT
+except ImportError:
+    from model_registry import acquire_encoder
+    from turkish_chunker import TokenAwareChunker, SPECIAL_TOKENS_PER_INPUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_TOKENS = 8192
+DEFAULT_MAX_BATCH_SIZE = 256
+
+def plan_batches(token_counts: Sequence[int], max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> List[np.ndarray]:
+    """
+    Group text positions into length-sorted batches under a padded-token budget
+
+    Args:
+        token_counts: Token count per text (including special tokens)
+        max_batch_tokens: Budget for batch size x longest text in the batch
+        max_batch_size: Upper bound on texts per batch
+
+    Returns:
+        Batches of text positions, shortest texts first
+    """
+    counts = np.asarray(token_counts, dtype=np.int64)
+    order = np.argsort(counts, kind='stable')
+    batches, start = [], 0
+    while start < len(order):
+        end = start + 1
+        # Sorted ascending, so the last text of a candidate batch is its longest
+        while (end < len(order) and end - start < max_batch_size and
+               (end - start + 1) * counts[order[end]] <= max_batch_tokens):
+            end += 1
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+def padding_efficiency(token_counts: Sequence[int], batches: Sequence[Sequence[int]]) -> float:
+    """Real tokens / padded tokens for a batch plan (1.0 = no padding)"""
+    counts = np.asarray(token_counts, dtype=np.int64)
+    padded = sum(len(batch) * counts[batch].max() for batch in batches if len(batch))
+    return float(counts.sum() / padded) if padded else 1.0
+
+# Worker process state; each worker loads its own model once
+_worker_model: Any = None
+
+def _init_worker(model_name: str, backend: str, onnx_path: Optional[str], num_threads: int):
+    global _worker_model
+    _worker_model = acquire_encoder(model_name, backend, onnx_path, num_threads=num_threads)
+
+def _encode_with(model: Any, texts: List[str]) -> np.ndarray:
+    """Encode one planned batch as a single forward pass"""
+    embeddings = model.encode(texts, batch_size=len(texts), convert_to_numpy=True,
+                              normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(embeddings, dtype=np.float32)
+
+def _encode_batch(job: Tuple[np.ndarray, List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    positions, texts = job
+    return positions, _encode_with(_worker_model, texts)
+
+class BulkEmbedder:
+    """Length-bucketed, token-budgeted embedding over a pool of worker processes"""
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 workers: Optional[int] = None,
+                 encoder_backend: str = "torch",
+                 onnx_path: Optional[str] = None,
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 model: Optional[Any] = None,
+                 chunker: Optional[TokenAwareChunker] = None):
+        """
+        Initialize bulk embedder
+
+        Args:
+            model_name: Sentence transformer model name
+            workers: Worker processes (default: CPU count; 1 = encode in this process)
+            encoder_backend: Embedding backend for the workers ('torch', 'int8', 'onnx')
+            onnx_path: Exported ONNX model directory for the 'onnx' backend
+            max_batch_tokens: Padded-token budget per batch
+            max_batch_size: Upper bound on texts per batch
+            model: Already loaded encoder used when workers == 1
+            chunker: Token counter for the model (default: the model's tokenizer)
+        """
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.encoder_backend = encoder_backend
+        self.onnx_path = onnx_path
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.model = model
+        if chunker is None:
+            chunker = (TokenAwareChunker.from_model(model) if model is not None
+                       else TokenAwareChunker.from_pretrained(model_name))
+        self.chunker = chunker
+        self._pool = None
+        self.stats = {'texts': 0, 'batches': 0, 'encode_time': 0.0, 'padding_efficiency': 1.0}
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Each worker gets an equal share of the cores for intra-op parallelism
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            context = mp.get_context('spawn')  # fork is unsafe with initialized torch/OpenMP
+            self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                      initargs=(self.model_name, self.encoder_backend, self.onnx_path, threads))
+            logger.info(f"🏭 Started {self.workers} embedding workers ({threads} threads each)")
+        return self._pool
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts without special tokens (stored as chunk metadata)"""
+        return self.chunker.count_tokens(texts)
+
+    def iter_embeddings(self, texts: List[str],
+                        token_counts: Optional[List[int]] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Encode texts, yielding batches as they complete (not in input order)
+
+        Args:
+            texts: Texts to embed
+            token_counts: Precomputed token counts (without special tokens)
+
+        Yields:
+            (positions in `texts`, normalized float32 embeddings)
+        """
+        if not texts:
+            return
+        if token_counts is None:
+            token_counts = self.count_tokens(texts)
+        # The model truncates at max_seq_length, so longer texts cost no more than that
+        max_len = self.chunker.max_tokens + SPECIAL_TOKENS_PER_INPUT
+        padded_counts = [min(count + SPECIAL_TOKENS_PER_INPUT, max_len) for count in token_counts]
+        batches = plan_batches(padded_counts, self.max_batch_tokens, self.max_batch_size)
+        self.stats['padding_efficiency'] = padding_efficiency(padded_counts, batches)
+        jobs = [(batch, [texts[i] for i in batch]) for batch in batches]
+
+        start_time = time.time()
+        if self.workers <= 1:
+            if self.model is None:
+                self.model = acquire_encoder(self.model_name, self.encoder_backend, self.onnx_path)
+            results = ((positions, _encode_with(self.model, batch_texts)) for positions, batch_texts in jobs)
+        else:
+            # Longest batches first so stragglers do not extend the tail
+            results = self._get_pool().imap_unordered(_encode_batch, reversed(jobs))
+        for positions, embeddings in results:
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(positions)
+            yield positions, embeddings
+        self.stats['encode_time'] += time.time() - start_time
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts and return embeddings in input order"""
+        embeddings: Optional[np.ndarray] = None
+        for positions, batch_embeddings in self.iter_embeddings(texts):
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+            embeddings[positions] = batch_embeddings
+        return embeddings if embeddings is not None else np.zeros((0, 0), dtype=np.float32)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Throughput and padding statistics"""
+        encode_time = self.stats['encode_time']
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'texts_per_s': self.stats['texts'] / encode_time if encode_time else 0.0
+        }
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "BulkEmbedder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def backfill(analysis_dir: str, vector_store_path: str, workers: Optional[int] = None,
+             encoder_backend: str = "torch", max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+             **store_kwargs) -> Dict[str, Any]:
+    """
+    Embed every analysis file of an archive into a vector store with a worker pool
+
+    Args:
+        analysis_dir: Directory of *_complete_analysis.json files
+        vector_store_path: Vector store to create or extend
+        workers: Worker processes
+        encoder_backend: Embedding backend for the workers
+        max_batch_tokens: Padded-token budget per batch
+        **store_kwargs: Passed to FAISSVectorStore (index_type, rerank, ...)
+
+    Returns:
+        Backfill statistics
+    """
+    try:
+        from .faiss_vector_store import FAISSVectorStore
+    except ImportError:
+        from faiss_vector_store import FAISSVectorStore
+
+    store = FAISSVectorStore(vector_store_path=vector_store_path, encoder_backend=encoder_backend, **store_kwargs)
+    store.load_vector_store()
+    chunks = []
+    files = sorted(Path(analysis_dir).glob("*_complete_analysis.json"))
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            chunks.extend(store.build_chunks(json.load(f)))
+    logger.info(f"📚 {len(chunks)} chunks from {len(files)} analysis files")
+
+    with BulkEmbedder(store.model_name, workers=workers, encoder_backend=encoder_backend,
+                      max_batch_tokens=max_batch_tokens, chunker=store.chunker) as embedder:
+        store.add_chunks_bulk(chunks, embedder)
+        stats = embedder.get_stats()
+    store.save_vector_store()
+    return {'files': len(files), 'chunks': len(chunks), **stats}
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process bulk embedding")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="Embed an archive of analysis files")
+    backfill_parser.add_argument("--analysis-dir", default="analysis_output")
+    backfill_parser.add_argument("--vector-store", default="vector_store")
+    backfill_parser.add_argument("--workers", type=int, default=None)
+    backfill_parser.add_argument("--backend", default="torch", help="torch | int8 | onnx")
+    backfill_parser.add_argument("--max-batch-tokens", type=int, default=DEFAULT_MAX_BATCH_TOKENS)
+    backfill_parser.add_argument("--index-type", default="flat")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+    stats = backfill(args.analysis_dir, args.vector_store, args.workers, args.backend,
+                     args.max_batch_tokens, index_type=args.index_type)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+🧱 Document Chunks
+=================
+Chunk and search-result types, and the conversion of PDF analysis results
+into chunks, shared by every vector store backend.
+
+Nothing here imports FAISS, so the NumPy fallback store (numpy_vector_index.py)
+works on hosts where faiss wheels cannot be installed. FAISSVectorStore
+re-exports these names, so `from faiss_vector_store import DocumentChunk`
+and chunk pickles written before the move keep working.
+
+Features:
+- DocumentChunk / SearchResult dataclasses
+- Attribute and metadata filters (including sources of suppressed duplicates)
+- Section-aware text, table and chart chunking of hybrid extractor output
+- JSON round-trip of search results for shard servers (see shard_server.py)
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .turkish_chunker import TokenAwareChunker
+except ImportError:
+    from turkish_chunker import TokenAwareChunker
+
+# Over-fetch multiplier (and refetch growth factor) used when search results are filtered after retrieval
+FILTER_OVERSAMPLE = 4
+
+@dataclass
+class DocumentChunk:
+    """Document chunk with metadata"""
+    id: str
+    text: str
+    source: str
+    page_number: int
+    chunk_type: str  # 'text', 'table', 'chart', 'ocr'
+    metadata: Dict[str, Any]
+    embedding: Optional[np.ndarray] = None
+
+@dataclass
+class SearchResult:
+    """Search result with relevance score"""
+    chunk: DocumentChunk
+    score: float
+    rank: int
+    dense_score: Optional[float] = None
+    lexical_score: Optional[float] = None
+
+def _matches_value(value: Any, expected: Any) -> bool:
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return value in expected
+    return value == expected
+
+def matches_filters(chunk: DocumentChunk, filters: Dict[str, Any]) -> bool:
+    """
+    Check a chunk against attribute/metadata filters (list/set values match any)
+
+    A source filter also matches the sources of the chunk's suppressed duplicates.
+    """
+    for key, expected in filters.items():
+        value = getattr(chunk, key) if key in DocumentChunk.__dataclass_fields__ else chunk.metadata.get(key)
+        if _matches_value(value, expected):
+            continue
+        if key == 'source' and any(_matches_value(link['source'], expected)
+                                   for link in chunk.metadata.get('duplicate_sources', ())):
+            continue
+        return False
+    return True
+
+def result_to_dict(result: SearchResult) -> Dict[str, Any]:
+    """JSON-serializable search result (without the chunk embedding)"""
+    chunk = result.chunk
+    return {
+        'chunk': {'id': chunk.id, 'text': chunk.text, 'source': chunk.source, 'page_number': chunk.page_number,
+                  'chunk_type': chunk.chunk_type, 'metadata': chunk.metadata},
+        'score': result.score,
+        'rank': result.rank,
+        'dense_score': result.dense_score,
+        'lexical_score': result.lexical_score
+    }
+
+def result_from_dict(data: Dict[str, Any]) -> SearchResult:
+    """Search result rebuilt from result_to_dict output"""
+    return SearchResult(chunk=DocumentChunk(**data['chunk']), score=data['score'], rank=data['rank'],
+                        dense_score=data.get('dense_score'), lexical_score=data.get('lexical_score'))
+
+def document_source(pdf_analysis: Dict[str, Any]) -> str:
+    """Source filename that chunks of an analysis result are attributed to"""
+    return (pdf_analysis.get('document_info', {}).get('filename')
+            or pdf_analysis.get('filename', 'unknown'))
+
+def page_title(page: Dict[str, Any]) -> Optional[str]:
+    """Extracted page title, or None for the "Sayfa N" placeholder"""
+    title = page.get('başlık')
+    return title if title and title != f"Sayfa {page.get('sayfa', 0)}" else None
+
+def generate_chunk_id(text: str, source: str, page_number: int) -> str:
+    """Generate unique chunk ID"""
+    content = f"{source}_{page_number}_{text[:100]}"
+    return hashlib.md5(content.encode()).hexdigest()
+
+def build_chunks(pdf_analysis: Dict[str, Any], chunker: TokenAwareChunker) -> List[DocumentChunk]:
+    """
+    Turn PDF analysis results into chunks without embedding them
+
+    Args:
+        pdf_analysis: PDF analysis results from hybrid extractor
+        chunker: Tokenizer-aware chunker of the embedding model
+
+    Returns:
+        Text, table and chart chunks of the document
+    """
+    chunks_to_add = []
+    filename = document_source(pdf_analysis)
+    pages = pdf_analysis.get('pdf_content', {}).get('pages', [])
+
+    # Sections start at real page titles (not the "Sayfa N" placeholder) and at
+    # font-size headings inside a page; they run on across pages until the next one
+    document_title = next((page['başlık'] for page in pages if page_title(page)), Path(filename).stem)
+    section = document_title
+    page_sections: Dict[int, str] = {}
+
+    # Process text content
+    for page in pages:
+        page_num = page.get('sayfa', 0)
+        section = page_title(page) or section
+        page_sections[page_num] = section
+
+        # Process paragraphs; short paragraphs of a section are packed together
+        headings = set(page.get('bölüm_başlıkları', []))
+        runs: List[Tuple[str, List[str]]] = []
+        for paragraph in (p for p in page.get('paragraflar', []) if p.strip()):
+            if paragraph in headings or not runs:
+                section = paragraph if paragraph in headings else section
+                runs.append((section, []))
+            runs[-1][1].append(paragraph)
+
+        for run_section, paragraphs in runs:
+            for text_chunk in chunker.chunk_stream(paragraphs):
+                chunk_id = generate_chunk_id(text_chunk.text, filename, page_num)
+                chunk = DocumentChunk(
+                    id=chunk_id,
+                    text=text_chunk.text,
+                    source=filename,
+                    page_number=page_num,
+                    chunk_type='text',
+                    metadata={'paragraph': True, 'token_count': text_chunk.token_count,
+                              'section': run_section, 'document_title': document_title}
+                )
+                chunks_to_add.append(chunk)
+
+    # Process table content
+    if 'pdf_content' in pdf_analysis and 'tables' in pdf_analysis['pdf_content']:
+        for table in pdf_analysis['pdf_content']['tables']:
+            page_num = table.get('sayfa', 0)
+            table_text = json.dumps(table, ensure_ascii=False)
+
+            chunk_id = generate_chunk_id(table_text, filename, page_num)
+            chunk = DocumentChunk(
+                id=chunk_id,
+                text=table_text,
+                source=filename,
+                page_number=page_num,
+                chunk_type='table',
+                metadata={'table': True, 'table_data': table,
+                          'section': page_sections.get(page_num, document_title),
+                          'document_title': document_title}
+            )
+            chunks_to_add.append(chunk)
+
+    # Process chart content
+    if 'chart_analysis' in pdf_analysis:
+        for chart in pdf_analysis['chart_analysis']['charts']:
+            page_num = chart.get('source_page', 0)
+
+            # Chart title and labels
+            chart_text_parts = []
+            if chart.get('title'):
+                chart_text_parts.append(f"Başlık: {chart['title']}")
+            if chart.get('x_axis_label'):
+                chart_text_parts.append(f"X Ekseni: {chart['x_axis_label']}")
+            if chart.get('y_axis_label'):
+                chart_text_parts.append(f"Y Ekseni: {chart['y_axis_label']}")
+
+            # Chart data points
+            for point in chart.get('data_points', []):
+                if point.get('label'):
+                    chart_text_parts.append(f"Veri: {point['label']}")
+
+            # OCR extracted text
+            for ocr_text in chart.get('extracted_text', []):
+                if ocr_text.strip():
+                    chart_text_parts.append(f"OCR: {ocr_text}")
+
+            if chart_text_parts:
+                chart_text = ' | '.join(chart_text_parts)
+                chunk_id = generate_chunk_id(chart_text, filename, page_num)
+                chunk = DocumentChunk(
+                    id=chunk_id,
+                    text=chart_text,
+                    source=filename,
+                    page_number=page_num,
+                    chunk_type='chart',
+                    metadata={'chart': True, 'chart_type': chart.get('chart_type'), 'chart_data': chart,
+                              'section': page_sections.get(page_num, document_title),
+                              'document_title': document_title}
+                )
+                chunks_to_add.append(chunk)
+
+    return chunks_to_add
@@ -0,0 +1,338 @@
+"""
+⚡ Embedding Backends
+====================
+Pluggable CPU encoder backends with a SentenceTransformer-compatible interface.
+
+Backends:
+- torch: the original full-precision SentenceTransformer
+- int8:  the same model with Linear layers dynamically quantized to int8 (no export needed)
+- onnx:  ONNX Runtime session over an exported graph (mean pooling inside the graph),
+         optionally with int8 dynamically quantized weights
+
+Export and calibration:
+    python scripts/embedding_backends.py export \\
+        --model sentence-transformers/paraphrase-multilingual-mpnet-base-v2 \\
+        --calibration-file analysis_output/<doc>_complete_analysis.json
+
+Calibration encodes representative chunk texts with the original model and
+each exported variant and records their cosine agreement in encoder_config.json.
+The int8 graph is only served when it meets the agreement threshold.
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODELS_DIR = PROJECT_ROOT / "models"
+
+ENCODER_BACKENDS = ("torch", "int8", "onnx")
+
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+ENCODER_CONFIG_FILE = "encoder_config.json"
+
+# Minimum mean cosine agreement with the original model for the int8 graph to be served
+DEFAULT_MIN_COSINE = 0.98
+
+# Used when no calibration texts are given
+CALIBRATION_SAMPLES = [
+    "Merkez Bankası politika faizini yüzde 50 seviyesinde sabit tuttu.",
+    "Yıllık TÜFE enflasyonu ağustos ayında %33,5'e geriledi.",
+    "BIST-100 endeksi günü 9.876,54 puandan tamamladı.",
+    "Cari işlemler açığı 2,1 milyar dolar olarak gerçekleşti.",
+    "Bütçe dengesi ilk yarıda 1.234,5 milyar TL açık verdi.",
+    "USD/TRY kuru haftalık bazda %1,2 yükseldi.",
+    "İhracat bir önceki yılın aynı ayına göre %8 arttı.",
+    "Çekirdek enflasyondaki ana eğilim yavaşlamaya devam ediyor.",
+    "Kredi büyümesi makroihtiyati tedbirlerle sınırlandırıldı.",
+    "Dış ticaret açığı enerji fiyatlarındaki düşüşle daraldı.",
+]
+
+def default_onnx_dir(model_name: str) -> Path:
+    """Default export directory for a model (models/<model basename>-onnx)"""
+    return MODELS_DIR / f"{model_name.rstrip('/').split('/')[-1]}-onnx"
+
+def cache_model_key(model_name: str, backend: str) -> str:
+    """Embedding cache key; quantized backends get their own entries"""
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+class OnnxEncoder:
+    """ONNX Runtime sentence encoder with the SentenceTransformer.encode interface"""
+
+    def __init__(self, model_dir: Union[str, Path], quantized: Optional[bool] = None,
+                 num_threads: Optional[int] = None):
+        """
+        Initialize encoder
+
+        Args:
+            model_dir: Directory produced by export_onnx
+            quantized: Use the int8 graph (None = use it if calibration accepted it)
+            num_threads: ONNX Runtime intra-op threads (None = runtime default)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / ENCODER_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        if quantized is None:
+            quantized = bool(self.config.get('calibration', {}).get('int8_accepted', False))
+        model_file = self.model_dir / (ONNX_INT8_FILE if quantized else ONNX_FP32_FILE)
+        if not model_file.exists():
+            raise FileNotFoundError(f"ONNX model not found: {model_file}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.model_file = model_file
+        self.session = ort.InferenceSession(str(model_file), options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.max_seq_length = self.config['max_seq_length']
+        self.quantized = quantized
+        logger.info(f"✅ ONNX encoder loaded: {model_file.name}")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['embedding_dim']
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        """Encode sentences; arguments mirror SentenceTransformer.encode"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Length-sorted batches keep padding (and wasted compute) low
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch_ids = order[start:start + batch_size]
+            encoded = self.tokenizer([texts[i] for i in batch_ids], padding=True, truncation=True,
+                                     max_length=self.max_seq_length, return_tensors='np')
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            embeddings[batch_ids] = self.session.run(None, feeds)[0]
+
+        if normalize_embeddings:
+            embeddings = _normalize(embeddings)
+        return embeddings[0] if single else embeddings
+
+def quantize_int8(model: Any) -> Any:
+    """Dynamically quantize a SentenceTransformer's Linear layers to int8 (CPU inference)"""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_encoder(model_name: str, backend: str = "torch", onnx_path: Optional[str] = None,
+                 num_threads: Optional[int] = None) -> Any:
+    """
+    Load an embedding model with the requested backend
+
+    Args:
+        model_name: Sentence transformer model name
+        backend: 'torch', 'int8' or 'onnx'
+        onnx_path: Export directory for the onnx backend (default: models/<name>-onnx)
+        num_threads: CPU threads for inference (None = library default)
+
+    Returns:
+        Encoder exposing encode(), get_sentence_embedding_dimension() and max_seq_length
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unsupported encoder backend: {backend}")
+    if backend == "onnx":
+        return OnnxEncoder(onnx_path or default_onnx_dir(model_name), num_threads=num_threads)
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    model = SentenceTransformer(model_name, device='cpu' if backend == "int8" else None)
+    if backend == "int8":
+        model = quantize_int8(model)
+        logger.info("✅ Linear layers quantized to int8")
+    return model
+
+def _pooled_encoder(transformer: Any, pooling: str) -> Any:
+    """Transformer plus pooling as one module, so the exported graph outputs sentence embeddings"""
+    import torch
+
+    class PooledEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask):
+            token_embeddings = self.transformer(input_ids=input_ids, attention_mask=attention_mask)[0]
+            if pooling == 'cls':
+                return token_embeddings[:, 0]
+            mask = attention_mask.unsqueeze(-1).to(token_embeddings.dtype)
+            return (token_embeddings * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+
+    return PooledEncoder()
+
+def export_onnx(model_name: str, output_dir: Union[str, Path], quantize: bool = True,
+                opset: int = 17) -> Path:
+    """
+    Export a SentenceTransformer to ONNX (and an int8 dynamically quantized copy)
+
+    Args:
+        model_name: Sentence transformer model name or path
+        output_dir: Export directory
+        quantize: Also write the int8 graph
+        opset: ONNX opset version
+
+    Returns:
+        Export directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer_module, pooling_module = model[0], model[1]
+    pooling = getattr(pooling_module, 'pooling_mode', None)  # sentence-transformers >= 6
+    if not isinstance(pooling, str):
+        pooling = ('mean' if getattr(pooling_module, 'pooling_mode_mean_tokens', False) else
+                   'cls' if getattr(pooling_module, 'pooling_mode_cls_token', False) else None)
+    if pooling not in ('mean', 'cls'):
+        raise ValueError("Only mean or CLS pooling models can be exported")
+
+    encoder = _pooled_encoder(transformer_module.auto_model, pooling).eval()
+    dummy = transformer_module.tokenizer(["Merkez Bankası faizi sabit tuttu."], return_tensors='pt')
+    logger.info(f"📦 Exporting {model_name} to ONNX")
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder, (dummy['input_ids'], dummy['attention_mask']), str(output_dir / ONNX_FP32_FILE),
+            input_names=['input_ids', 'attention_mask'], output_names=['sentence_embedding'],
+            dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                          'attention_mask': {0: 'batch', 1: 'sequence'},
+                          'sentence_embedding': {0: 'batch'}},
+            opset_version=opset, dynamo=False
+        )
+    transformer_module.tokenizer.save_pretrained(str(output_dir))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(output_dir / ONNX_FP32_FILE), str(output_dir / ONNX_INT8_FILE),
+                         weight_type=QuantType.QInt8)
+        logger.info(f"✅ int8 graph written: {ONNX_INT8_FILE}")
+
+    config = {
+        'model_name': model_name,
+        'pooling': pooling,
+        'max_seq_length': model.max_seq_length,
+        'embedding_dim': model.get_sentence_embedding_dimension(),
+        'opset': opset,
+    }
+    with open(output_dir / ENCODER_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    logger.info(f"✅ ONNX export complete: {output_dir}")
+    return output_dir
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity statistics between two embedding matrices"""
+    cosines = np.sum(_normalize(reference) * _normalize(candidate), axis=1)
+    return {
+        'mean': float(cosines.mean()),
+        'p1': float(np.percentile(cosines, 1)),
+        'min': float(cosines.min()),
+    }
+
+def calibrate(model_name: str, output_dir: Union[str, Path], texts: List[str],
+              min_cosine: float = DEFAULT_MIN_COSINE) -> Dict[str, Any]:
+    """
+    Measure exported graphs against the original model and record the result
+
+    Args:
+        model_name: Original sentence transformer model
+        output_dir: Export directory
+        texts: Representative texts (chunk texts of real documents)
+        min_cosine: Mean cosine agreement required to serve the int8 graph
+
+    Returns:
+        Calibration report (also written to encoder_config.json)
+    """
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    reference = SentenceTransformer(model_name, device='cpu').encode(texts, convert_to_numpy=True)
+    report: Dict[str, Any] = {'texts': len(texts), 'min_cosine': min_cosine}
+    report['fp32'] = cosine_agreement(reference, OnnxEncoder(output_dir, quantized=False).encode(texts))
+    if (output_dir / ONNX_INT8_FILE).exists():
+        report['int8'] = cosine_agreement(reference, OnnxEncoder(output_dir, quantized=True).encode(texts))
+        report['int8_accepted'] = report['int8']['mean'] >= min_cosine
+    else:
+        report['int8_accepted'] = False
+
+    config_path = output_dir / ENCODER_CONFIG_FILE
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['calibration'] = report
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    status = "accepted" if report['int8_accepted'] else "rejected, fp32 graph will be served"
+    logger.info(f"📏 Calibration: fp32 mean cosine {report['fp32']['mean']:.4f}"
+                + (f", int8 {report['int8']['mean']:.4f} ({status})" if 'int8' in report else ""))
+    return report
+
+def load_calibration_texts(paths: List[str], limit: int = 512) -> List[str]:
+    """Chunk texts from analysis JSON files or plain text files (one text per line)"""
+    texts: List[str] = []
+    for path in paths:
+        if path.endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            texts.extend(chunk.get('text', '') for chunk in data.get('chunks', []))
+            for page in data.get('pdf_content', {}).get('pages', []):
+                texts.extend(page.get('paragraflar', []))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.extend(line.strip() for line in f)
+    texts = [text for text in texts if text and text.strip()]
+    return texts[:limit] or list(CALIBRATION_SAMPLES)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and calibrate CPU embedding backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export to ONNX, quantize and calibrate")
+    export_parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    export_parser.add_argument("--output", help="Export directory (default: models/<model>-onnx)")
+    export_parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 graph")
+    export_parser.add_argument("--calibration-file", action="append", default=[],
+                               help="Analysis JSON or text file with representative texts (repeatable)")
+    export_parser.add_argument("--min-cosine", type=float, default=DEFAULT_MIN_COSINE)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="Re-run calibration on an existing export")
+    calibrate_parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    calibrate_parser.add_argument("--output", help="Export directory (default: models/<model>-onnx)")
+    calibrate_parser.add_argument("--calibration-file", action="append", default=[])
+    calibrate_parser.add_argument("--min-cosine", type=float, default=DEFAULT_MIN_COSINE)
+
+    args = parser.parse_args()
+    output_dir = Path(args.output) if args.output else default_onnx_dir(args.model)
+
+    start_time = time.time()
+    if args.command == "export":
+        export_onnx(args.model, output_dir, quantize=not args.no_quantize)
+    report = calibrate(args.model, output_dir, load_calibration_texts(args.calibration_file), args.min_cosine)
+    print(json.dumps(report, indent=2))
+    print(f"⏱️ Done in {time.time() - start_time:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+💾 Embedding Cache
+=================
+Disk-backed embedding cache keyed by (model name, content hash).
+
+Re-ingesting a document (model mismatch rebuilds, backend re-initialization
+after an upload, daily bulletins repeating boilerplate) only encodes chunk
+texts that have never been embedded with the same model before.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = PROJECT_ROOT / "embedding_cache" / "embeddings.sqlite"
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+def normalize_chunk_text(text: str) -> str:
+    """Normalize chunk text so formatting-only differences share one cache entry"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+def content_hash(text: str) -> str:
+    """Content hash of normalized chunk text"""
+    return hashlib.sha256(normalize_chunk_text(text).encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """SQLite-backed cache of normalized embeddings"""
+
+    def __init__(self, model_name: str, cache_path: Union[str, Path] = DEFAULT_CACHE_PATH):
+        """
+        Initialize embedding cache
+
+        Args:
+            model_name: Embedding model name (part of the cache key)
+            cache_path: SQLite database file
+        """
+        self.model_name = model_name
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, hash)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+        self.stats = {'lookups': 0, 'hits': 0, 'encoded': 0}
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch cached embeddings for content hashes (missing hashes are omitted)"""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[i:i + _LOOKUP_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, dim, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for row_hash, dim, blob in rows:
+                    found[row_hash] = np.frombuffer(blob, dtype=np.float32, count=dim)
+        return found
+
+    def put_many(self, hashes: List[str], embeddings: np.ndarray):
+        """Store embeddings for content hashes"""
+        rows = [(self.model_name, h, int(e.shape[0]), np.ascontiguousarray(e, dtype=np.float32).tobytes())
+                for h, e in zip(hashes, embeddings)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embed texts, encoding only content never seen with this model
+
+        Args:
+            texts: Chunk texts
+            encode_fn: Function returning normalized float32 embeddings for a list of texts
+
+        Returns:
+            Embeddings in input order
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        hashes = [content_hash(text) for text in texts]
+        cached = self.get_many(hashes)
+
+        # Encode each unseen content once, even if it repeats within this batch
+        missing: Dict[str, str] = {}
+        for text, h in zip(texts, hashes):
+            if h not in cached and h not in missing:
+                missing[h] = text
+        if missing:
+            new_embeddings = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            self.put_many(list(missing.keys()), new_embeddings)
+            cached.update(zip(missing.keys(), new_embeddings))
+
+        hits = len(texts) - len(missing)
+        self.stats['lookups'] += len(texts)
+        self.stats['hits'] += hits
+        self.stats['encoded'] += len(missing)
+        logger.info(f"♻️ Embedding cache: {hits}/{len(texts)} reused ({hits / len(texts):.1%}), "
+                    f"{len(missing)} encoded")
+
+        return np.vstack([cached[h] for h in hashes])
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Get cumulative hit ratio for this process"""
+        lookups = self.stats['lookups']
+        return {
+            **self.stats,
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -7,9 +7,24 @@ Integrates with hybrid PDF extractor and chart analyzer for RAG pipeline.
 Features:
 - FAISS local vector database
 - Turkish sentence-transformers embeddings
-- Content chunking for optimal retrieval
+- Tokenizer-aware Turkish sentence chunking with per-chunk token counts
 - Metadata storage for source tracking
 - Semantic search capabilities
+- HNSW graph index with latency/recall parameter profiles
+- SQ8 / float16 / PQ quantized indexes with optional exact re-ranking
+- Query-embedding and top-k result caches invalidated by index generation
+- Persistent content-hash embedding cache for re-ingestion
+- Hybrid lexical (Turkish BM25) + dense retrieval with reciprocal rank fusion
+- Vectorized maximal-marginal-relevance (MMR) result diversification
+- Atomic versioned snapshots with background flush and single-file export/import
+- Pluggable CPU encoder backends (PyTorch, dynamic int8, ONNX Runtime)
+- Optional PCA/OPQ projection of stored and query vectors to a smaller dimension
+- Multi-process bulk ingestion streamed into the index (see bulk_embedder.py)
+- Two-stage binary retrieval: Hamming search over 1-bit sign codes, exact float re-ranking
+- Similarity-threshold range search and score-aware adaptive k
+- Lock-free searches over immutable state snapshots, single-writer ingestion (see vector_store_concurrency.py)
+- Optional document → section → chunk hierarchical retrieval (see hierarchical_index.py)
+- Optional MinHash LSH near-duplicate suppression at ingestion (see near_duplicates.py)
 """
 
 import faiss
@@ -18,12 +33,46 @@ import json
 import pickle
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import asdict, replace
 import logging
 from sentence_transformers import SentenceTransformer
 import time
 from concurrent.futures import ThreadPoolExecutor
-import hashlib
+import os
+import shutil
+
+try:
+    from .retrieval_cache import LRUCache, normalize_query, freeze_filters
+    from .embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, content_hash
+    from .lexical_index import BM25Index, reciprocal_rank_fusion
+    from .turkish_chunker import TokenAwareChunker, TextChunk
+    from .vector_store_snapshots import SnapshotManager, BackgroundFlusher, SnapshotError
+    from .embedding_backends import cache_model_key
+    from .model_registry import acquire_encoder
+    from .bulk_embedder import BulkEmbedder
+    from .adaptive_retrieval import AdaptiveKConfig, select_adaptive_k
+    from .vector_store_concurrency import (AtomicCounters, SingleWriter, StoreDraft, StoreState,
+                                           append_delta, clone_index, merge_top_k)
+    from .hierarchical_index import HierarchyState, hierarchy_titles
+    from .near_duplicates import DuplicateMatch, NearDuplicateIndex
+    from .document_chunks import (FILTER_OVERSAMPLE, DocumentChunk, SearchResult, build_chunks,
+                                  generate_chunk_id, matches_filters)
+except ImportError:
+    from retrieval_cache import LRUCache, normalize_query, freeze_filters
+    from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, content_hash
+    from lexical_index import BM25Index, reciprocal_rank_fusion
+    from turkish_chunker import TokenAwareChunker, TextChunk
+    from vector_store_snapshots import SnapshotManager, BackgroundFlusher, SnapshotError
+    from embedding_backends import cache_model_key
+    from model_registry import acquire_encoder
+    from bulk_embedder import BulkEmbedder
+    from adaptive_retrieval import AdaptiveKConfig, select_adaptive_k
+    from vector_store_concurrency import (AtomicCounters, SingleWriter, StoreDraft, StoreState,
+                                          append_delta, clone_index, merge_top_k)
+    from hierarchical_index import HierarchyState, hierarchy_titles
+    from near_duplicates import DuplicateMatch, NearDuplicateIndex
+    from document_chunks import (FILTER_OVERSAMPLE, DocumentChunk, SearchResult, build_chunks,
+                                 generate_chunk_id, matches_filters)
 
 # Configure logging
 logging.basicConfig(
@@ -32,23 +81,248 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class DocumentChunk:
-    """Document chunk with metadata"""
-    id: str
-    text: str
-    source: str
-    page_number: int
-    chunk_type: str  # 'text', 'table', 'chart', 'ocr'
-    metadata: Dict[str, Any]
-    embedding: Optional[np.ndarray] = None
+# HNSW build/search parameter profiles. "latency" keeps the graph sparse and the
+# search beam narrow; "recall" trades build time and memory for accuracy.
+# Both are validated against flat search in scripts/benchmark_vector_store.py.
+HNSW_PROFILES: Dict[str, Dict[str, int]] = {
+    'latency': {'M': 16, 'ef_construction': 80, 'ef_search': 32},
+    'recall': {'M': 32, 'ef_construction': 200, 'ef_search': 128},
+}
+
+# Quantized index types: vectors are stored compressed, optionally re-ranked
+# exactly against float32 vectors kept on disk (vectors.f32).
+QUANTIZED_INDEX_TYPES = ("sq8", "fp16", "pq")
+
+QUANTIZATION_DEFAULTS: Dict[str, Dict[str, int]] = {
+    'pq': {'pq_m': 96, 'pq_nbits': 8},  # 96 sub-quantizers x 8 dims for 768-dim mpnet
+    'binary': {'candidates': 256},  # Hamming shortlist re-scored against float32 vectors
+}
+
+# Learned projections applied in front of any index type (index_params 'projection'),
+# reducing stored and query vectors to 'projection_dim' dimensions
+PROJECTION_TYPES = ("pca", "opq")
+
+def resolve_index_params(index_type: str,
+                         hnsw_profile: str = "latency",
+                         index_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merge profile defaults with explicit index parameters
+    
+    Args:
+        index_type: FAISS index type
+        hnsw_profile: HNSW profile name ('latency', 'recall')
+        index_params: Explicit overrides (e.g. {'M': 24, 'ef_search': 64})
+        
+    Returns:
+        Resolved index parameters
+    """
+    params: Dict[str, Any] = {}
+    if index_type == "hnsw":
+        if hnsw_profile not in HNSW_PROFILES:
+            raise ValueError(f"Unknown HNSW profile: {hnsw_profile}")
+        params.update(HNSW_PROFILES[hnsw_profile])
+        params['profile'] = hnsw_profile
+    params.update(QUANTIZATION_DEFAULTS.get(index_type, {}))
+    if index_params:
+        params.update(index_params)
+    return params
+
+def binarize(embeddings: np.ndarray) -> np.ndarray:
+    """Pack the sign bits of float embeddings into binary codes (n x d/8 uint8)"""
+    return np.packbits(np.asarray(embeddings) > 0, axis=1)
+
+def is_binary_index(index) -> bool:
+    """Whether an index stores binary codes (searched with binarized queries)"""
+    return isinstance(index, faiss.IndexBinary)
+
+def build_faiss_index(index_type: str, dim: int, params: Optional[Dict[str, Any]] = None):
+    """
+    Create an empty FAISS index for normalized embeddings
+    
+    Args:
+        index_type: FAISS index type ('flat', 'ivf', 'hnsw', 'sq8', 'fp16', 'pq', 'binary')
+        dim: Embedding dimension
+        params: Resolved index parameters (see resolve_index_params); 'projection' and
+            'projection_dim' add a trained PCA/OPQ reduction in front of the index
+        
+    Returns:
+        FAISS index using inner product (cosine similarity) scoring
+    """
+    params = params or {}
+    if params.get('projection'):
+        if index_type == "binary":
+            raise ValueError("Projections are not supported for binary indexes")
+        return _build_projected_index(index_type, dim, params)
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)  # Inner product for cosine similarity
+    if index_type == "ivf":
+        # IVF index for larger datasets
+        quantizer = faiss.IndexFlatIP(dim)
+        return faiss.IndexIVFFlat(quantizer, dim, params.get('nlist', 100), faiss.METRIC_INNER_PRODUCT)
+    if index_type == "hnsw":
+        # Graph index: no training step, so it does not drift with new content
+        index = faiss.IndexHNSWFlat(dim, params['M'], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params['ef_construction']
+        index.hnsw.efSearch = params['ef_search']
+        return index
+    if index_type == "sq8":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "fp16":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "pq":
+        if dim % params['pq_m'] != 0:
+            raise ValueError(f"pq_m={params['pq_m']} must divide embedding dimension {dim}")
+        return faiss.IndexPQ(dim, params['pq_m'], params['pq_nbits'], faiss.METRIC_INNER_PRODUCT)
+    if index_type == "binary":
+        # 1 bit per dimension, Hamming distance; only a coarse stage, always re-ranked
+        if dim % 8 != 0:
+            raise ValueError(f"Binary indexes need an embedding dimension divisible by 8, got {dim}")
+        return faiss.IndexBinaryFlat(dim)
+    raise ValueError(f"Unsupported index type: {index_type}")
+
+def _build_projected_index(index_type: str, dim: int, params: Dict[str, Any]):
+    """Wrap an index built for projection_dim in a PCA/OPQ + re-normalization pre-transform"""
+    projection = params['projection']
+    out_dim = params['projection_dim']
+    if projection not in PROJECTION_TYPES:
+        raise ValueError(f"Unsupported projection: {projection}")
+    if out_dim >= dim:
+        raise ValueError(f"projection_dim={out_dim} must be smaller than embedding dimension {dim}")
+    if projection == "pca":
+        transform = faiss.PCAMatrix(dim, out_dim, 0.0, False)
+    else:
+        opq_m = params.get('opq_m', out_dim // 4)
+        if out_dim % opq_m != 0:
+            raise ValueError(f"opq_m={opq_m} must divide projection_dim {out_dim}")
+        transform = faiss.OPQMatrix(dim, opq_m, out_dim)
+    
+    base_params = {key: value for key, value in params.items() if key != 'projection'}
+    index = faiss.IndexPreTransform(build_faiss_index(index_type, out_dim, base_params))
+    # Projected vectors are re-normalized so inner product stays a cosine similarity
+    index.prepend_transform(faiss.NormalizationTransform(out_dim, 2.0))
+    index.prepend_transform(transform)
+    return index
+
+def base_index(index):
+    """Underlying index of a projected (IndexPreTransform) index"""
+    if isinstance(index, faiss.IndexPreTransform):
+        return faiss.downcast_index(index.index)
+    return index
+
+def stores_compressed_vectors(index_type: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether the index keeps only lossy codes (quantized or projected), not the original vectors"""
+    return (index_type in QUANTIZED_INDEX_TYPES or index_type == "binary" or
+            bool((params or {}).get('projection')))
+
+def min_training_vectors(index_type: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """Minimum number of vectors required to train an index type (0 = no training)"""
+    params = params or {}
+    if params.get('projection'):
+        base_params = {key: value for key, value in params.items() if key != 'projection'}
+        # PCA needs at least as many vectors as output dimensions; OPQ trains 256-centroid codebooks
+        projection_min = params['projection_dim'] if params['projection'] == "pca" else 256
+        return max(projection_min, min_training_vectors(index_type, base_params))
+    if index_type == "ivf":
+        return params.get('nlist', 100)
+    if index_type == "pq":
+        return 2 ** params['pq_nbits']
+    if index_type == "sq8":
+        return 1
+    return 0
 
-@dataclass
-class SearchResult:
-    """Search result with relevance score"""
-    chunk: DocumentChunk
-    score: float
-    rank: int
+def estimate_bytes_per_vector(index_type: str, dim: int, params: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Estimate resident index memory per stored vector
+    
+    Args:
+        index_type: FAISS index type
+        dim: Embedding dimension
+        params: Resolved index parameters
+        
+    Returns:
+        Approximate bytes per vector (excluding chunk text and metadata)
+    """
+    params = params or {}
+    if params.get('projection'):
+        dim = params['projection_dim']
+    if index_type == "fp16":
+        return 2.0 * dim
+    if index_type == "sq8":
+        return float(dim)
+    if index_type == "pq":
+        return params['pq_m'] * params['pq_nbits'] / 8.0
+    if index_type == "binary":
+        return dim / 8.0
+    if index_type == "hnsw":
+        # float32 vector + level-0 links (2*M neighbours) + upper levels on average
+        return 4.0 * dim + params['M'] * 2 * 4 * 1.1
+    if index_type == "ivf":
+        return 4.0 * dim + 8  # vector + stored id
+    return 4.0 * dim
+
+def rerank_with_vectors(query_embeddings: np.ndarray, candidate_ids: np.ndarray,
+                        vectors: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exactly re-score a candidate shortlist against float32 vectors
+    
+    Args:
+        query_embeddings: Normalized query vectors (nq x d)
+        candidate_ids: Shortlist ids from the approximate index (nq x k'), -1 = empty
+        vectors: Float32 vectors indexed by id (array or memmap)
+        k: Number of results to keep
+        
+    Returns:
+        (scores, ids) arrays of shape (nq x k), padded with -inf / -1
+    """
+    nq = len(query_embeddings)
+    out_scores = np.full((nq, k), -np.inf, dtype=np.float32)
+    out_ids = np.full((nq, k), -1, dtype=np.int64)
+    for qi in range(nq):
+        ids = candidate_ids[qi][candidate_ids[qi] >= 0]
+        if len(ids) == 0:
+            continue
+        # Sorted ids give sequential reads from the memory-mapped file
+        ids = np.unique(ids)
+        exact = np.asarray(vectors[ids], dtype=np.float32) @ query_embeddings[qi]
+        top = np.argsort(-exact)[:k]
+        out_scores[qi, :len(top)] = exact[top]
+        out_ids[qi, :len(top)] = ids[top]
+    return out_scores, out_ids
+
+def mmr_select(query_embedding: np.ndarray, candidate_embeddings: np.ndarray,
+               k: int, lambda_mult: float = 0.5) -> np.ndarray:
+    """
+    Maximal marginal relevance selection over a candidate pool
+    
+    Each of the k steps is one matrix-vector product over the pool, so the cost is
+    O(k * n * d) with no pairwise Python loops.
+    
+    Args:
+        query_embedding: Normalized query vector (d,)
+        candidate_embeddings: Normalized candidate vectors (n x d)
+        k: Number of candidates to select
+        lambda_mult: 1.0 = pure relevance, 0.0 = pure diversity
+        
+    Returns:
+        Selected candidate positions, in selection order
+    """
+    n = len(candidate_embeddings)
+    k = min(k, n)
+    relevance = candidate_embeddings @ query_embedding
+    max_redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = np.empty(k, dtype=np.int64)
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected[step] = best
+        available[best] = False
+        np.maximum(max_redundancy, candidate_embeddings @ candidate_embeddings[best], out=max_redundancy)
+    return selected
 
 class FAISSVectorStore:
     """FAISS-based vector store for semantic search"""
@@ -56,102 +330,367 @@ class FAISSVectorStore:
     def __init__(self, 
                  model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
                  index_type: str = "flat",
-                 vector_store_path: str = "vector_store"):
+                 vector_store_path: str = "vector_store",
+                 hnsw_profile: str = "latency",
+                 index_params: Optional[Dict[str, Any]] = None,
+                 rerank: bool = False,
+                 rerank_factor: int = 4,
+                 query_cache_size: int = 2048,
+                 result_cache_size: int = 512,
+                 cache_ttl: Optional[float] = 3600.0,
+                 embedding_cache_path: Optional[str] = str(DEFAULT_CACHE_PATH),
+                 model: Optional[SentenceTransformer] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 snapshot_keep: int = 3,
+                 flush_interval: float = 30.0,
+                 encoder_backend: str = "torch",
+                 onnx_path: Optional[str] = None,
+                 projection: Optional[str] = None,
+                 projection_dim: int = 256,
+                 delta_limit: int = 4096,
+                 delta_ratio: float = 0.05,
+                 hierarchical: bool = False,
+                 near_duplicate_threshold: Optional[float] = None):
         """
         Initialize FAISS vector store
         
         Args:
             model_name: Sentence transformer model name
-            index_type: FAISS index type ('flat', 'ivf')
+            index_type: FAISS index type ('flat', 'ivf', 'hnsw', 'sq8', 'fp16', 'pq', 'binary');
+                'binary' always re-ranks its Hamming shortlist (index_params 'candidates')
             vector_store_path: Path to store vector database
+            hnsw_profile: HNSW parameter profile ('latency', 'recall')
+            index_params: Index parameter overrides, e.g. {'M': 32, 'ef_construction': 200, 'ef_search': 64}
+            rerank: Keep float32 vectors on disk and exactly re-score a shortlist of k * rerank_factor
+            rerank_factor: Shortlist size multiplier for re-ranking
+            query_cache_size: Max cached query embeddings (0 disables)
+            result_cache_size: Max cached top-k result lists (0 disables)
+            cache_ttl: Cache entry lifetime in seconds (None = no expiry)
+            embedding_cache_path: SQLite file for the persistent chunk embedding cache (None disables)
+            model: Already loaded embedding model to share (e.g. across shards)
+            embedding_cache: Already opened embedding cache to share
+            snapshot_keep: Number of on-disk snapshot versions to keep
+            flush_interval: Minimum seconds between background snapshot flushes
+            encoder_backend: Embedding backend ('torch', 'int8', 'onnx'); see embedding_backends.py
+            onnx_path: Exported ONNX model directory for the 'onnx' backend
+            projection: Learned dimensionality reduction before indexing ('pca', 'opq'); trained
+                on the first batch of vectors and saved inside the index
+            projection_dim: Output dimension of the projection (e.g. 128, 256)
+            delta_limit: Vectors kept in exact flat delta indexes before they are compacted
+                into the main index
+            delta_ratio: Compact only once the delta is also this fraction of the main index,
+                so the cost of copying the main index is amortized over many additions
+            hierarchical: Also build document/section summary vectors and per-document exact
+                sub-indexes for search_hierarchical (keeps one more float32 copy of every vector)
+            near_duplicate_threshold: Skip embedding text chunks whose estimated word-shingle
+                Jaccard similarity to an indexed chunk reaches this value (e.g. 0.8) and whose
+                figures are identical; they are linked to that chunk instead (None disables)
         """
         self.model_name = model_name
         self.index_type = index_type
+        if projection:
+            index_params = {**(index_params or {}), 'projection': projection, 'projection_dim': projection_dim}
+        self.index_params = resolve_index_params(index_type, hnsw_profile, index_params)
+        # Binary codes only rank coarsely; the float32 vectors on disk give the final scores
+        rerank = rerank or index_type == "binary"
+        self.rerank_factor = rerank_factor
         self.vector_store_path = Path(vector_store_path)
         self.vector_store_path.mkdir(exist_ok=True)
         
         # Initialize sentence transformer
-        logger.info(f"🤖 Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.encoder_backend = encoder_backend
+        if model is None:
+            # Shared with every other store and pipeline using the same model in this process
+            model = acquire_encoder(model_name, encoder_backend, onnx_path)
+        self.model = model
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         logger.info(f"✅ Model loaded, embedding dimension: {self.embedding_dim}")
         
-        # Initialize FAISS index
-        self._init_faiss_index()
+        # Chunks are sized by the model's tokenizer so nothing is truncated at encoding time
+        self.chunker = TokenAwareChunker.from_model(self.model)
+        
+        # Persistent chunk embedding cache, shared across stores using the same model
+        if embedding_cache is None and embedding_cache_path:
+            embedding_cache = EmbeddingCache(cache_model_key(model_name, encoder_backend), embedding_cache_path)
+        self.embedding_cache = embedding_cache
         
-        # Document storage
-        self.chunks: List[DocumentChunk] = []
+        # Searchable contents: index, chunks and the lexical index over chunk texts (document
+        # ids are chunk positions). Searches read one immutable state; all writes go through
+        # the single writer thread (see vector_store_concurrency.py).
+        self.hierarchical = hierarchical
+        self._state = StoreState(index=self._init_faiss_index(), chunks=[], size=0,
+                                 lexical_index=BM25Index(), rerank=rerank,
+                                 hierarchy=HierarchyState() if hierarchical else None)
         self.chunk_metadata: Dict[str, Dict[str, Any]] = {}
+        self.delta_limit = delta_limit
+        self.delta_ratio = delta_ratio
+        self._writer = SingleWriter(lambda: StoreDraft(self._state), self._publish)
+        self.write_stats = AtomicCounters({'compactions': 0, 'compacted_vectors': 0, 'compaction_failures': 0})
+        
+        # Streaming near-duplicate detector over everything ingested or loaded
+        self.near_duplicates = (NearDuplicateIndex(near_duplicate_threshold)
+                                if near_duplicate_threshold is not None else None)
+        
+        # Versioned on-disk snapshots
+        self.snapshots = SnapshotManager(self.vector_store_path, keep=snapshot_keep)
+        self.flush_interval = flush_interval
+        self._flusher: Optional[BackgroundFlusher] = None
+        
+        # Retrieval caches; the state generation changes whenever search results could change
+        self.query_embedding_cache = LRUCache(query_cache_size, cache_ttl)
+        self.result_cache = LRUCache(result_cache_size, cache_ttl)
         
-        # Performance tracking
-        self.performance_stats = {
+        # Performance tracking (updated concurrently by searches)
+        self.performance_stats = AtomicCounters({
             'embedding_time': 0,
             'indexing_time': 0,
             'search_time': 0,
             'chunks_processed': 0,
-            'searches_performed': 0
-        }
+            'searches_performed': 0,
+            'encoded_tokens': 0,
+            'encoding_seconds': 0.0
+        })
         
         logger.info("🚀 FAISS Vector Store initialized")
     
     def _init_faiss_index(self):
         """Initialize FAISS index based on type"""
-        if self.index_type == "flat":
-            self.index = faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
-        elif self.index_type == "ivf":
-            # IVF index for larger datasets
-            quantizer = faiss.IndexFlatIP(self.embedding_dim)
-            self.index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, 100)  # 100 centroids
-        else:
-            raise ValueError(f"Unsupported index type: {self.index_type}")
+        index = build_faiss_index(self.index_type, self.embedding_dim, self.index_params)
         
-        logger.info(f"✅ FAISS index initialized: {self.index_type}")
+        logger.info(f"✅ FAISS index initialized: {self.index_type} {self.index_params}")
+        return index
+    
+    @property
+    def index(self):
+        """Main FAISS index of the current state (excludes vectors still in the delta)"""
+        return self._state.index
+    
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        """Chunks of the current state, in index position order (a copy)"""
+        state = self._state
+        return state.chunks[:state.size]
     
-    def _chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    @property
+    def total_vectors(self) -> int:
+        """Vectors searchable in the current state (main index plus delta)"""
+        return self._state.size
+    
+    @property
+    def lexical_index(self) -> BM25Index:
+        return self._state.lexical_index
+    
+    @property
+    def rerank(self) -> bool:
+        return self._state.rerank
+    
+    @property
+    def index_generation(self) -> int:
+        """Changes whenever search results could change"""
+        return self._state.generation
+    
+    def _publish(self, draft: StoreDraft):
+        """Write a batch's additions to shared storage and make the new state visible (writer thread)"""
+        if not draft.changed:
+            return
+        if draft.pending_chunks:
+            embeddings = np.vstack(draft.pending_embeddings)
+            if draft.rerank:
+                self._write_float_vectors(embeddings, draft.published_size)
+            # Store chunks with embeddings (quantized/projected stores keep only the compressed codes in RAM)
+            keep_embeddings = not stores_compressed_vectors(self.index_type, self.index_params)
+            for chunk, embedding in zip(draft.pending_chunks, embeddings):
+                chunk.embedding = embedding if keep_embeddings else None
+            draft.lexical_index.add_documents(chunk.text for chunk in draft.pending_chunks)
+            draft.chunks.extend(draft.pending_chunks)
+        if draft.chunk_metadata is not None:
+            self.chunk_metadata = draft.chunk_metadata
+        for chunk in draft.pending_chunks:
+            # Don't store embedding in metadata (not JSON serializable)
+            metadata = asdict(replace(chunk, embedding=None))
+            metadata.pop('embedding', None)
+            self.chunk_metadata[chunk.id] = metadata
+        
+        size = draft.size
+        self._state = StoreState(index=draft.index, chunks=draft.chunks, size=size,
+                                 lexical_index=draft.lexical_index, rerank=draft.rerank,
+                                 generation=draft.base.generation + 1, delta=draft.delta,
+                                 vectors=self._map_float_vectors(size) if draft.rerank and size else None,
+                                 hierarchy=draft.hierarchy)
+        self.result_cache.clear()
+    
+    def _compact(self, draft: StoreDraft, force: bool = False) -> bool:
         """
-        Split text into overlapping chunks
+        Move the delta into a copy of the main index (writer thread)
         
         Args:
-            text: Input text
-            chunk_size: Maximum chunk size in characters
-            overlap: Overlap between chunks
+            draft: State being prepared
+            force: Compact regardless of the delta size limits
             
         Returns:
-            List of text chunks
+            Whether the delta was compacted
         """
-        if len(text) <= chunk_size:
-            return [text]
+        delta_size = sum(piece.ntotal for _, piece in draft.delta)
+        if delta_size == 0:
+            return False
+        if not force and delta_size < max(self.delta_limit, self.delta_ratio * draft.index.ntotal):
+            return False
+        vectors = np.vstack([piece.reconstruct_n(0, piece.ntotal) for _, piece in draft.delta])
+        if not draft.index.is_trained and len(vectors) < min_training_vectors(self.index_type, self.index_params):
+            # Searched exactly in the delta until there is enough data to train on
+            return False
+        start_time = time.time()
+        try:
+            # Readers keep searching the published index while the copy is extended
+            index = self._copy_index(draft.index)
+            if not index.is_trained:
+                index.train(vectors)  # type: ignore
+            index.add(binarize(vectors) if is_binary_index(index) else vectors)  # type: ignore
+            if index.ntotal != draft.index.ntotal + delta_size:
+                raise RuntimeError(f"main index holds {index.ntotal} vectors, expected "
+                                   f"{draft.index.ntotal + delta_size}")
+        except Exception as e:
+            self.write_stats.add('compaction_failures')
+            logger.error(f"❌ Delta compaction failed, keeping {delta_size} vectors in the delta: {e}")
+            return False
+        draft.index, draft.delta, draft.changed = index, (), True
+        self.write_stats.add('compactions')
+        self.write_stats.add('compacted_vectors', delta_size)
+        logger.info(f"🗜️ Compacted {delta_size} delta vectors into the main index in {time.time() - start_time:.2f}s")
+        return True
+    
+    def _bytes_per_chunk(self, state: StoreState) -> float:
+        """Resident index bytes per chunk; delta vectors stay full-dimension float32 until compacted"""
+        compressed = estimate_bytes_per_vector(self.index_type, self.embedding_dim, self.index_params)
+        if state.size == 0:
+            return compressed
+        return (state.index.ntotal * compressed + state.delta_size * 4.0 * self.embedding_dim) / state.size
+    
+    def _copy_index(self, index):
+        """Writable copy of the main index (untrained indexes are empty and built anew)"""
+        if not index.is_trained:
+            return build_faiss_index(self.index_type, self.embedding_dim, self.index_params)
+        return clone_index(index)
+    
+    def compact(self) -> bool:
+        """Move all delta vectors into the main index now (e.g. after a bulk load); returns whether it ran"""
+        return self._writer.run(lambda draft: self._compact(draft, force=True))
+    
+    def set_ef_search(self, ef_search: int):
+        """
+        Change the HNSW search beam width at runtime
         
-        chunks = []
-        start = 0
+        Args:
+            ef_search: Number of candidates explored per query (higher = better recall, slower)
+        """
+        if self.index_type != "hnsw":
+            raise ValueError(f"efSearch only applies to HNSW indexes, not '{self.index_type}'")
         
-        while start < len(text):
-            end = start + chunk_size
-            
-            # Find sentence boundary if possible
-            if end < len(text):
-                # Look for sentence endings
-                sentence_end = text.rfind('.', start, end)
-                if sentence_end == -1:
-                    sentence_end = text.rfind('!', start, end)
-                if sentence_end == -1:
-                    sentence_end = text.rfind('?', start, end)
-                
-                if sentence_end != -1 and sentence_end > start + chunk_size // 2:
-                    end = sentence_end + 1
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+        def apply(draft: StoreDraft):
+            self.index_params['ef_search'] = ef_search
+            # A search parameter, not content: set in place on the shared index
+            base_index(draft.index).hnsw.efSearch = ef_search
+            draft.changed = True
+        self._writer.run(apply)
+    
+    def train_index(self, embeddings: np.ndarray):
+        """
+        Train IVF/PQ/SQ indexes on a representative sample
+        
+        Args:
+            embeddings: Normalized float32 sample vectors (e.g. from an existing flat store)
+        """
+        required = min_training_vectors(self.index_type, self.index_params)
+        if len(embeddings) < required:
+            raise ValueError(f"'{self.index_type}' index needs at least {required} training vectors, got {len(embeddings)}")
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        def apply(draft: StoreDraft):
+            start_time = time.time()
+            index = self._copy_index(draft.index)
+            index.train(embeddings)  # type: ignore
+            draft.index, draft.changed = index, True
+            logger.info(f"✅ Index trained on {len(embeddings)} vectors in {time.time() - start_time:.2f}s")
+        self._writer.run(apply)
+    
+    @property
+    def float_vectors_path(self) -> Path:
+        """Raw float32 vectors used for exact re-ranking"""
+        return self.vector_store_path / "vectors.f32"
+    
+    def _write_float_vectors(self, embeddings: np.ndarray, position: int):
+        """Write float32 vectors to the on-disk re-ranking file, starting at a vector position"""
+        if position == 0:
+            # A fresh index starts a fresh file; stale vectors from an earlier run are discarded.
+            # Unlinking first leaves memory maps of the old file intact.
+            self.float_vectors_path.unlink(missing_ok=True)
+        with open(self.float_vectors_path, 'r+b' if position else 'wb') as f:
+            f.seek(position * self.embedding_dim * 4)
+            f.write(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+            # Drop anything left behind by a failed earlier write
+            f.truncate()
+    
+    def _replace_float_vectors(self, source: Path):
+        """Atomically replace the re-ranking file with a copy of another file"""
+        staging = self.float_vectors_path.with_suffix(".f32.tmp")
+        shutil.copyfile(source, staging)
+        os.replace(staging, self.float_vectors_path)
+    
+    def _map_float_vectors(self, size: int) -> np.ndarray:
+        """Memory-map the first `size` on-disk float32 vectors"""
+        return np.memmap(self.float_vectors_path, dtype=np.float32, mode='r', shape=(size, self.embedding_dim))
+    
+    def _search_embeddings(self, query_embeddings: np.ndarray, k: int,
+                           state: Optional[StoreState] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the main index and the delta with normalized query embeddings
+        
+        Args:
+            query_embeddings: Query vectors (nq x d)
+            k: Number of results per query
+            state: State to search (default: the current one)
             
-            start = end - overlap
+        Returns:
+            (scores, indices) arrays of shape (nq x k') with k' <= k
+        """
+        state = state or self._state
+        k = min(k, state.size)
+        parts = []
+        if state.index.ntotal > 0:
+            parts.append(self._search_main(query_embeddings, min(k, state.index.ntotal), state))
+        for offset, piece in state.delta:
+            scores, ids = piece.search(query_embeddings, min(k, piece.ntotal))
+            parts.append((scores, np.where(ids >= 0, ids + offset, -1)))
+        return merge_top_k(parts, k)
+    
+    def _search_main(self, query_embeddings: np.ndarray, k: int, state: StoreState) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the main index, re-ranking its shortlist exactly when enabled"""
+        index = state.index
+        if not state.rerank:
+            return index.search(query_embeddings, k)  # type: ignore
+        shortlist = min(k * self.rerank_factor, index.ntotal)
+        if is_binary_index(index):
+            shortlist = min(max(shortlist, self.index_params.get('candidates', 0)), index.ntotal)
+            _, candidate_ids = index.search(binarize(query_embeddings), shortlist)  # type: ignore
+        else:
+            _, candidate_ids = index.search(query_embeddings, shortlist)  # type: ignore
+        return rerank_with_vectors(query_embeddings, candidate_ids, state.vectors, k)
+    
+    def _chunk_text(self, text: str) -> List[TextChunk]:
+        """
+        Split text into sentence-aligned chunks that fit the model's sequence length
         
-        return chunks
+        Args:
+            text: Input text
+            
+        Returns:
+            List of text chunks with token counts
+        """
+        return self.chunker.chunk_text(text)
     
     def _generate_chunk_id(self, text: str, source: str, page_number: int) -> str:
         """Generate unique chunk ID"""
-        content = f"{source}_{page_number}_{text[:100]}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return generate_chunk_id(text, source, page_number)
     
     def add_pdf_content(self, pdf_analysis: Dict[str, Any]):
         """
@@ -163,91 +702,30 @@ class FAISSVectorStore:
         logger.info("📄 Adding PDF content to vector store")
         start_time = time.time()
         
-        chunks_to_add = []
-        filename = pdf_analysis.get('document_info', {}).get('filename', 'unknown')
-        
-        # Process text content
-        if 'pdf_content' in pdf_analysis:
-            for page in pdf_analysis['pdf_content']['pages']:
-                page_num = page.get('sayfa', 0)
-                
-                # Process paragraphs
-                for paragraph in page.get('paragraflar', []):
-                    if paragraph.strip():
-                        text_chunks = self._chunk_text(paragraph)
-                        for chunk_text in text_chunks:
-                            chunk_id = self._generate_chunk_id(chunk_text, filename, page_num)
-                            chunk = DocumentChunk(
-                                id=chunk_id,
-                                text=chunk_text,
-                                source=filename,
-                                page_number=page_num,
-                                chunk_type='text',
-                                metadata={'paragraph': True}
-                            )
-                            chunks_to_add.append(chunk)
-        
-        # Process table content
-        if 'pdf_content' in pdf_analysis and 'tables' in pdf_analysis['pdf_content']:
-            for table in pdf_analysis['pdf_content']['tables']:
-                page_num = table.get('sayfa', 0)
-                table_text = json.dumps(table, ensure_ascii=False)
-                
-                chunk_id = self._generate_chunk_id(table_text, filename, page_num)
-                chunk = DocumentChunk(
-                    id=chunk_id,
-                    text=table_text,
-                    source=filename,
-                    page_number=page_num,
-                    chunk_type='table',
-                    metadata={'table': True, 'table_data': table}
-                )
-                chunks_to_add.append(chunk)
-        
-        # Process chart content
-        if 'chart_analysis' in pdf_analysis:
-            for chart in pdf_analysis['chart_analysis']['charts']:
-                page_num = chart.get('source_page', 0)
-                
-                # Chart title and labels
-                chart_text_parts = []
-                if chart.get('title'):
-                    chart_text_parts.append(f"Başlık: {chart['title']}")
-                if chart.get('x_axis_label'):
-                    chart_text_parts.append(f"X Ekseni: {chart['x_axis_label']}")
-                if chart.get('y_axis_label'):
-                    chart_text_parts.append(f"Y Ekseni: {chart['y_axis_label']}")
-                
-                # Chart data points
-                for point in chart.get('data_points', []):
-                    if point.get('label'):
-                        chart_text_parts.append(f"Veri: {point['label']}")
-                
-                # OCR extracted text
-                for ocr_text in chart.get('extracted_text', []):
-                    if ocr_text.strip():
-                        chart_text_parts.append(f"OCR: {ocr_text}")
-                
-                if chart_text_parts:
-                    chart_text = ' | '.join(chart_text_parts)
-                    chunk_id = self._generate_chunk_id(chart_text, filename, page_num)
-                    chunk = DocumentChunk(
-                        id=chunk_id,
-                        text=chart_text,
-                        source=filename,
-                        page_number=page_num,
-                        chunk_type='chart',
-                        metadata={'chart': True, 'chart_type': chart.get('chart_type'), 'chart_data': chart}
-                    )
-                    chunks_to_add.append(chunk)
+        chunks_to_add = self.build_chunks(pdf_analysis)
+        unique_chunks, duplicates = self._split_duplicates(chunks_to_add)
         
         # Add chunks to vector store
-        self._add_chunks(chunks_to_add)
+        self._add_chunks(unique_chunks)
+        self._register_canonicals(unique_chunks)
+        self._link_duplicates(duplicates)
         
         processing_time = time.time() - start_time
-        self.performance_stats['chunks_processed'] += len(chunks_to_add)
+        self.performance_stats.add('chunks_processed', len(chunks_to_add))
         logger.info(f"✅ PDF content added: {len(chunks_to_add)} chunks in {processing_time:.2f}s")
     
+    def build_chunks(self, pdf_analysis: Dict[str, Any]) -> List[DocumentChunk]:
+        """
+        Turn PDF analysis results into chunks without embedding them
+        
+        Args:
+            pdf_analysis: PDF analysis results from hybrid extractor
+            
+        Returns:
+            Text, table and chart chunks of the document (see document_chunks.py)
+        """
+        return build_chunks(pdf_analysis, self.chunker)
+    
     def _add_chunks(self, chunks: List[DocumentChunk]):
         """Add chunks to vector store with embeddings"""
         if not chunks:
@@ -256,32 +734,159 @@ class FAISSVectorStore:
         logger.info(f"🔄 Generating embeddings for {len(chunks)} chunks")
         start_time = time.time()
         
-        # Generate embeddings
+        self._count_chunk_tokens(chunks)
+        
+        # Generate embeddings (only for content not seen before)
         texts = [chunk.text for chunk in chunks]
-        embeddings = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        embeddings = self._encode_documents(texts)
         
         embedding_time = time.time() - start_time
-        self.performance_stats['embedding_time'] += int(embedding_time)
+        self.performance_stats.add('embedding_time', int(embedding_time))
+        self.performance_stats.add('encoding_seconds', embedding_time)
+        self.performance_stats.add('encoded_tokens', sum(chunk.metadata['token_count'] for chunk in chunks))
         
-        # Add to FAISS index
+        indexing_time = self._index_chunks(chunks, embeddings)
+        logger.info(f"✅ Embeddings generated: {embedding_time:.2f}s, indexed: {indexing_time:.2f}s")
+    
+    def _split_duplicates(self, chunks: List[DocumentChunk]) -> Tuple[List[DocumentChunk],
+                                                                      List[Tuple[DocumentChunk, DuplicateMatch]]]:
+        """Separate near-duplicates of indexed (or earlier) chunks from the chunks to embed"""
+        if self.near_duplicates is None or not chunks:
+            return chunks, []
+        self._count_chunk_tokens(chunks)
+        unique_chunks, duplicates = self.near_duplicates.split(chunks)
+        if duplicates:
+            logger.info(f"🧬 {len(duplicates)}/{len(chunks)} chunks are near-duplicates, linked instead of embedded")
+        return unique_chunks, duplicates
+    
+    def _register_canonicals(self, chunks: List[DocumentChunk]):
+        """Make indexed chunks canonical copies for later ingestion"""
+        if self.near_duplicates is not None:
+            for chunk in chunks:
+                self.near_duplicates.register(chunk)
+    
+    def _link_duplicates(self, duplicates: List[Tuple[DocumentChunk, DuplicateMatch]]):
+        """Record suppressed duplicates in their canonical chunks' metadata"""
+        if not duplicates:
+            return
+        
+        linked = []
+        
+        def apply(draft: StoreDraft):
+            for duplicate, match in duplicates:
+                canonical = match.canonical
+                if canonical.id not in self.chunk_metadata:
+                    # Only chunks in the published state can carry links
+                    logger.warning(f"⚠️ Canonical chunk {canonical.id} of {duplicate.id} is not indexed, link dropped")
+                    continue
+                linked.append((duplicate, match))
+                links = canonical.metadata.get('duplicate_sources', []) + [{
+                    'id': duplicate.id,
+                    'source': duplicate.source,
+                    'page_number': duplicate.page_number,
+                    'similarity': round(match.similarity, 3)
+                }]
+                # Copy on write: searches holding the old metadata dict are unaffected
+                canonical.metadata = {**canonical.metadata, 'duplicate_sources': links}
+                self.chunk_metadata[canonical.id] = {**self.chunk_metadata[canonical.id],
+                                                     'metadata': canonical.metadata}
+            # Source filters now match more chunks
+            draft.changed = True
+        self._writer.run(apply)
+        self.near_duplicates.record(linked)
+    
+    def _count_chunk_tokens(self, chunks: List[DocumentChunk]):
+        """Token counts for context packing (text chunks already carry them from the chunker)"""
+        uncounted = [chunk for chunk in chunks if 'token_count' not in chunk.metadata]
+        for chunk, token_count in zip(uncounted, self.chunker.count_tokens([c.text for c in uncounted])):
+            chunk.metadata['token_count'] = token_count
+    
+    def _index_chunks(self, chunks: List[DocumentChunk], embeddings: np.ndarray) -> float:
+        """Hand embedded chunks to the writer and wait until they are searchable; returns the indexing time"""
         start_time = time.time()
-        self.index.add(embeddings)  # type: ignore
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        # Title embeddings are computed here, not on the writer thread
+        title_vectors = self._encode_titles(chunks) if self.hierarchical else None
         
-        # Store chunks with embeddings
-        for chunk, embedding in zip(chunks, embeddings):
-            chunk.embedding = embedding
-            self.chunks.append(chunk)
-            # Don't store embedding in metadata (not JSON serializable)
-            metadata = asdict(chunk)
-            metadata.pop('embedding', None)
-            self.chunk_metadata[chunk.id] = metadata
+        def apply(draft: StoreDraft):
+            hierarchy = (draft.hierarchy.add(chunks, draft.size, embeddings, title_vectors)
+                         if draft.hierarchy is not None else None)
+            draft.append(chunks, embeddings)
+            draft.hierarchy = hierarchy
+            self._compact(draft)
+        # Concurrent callers are batched into one published state; searches are never blocked
+        self._writer.run(apply)
         
         indexing_time = time.time() - start_time
-        self.performance_stats['indexing_time'] += int(indexing_time)
+        self.performance_stats.add('indexing_time', int(indexing_time))
+        return indexing_time
+    
+    def add_chunks_bulk(self, chunks: List[DocumentChunk], embedder: BulkEmbedder) -> int:
+        """
+        Embed and index a large batch of chunks with a multi-process embedder
         
-        logger.info(f"✅ Embeddings generated: {embedding_time:.2f}s, indexed: {indexing_time:.2f}s")
+        Cached embeddings are reused; the rest are streamed into the index as the
+        workers finish them. Untrained indexes are trained once enough vectors have
+        arrived (until then they are searched exactly in the delta).
+        
+        Args:
+            chunks: Chunks to add (e.g. from build_chunks over an archive)
+            embedder: BulkEmbedder for the same model and backend as this store
+            
+        Returns:
+            Number of chunks added
+        """
+        if not chunks:
+            return 0
+        start_time = time.time()
+        n_chunks = len(chunks)
+        chunks, duplicates = self._split_duplicates(chunks)
+        self._count_chunk_tokens(chunks)
+        
+        # Group chunks by content so repeated text is encoded once
+        by_hash: Dict[str, List[DocumentChunk]] = {}
+        for chunk in chunks:
+            by_hash.setdefault(content_hash(chunk.text), []).append(chunk)
+        cached = self.embedding_cache.get_many(list(by_hash)) if self.embedding_cache else {}
+        missing = [h for h in by_hash if h not in cached]
+        logger.info(f"🏭 Bulk add: {len(chunks)} chunks, {len(by_hash) - len(missing)} cached, "
+                    f"{len(missing)} to encode")
+        
+        def collect(hashes: List[str], embeddings: np.ndarray):
+            batch_chunks, batch_embeddings = [], []
+            for h, embedding in zip(hashes, embeddings):
+                for chunk in by_hash[h]:
+                    batch_chunks.append(chunk)
+                    batch_embeddings.append(embedding)
+            if batch_chunks:
+                self._index_chunks(batch_chunks, np.vstack(batch_embeddings))
+                self._register_canonicals(batch_chunks)
+        
+        if cached:
+            cached_hashes = list(cached)
+            collect(cached_hashes, np.vstack([cached[h] for h in cached_hashes]))
+        
+        texts = [by_hash[h][0].text for h in missing]
+        token_counts = [by_hash[h][0].metadata['token_count'] for h in missing]
+        for positions, embeddings in embedder.iter_embeddings(texts, token_counts):
+            hashes = [missing[i] for i in positions]
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(hashes, embeddings)
+            collect(hashes, embeddings)
+        self.compact()
+        self._link_duplicates(duplicates)
+        
+        elapsed = time.time() - start_time
+        self.performance_stats.add('chunks_processed', n_chunks)
+        self.performance_stats.add('embedding_time', int(embedder.stats['encode_time']))
+        self.performance_stats.add('encoding_seconds', embedder.stats['encode_time'])
+        self.performance_stats.add('encoded_tokens', sum(by_hash[h][0].metadata['token_count'] for h in missing))
+        logger.info(f"✅ Bulk add: {n_chunks} chunks in {elapsed:.2f}s ({n_chunks / elapsed:.1f} chunks/s)")
+        return n_chunks
     
-    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None) -> List[SearchResult]:
+    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None,
+               mmr_lambda: Optional[float] = None, fetch_k: int = 100) -> List[SearchResult]:
         """
         Search for similar chunks
         
@@ -289,84 +894,600 @@ class FAISSVectorStore:
             query: Search query
             k: Number of results to return
             filter_type: Filter by chunk type ('text', 'table', 'chart', 'ocr')
+            filters: Attribute/metadata filters (see search_many)
+            mmr_lambda: Enable MMR diversification (1.0 = relevance only, 0.0 = diversity only)
+            fetch_k: MMR candidate pool size
             
         Returns:
             List of search results
         """
-        if self.index.ntotal == 0:
+        if filter_type:
+            filters = {**(filters or {}), 'chunk_type': filter_type}
+        logger.info(f"🔍 Searching: '{query}' (k={k})")
+        return self.search_many([query], k=k, filters=filters, mmr_lambda=mmr_lambda, fetch_k=fetch_k)[0]
+    
+    def search_range(self, query: str, min_score: float, max_results: int = 50,
+                     filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """
+        Return every chunk whose similarity to the query is at least min_score
+        
+        Args:
+            query: Search query
+            min_score: Cosine similarity threshold
+            max_results: Upper bound on returned results
+            filters: Attribute/metadata filters (see search_many)
+            
+        Returns:
+            Search results above the threshold, best first
+        """
+        state = self._state
+        if state.size == 0:
             logger.warning("⚠️ Vector store is empty")
             return []
-        
-        logger.info(f"🔍 Searching: '{query}' (k={k})")
         start_time = time.time()
+        query_embeddings = self._encode_queries([query])
+        limit = max_results * FILTER_OVERSAMPLE if filters else max_results
+        while True:
+            scores, indices = self._range_search_embeddings(query_embeddings, min_score, limit, state)
+            results = self._collect_results(scores, indices, max_results, filters, state)
+            # Filters can reject most candidates: widen until enough pass or nothing more is above the threshold
+            if len(results) >= max_results or len(indices) < limit or limit >= state.size:
+                break
+            limit *= FILTER_OVERSAMPLE
+        self.performance_stats.add('search_time', int(time.time() - start_time))
+        self.performance_stats.add('searches_performed')
+        logger.info(f"✅ Range search (score >= {min_score}): {len(results)} results")
+        return results
+    
+    def _range_search_embeddings(self, query_embedding: np.ndarray, min_score: float,
+                                 limit: int, state: StoreState) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores and positions above a threshold for one query, best first"""
+        if not state.rerank:
+            try:
+                # Exhaustive threshold search where the index supports it (flat, IVF, scalar quantizers)
+                all_scores, all_indices = [], []
+                if state.index.ntotal > 0:
+                    _, scores, indices = state.index.range_search(query_embedding, min_score)  # type: ignore
+                    all_scores.append(scores)
+                    all_indices.append(indices)
+                for offset, piece in state.delta:
+                    _, scores, indices = piece.range_search(query_embedding, min_score)
+                    all_scores.append(scores)
+                    all_indices.append(indices + offset)
+                scores, indices = np.concatenate(all_scores), np.concatenate(all_indices)
+                order = np.argsort(-scores)[:limit]
+                return scores[order], indices[order]
+            except RuntimeError:
+                pass  # e.g. HNSW: fall back to a bounded top-k search
+        scores, indices = self._search_embeddings(query_embedding, limit, state)
+        keep = scores[0] >= min_score
+        return scores[0][keep], indices[0][keep]
+    
+    def search_adaptive(self, query: str, config: Optional[AdaptiveKConfig] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """
+        Search with k chosen from the score distribution instead of fixed
         
-        # Generate query embedding
-        query_embedding = self.model.encode([query], convert_to_numpy=True, normalize_embeddings=True)
+        Args:
+            query: Search query
+            config: Adaptive-k cut-off parameters (max_k bounds the search)
+            filters: Attribute/metadata filters (see search_many)
+            
+        Returns:
+            The smallest set of results that passes the score floors and ends before a score cliff
+        """
+        config = config or AdaptiveKConfig()
+        results = self.search(query, k=config.max_k, filters=filters)
+        keep = select_adaptive_k([result.score for result in results], config)
+        logger.info(f"🎯 Adaptive k: {keep}/{len(results)}")
+        return results[:keep]
+    
+    def search_hierarchical(self, query: str, k: int = 10, top_documents: int = 5, top_sections: int = 10,
+                            filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """
+        Search chunks only inside the documents and sections whose summaries match the query
         
-        # Search in FAISS index
-        scores, indices = self.index.search(query_embedding, k)  # type: ignore
+        Args:
+            query: Search query
+            k: Number of results to return
+            top_documents: Documents searched entirely
+            top_sections: Sections searched (in any document)
+            filters: Attribute/metadata filters (see search_many)
+            
+        Returns:
+            List of search results (flat search if the store is not hierarchical)
+        """
+        start_time = time.time()
+        query_embeddings = self._encode_queries([query])
+        results = self.search_hierarchical_embeddings(query_embeddings, k, top_documents, top_sections, filters)[0]
+        self.performance_stats.add('search_time', int(time.time() - start_time))
+        self.performance_stats.add('searches_performed')
+        logger.info(f"✅ Hierarchical search completed: {len(results)} results in {time.time() - start_time:.3f}s")
+        return results
+    
+    def search_hierarchical_embeddings(self, query_embeddings: np.ndarray, k: int = 10,
+                                       top_documents: int = 5, top_sections: int = 10,
+                                       filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """
+        search_hierarchical with precomputed normalized query embeddings
         
-        # Prepare results
+        Args:
+            query_embeddings: Query vectors (nq x d), float32
+            k: Number of results to return per query
+            top_documents: Documents searched entirely
+            top_sections: Sections searched (in any document)
+            filters: Attribute/metadata filters (see search_many)
+            
+        Returns:
+            One list of search results per query
+        """
+        state = self._state
+        if state.hierarchy is None:
+            logger.warning("⚠️ Store was not built with hierarchical=True, using flat search")
+            return self._search_state(state, query_embeddings, k, filters, None, k)
         results = []
-        for rank, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx >= len(self.chunks):
-                continue
-                
-            chunk = self.chunks[idx]
+        for i in range(len(query_embeddings)):
+            fetch_k = k * FILTER_OVERSAMPLE if filters else k
+            while True:
+                scores, positions = state.hierarchy.search(query_embeddings[i:i + 1], fetch_k,
+                                                           top_documents, top_sections)
+                query_results = self._collect_results(scores, positions, k, filters, state)
+                if len(query_results) >= k or len(positions) < fetch_k or fetch_k >= state.size:
+                    break
+                fetch_k *= FILTER_OVERSAMPLE
+            results.append(query_results)
+        return results
+    
+    def search_many(self, queries: List[str], k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None,
+                    mmr_lambda: Optional[float] = None, fetch_k: int = 100) -> List[List[SearchResult]]:
+        """
+        Search for several queries with one batched encode and one FAISS search
+        
+        Args:
+            queries: Search queries
+            k: Number of results to return per query
+            filters: Chunk attribute or metadata filters, e.g.
+                {'chunk_type': 'table'} or {'source': ['a.pdf', 'b.pdf']}
+            mmr_lambda: Enable MMR diversification of each query's top-k
+            fetch_k: MMR candidate pool size
             
-            # Apply filter if specified
-            if filter_type and chunk.chunk_type != filter_type:
-                continue
+        Returns:
+            One list of search results per query, in query order
+        """
+        if not queries:
+            return []
+        # Cache keys and results come from the same state, even if a write is published meanwhile
+        state = self._state
+        if state.size == 0:
+            logger.warning("⚠️ Vector store is empty")
+            return [[] for _ in queries]
+        
+        start_time = time.time()
+        
+        # Serve repeated queries from the result cache
+        query_keys = [normalize_query(query) for query in queries]
+        filters_key = (freeze_filters(filters), mmr_lambda, fetch_k if mmr_lambda is not None else None)
+        generation = state.generation
+        results: List[Optional[List[SearchResult]]] = [None] * len(queries)
+        pending = []
+        for i, query_key in enumerate(query_keys):
+            cached = self.result_cache.get((query_key, k, filters_key, generation))
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending.append(i)
+        
+        if pending:
+            # Generate missing query embeddings in a single forward pass
+            query_embeddings = self._encode_queries([queries[i] for i in pending],
+                                                    [query_keys[i] for i in pending])
             
-            result = SearchResult(
-                chunk=chunk,
-                score=float(score),
-                rank=rank
-            )
-            results.append(result)
+            pending_results = self._search_state(state, query_embeddings, k, filters, mmr_lambda, fetch_k)
+            
+            for i, query_results in zip(pending, pending_results):
+                results[i] = query_results
+                # Cached as a tuple: callers get their own list and cannot change later hits
+                self.result_cache.put((query_keys[i], k, filters_key, generation), tuple(query_results))
         
         search_time = time.time() - start_time
-        self.performance_stats['search_time'] += int(search_time)
-        self.performance_stats['searches_performed'] += 1
+        self.performance_stats.add('search_time', int(search_time))
+        self.performance_stats.add('searches_performed', len(queries))
         
-        logger.info(f"✅ Search completed: {len(results)} results in {search_time:.2f}s")
+        logger.info(f"✅ Search completed: {len(queries)} queries, "
+                    f"{sum(len(r) for r in results)} results in {search_time:.2f}s")
         return results
     
-    def save_vector_store(self):
-        """Save vector store to disk"""
-        logger.info("💾 Saving vector store to disk")
+    def search_embeddings(self, query_embeddings: np.ndarray, k: int = 10,
+                          filters: Optional[Dict[str, Any]] = None,
+                          mmr_lambda: Optional[float] = None, fetch_k: int = 100) -> List[List[SearchResult]]:
+        """
+        Search with precomputed normalized query embeddings (no encoding, no result cache)
         
-        # Save FAISS index
-        faiss.write_index(self.index, str(self.vector_store_path / "faiss_index.bin"))
+        Args:
+            query_embeddings: Query vectors (nq x d), float32
+            k: Number of results to return per query
+            filters: Attribute/metadata filters (see search_many)
+            mmr_lambda: Enable MMR diversification of each query's top-k
+            fetch_k: MMR candidate pool size
+            
+        Returns:
+            One list of search results per query
+        """
+        return self._search_state(self._state, query_embeddings, k, filters, mmr_lambda, fetch_k)
+    
+    def _search_state(self, state: StoreState, query_embeddings: np.ndarray, k: int,
+                      filters: Optional[Dict[str, Any]], mmr_lambda: Optional[float],
+                      fetch_k: int) -> List[List[SearchResult]]:
+        """search_embeddings over one pinned state"""
+        if state.size == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        pool = max(fetch_k, k) if mmr_lambda is not None else k
+        rows = self._search_filtered(query_embeddings, pool, filters, state)
+        if mmr_lambda is None:
+            return [self._collect_results(query_scores, query_indices, k, filters, state)
+                    for query_scores, query_indices in rows]
+        return [self._mmr_results(query_embedding, query_scores, query_indices, k, pool, filters, mmr_lambda, state)
+                for query_embedding, (query_scores, query_indices) in zip(query_embeddings, rows)]
+    
+    def _search_filtered(self, query_embeddings: np.ndarray, k: int, filters: Optional[Dict[str, Any]],
+                         state: StoreState) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Candidates per query of which at least k pass the filters, where the index holds that many
         
-        # Save chunks and metadata
-        with open(self.vector_store_path / "chunks.pkl", 'wb') as f:
-            pickle.dump(self.chunks, f)
+        Filtered queries are over-fetched, and queries still short of k matches are
+        searched again with a FILTER_OVERSAMPLE times larger fetch until they have
+        enough or the index returns fewer candidates than asked for.
         
-        with open(self.vector_store_path / "metadata.json", 'w', encoding='utf-8') as f:
-            json.dump(self.chunk_metadata, f, ensure_ascii=False, indent=2)
+        Args:
+            query_embeddings: Query vectors (nq x d)
+            k: Matching candidates needed per query
+            filters: Attribute/metadata filters (see search_many)
+            state: State to search
+            
+        Returns:
+            (scores, indices) per query, best first
+        """
+        fetch_k = k * FILTER_OVERSAMPLE if filters else k
+        scores, indices = self._search_embeddings(query_embeddings, fetch_k, state)
+        rows = list(zip(scores, indices))
+        if not filters:
+            return rows
         
-        # Save configuration
+        def short(row: Tuple[np.ndarray, np.ndarray]) -> bool:
+            positions = row[1]
+            valid = positions[(positions >= 0) & (positions < state.size)]
+            if len(valid) < fetch_k:
+                return False  # Exhausted: everything the index can return was searched
+            return sum(1 for idx in valid if matches_filters(state.chunks[idx], filters)) < k
+        
+        pending = [q for q, row in enumerate(rows) if short(row)]
+        while pending and fetch_k < state.size:
+            fetch_k *= FILTER_OVERSAMPLE
+            scores, indices = self._search_embeddings(query_embeddings[pending], fetch_k, state)
+            for q, row in zip(pending, zip(scores, indices)):
+                rows[q] = row
+            pending = [q for q in pending if short(rows[q])]
+        return rows
+    
+    def _get_vectors(self, positions: np.ndarray, state: StoreState) -> np.ndarray:
+        """Float vectors for chunk positions (in-memory embeddings, re-rank file or index reconstruction)"""
+        chunks = state.chunks
+        if all(chunks[p].embedding is not None for p in positions):
+            return np.vstack([chunks[p].embedding for p in positions]).astype(np.float32)
+        if state.rerank:
+            return np.asarray(state.vectors[positions], dtype=np.float32)
+        positions = positions.astype(np.int64)
+        vectors = np.empty((len(positions), self.embedding_dim), dtype=np.float32)
+        in_main = positions < state.index.ntotal
+        if in_main.any():
+            vectors[in_main] = state.index.reconstruct_batch(positions[in_main])  # type: ignore
+        for offset, piece in state.delta:
+            in_piece = (positions >= offset) & (positions < offset + piece.ntotal)
+            if in_piece.any():
+                vectors[in_piece] = piece.reconstruct_batch(positions[in_piece] - offset)
+        return vectors
+    
+    def _mmr_results(self, query_embedding: np.ndarray, scores: np.ndarray, indices: np.ndarray,
+                     k: int, pool: int, filters: Optional[Dict[str, Any]], mmr_lambda: float,
+                     state: StoreState) -> List[SearchResult]:
+        """Diversify one query's candidate pool with MMR"""
+        chunks = state.chunks
+        valid = [(float(score), int(idx)) for score, idx in zip(scores, indices)
+                 if 0 <= idx < state.size and (not filters or matches_filters(chunks[idx], filters))]
+        valid = valid[:pool]
+        if not valid:
+            return []
+        positions = np.array([idx for _, idx in valid], dtype=np.int64)
+        order = mmr_select(query_embedding, self._get_vectors(positions, state), k, mmr_lambda)
+        return [SearchResult(chunk=chunks[positions[i]], score=valid[i][0], rank=rank)
+                for rank, i in enumerate(order)]
+    
+    def search_lexical(self, query: str, k: int = 10,
+                       filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """
+        BM25 keyword search with Turkish casefolding and stemming
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            filters: Attribute/metadata filters (see search_many)
+            
+        Returns:
+            List of search results scored by BM25
+        """
+        state = self._state
+        fetch_k = k * FILTER_OVERSAMPLE if filters else k
+        while True:
+            hits = state.lexical_index.search(query, fetch_k, max_doc=state.size)
+            results: List[SearchResult] = []
+            for idx, score in hits:
+                chunk = state.chunks[idx]
+                if filters and not matches_filters(chunk, filters):
+                    continue
+                results.append(SearchResult(chunk=chunk, score=score, rank=len(results), lexical_score=score))
+                if len(results) >= k:
+                    break
+            # Refetch deeper while filters leave fewer than k of the matching documents
+            if len(results) >= k or len(hits) < fetch_k or fetch_k >= state.size:
+                return results
+            fetch_k *= FILTER_OVERSAMPLE
+    
+    def search_hybrid(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None,
+                      candidates: int = 50, lexical_weight: float = 1.0, rrf_k: int = 60) -> List[SearchResult]:
+        """
+        Fuse dense and BM25 rankings with reciprocal rank fusion
+        
+        Exact tokens such as "BIST-100" or "TÜFE" that the embedding model blurs are
+        recovered by the lexical ranking, while paraphrases still come from dense search.
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            filters: Attribute/metadata filters (see search_many)
+            candidates: Depth of each ranking before fusion
+            lexical_weight: Weight of the lexical ranking relative to dense (1.0)
+            rrf_k: RRF damping constant
+            
+        Returns:
+            List of search results scored by fused RRF score
+        """
+        state = self._state
+        if state.size == 0:
+            logger.warning("⚠️ Vector store is empty")
+            return []
+        
+        start_time = time.time()
+        candidates = max(candidates, k)
+        
+        query_embedding = self._encode_queries([query])
+        while True:
+            scores, indices = self._search_embeddings(query_embedding, candidates, state)
+            dense = {int(idx): float(score) for score, idx in zip(scores[0], indices[0])
+                     if 0 <= idx < state.size}
+            lexical = dict(state.lexical_index.search(query, candidates, max_doc=state.size))
+            
+            fused = reciprocal_rank_fusion([list(dense), list(lexical)], k=rrf_k,
+                                           weights=[1.0, lexical_weight])
+            
+            results: List[SearchResult] = []
+            for idx, score in fused:
+                chunk = state.chunks[idx]
+                if filters and not matches_filters(chunk, filters):
+                    continue
+                results.append(SearchResult(chunk=chunk, score=score, rank=len(results),
+                                            dense_score=dense.get(idx), lexical_score=lexical.get(idx)))
+                if len(results) >= k:
+                    break
+            # Deepen both rankings while filters leave fewer than k fused results
+            exhausted = len(dense) < candidates and len(lexical) < candidates
+            if len(results) >= k or exhausted or candidates >= state.size:
+                break
+            candidates *= FILTER_OVERSAMPLE
+        
+        search_time = time.time() - start_time
+        self.performance_stats.add('search_time', int(search_time))
+        self.performance_stats.add('searches_performed')
+        logger.info(f"✅ Hybrid search completed: {len(results)} results in {search_time:.3f}s")
+        return results
+    
+    def _encode_documents(self, texts: List[str]) -> np.ndarray:
+        """Encode chunk texts through the persistent embedding cache"""
+        def encode(batch: List[str]) -> np.ndarray:
+            return self.model.encode(batch, convert_to_numpy=True, normalize_embeddings=True)
+        
+        if self.embedding_cache is None:
+            return encode(texts)
+        return self.embedding_cache.encode(texts, encode)
+    
+    def _encode_titles(self, chunks: List[DocumentChunk]) -> Dict[str, np.ndarray]:
+        """Embeddings of the document and section titles of chunks (hierarchical stores)"""
+        titles = hierarchy_titles(chunks)
+        return dict(zip(titles, self._encode_documents(titles))) if titles else {}
+    
+    def _encode_queries(self, queries: List[str], query_keys: Optional[List[str]] = None) -> np.ndarray:
+        """Encode queries, reusing cached embeddings and batching the misses"""
+        query_keys = query_keys or [normalize_query(query) for query in queries]
+        embeddings: List[Optional[np.ndarray]] = [self.query_embedding_cache.get(key) for key in query_keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.model.encode([queries[i] for i in missing],
+                                        convert_to_numpy=True, normalize_embeddings=True)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self.query_embedding_cache.put(query_keys[i], embedding)
+        return np.vstack(embeddings).astype(np.float32)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get retrieval cache hit-rate metrics"""
+        return {
+            'index_generation': self.index_generation,
+            'query_embeddings': self.query_embedding_cache.get_stats(),
+            'results': self.result_cache.get_stats()
+        }
+    
+    def _collect_results(self, scores: np.ndarray, indices: np.ndarray, k: int,
+                         filters: Optional[Dict[str, Any]], state: StoreState) -> List[SearchResult]:
+        """Turn one row of FAISS output into filtered, ranked search results"""
+        results: List[SearchResult] = []
+        for score, idx in zip(scores, indices):
+            if idx < 0 or idx >= state.size:
+                continue
+            
+            chunk = state.chunks[idx]
+            
+            # Apply filters if specified
+            if filters and not matches_filters(chunk, filters):
+                continue
+            
+            results.append(SearchResult(chunk=chunk, score=float(score), rank=len(results)))
+            if len(results) >= k:
+                break
+        return results
+    
+    def get_near_duplicate_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Near-duplicate suppression savings (None if disabled)
+        
+        Returns:
+            Detector counters plus the vectors, index bytes and estimated encoding
+            time that suppressed duplicates did not cost
+        """
+        if self.near_duplicates is None:
+            return None
+        report = self.near_duplicates.get_stats()
+        duplicates = report['exact_duplicates'] + report['near_duplicates']
+        performance = self.performance_stats.snapshot()
+        bytes_per_vector = estimate_bytes_per_vector(self.index_type, self.embedding_dim, self.index_params)
+        if self.rerank:
+            bytes_per_vector += 4 * self.embedding_dim  # float32 re-ranking vector on disk
+        seconds_per_token = (performance['encoding_seconds'] / performance['encoded_tokens']
+                             if performance['encoded_tokens'] else 0.0)
+        report.update({
+            'vectors_saved': duplicates,
+            'index_bytes_saved': int(duplicates * bytes_per_vector),
+            'embedding_seconds_saved': round(report['tokens_skipped'] * seconds_per_token, 3),
+            'duplicate_ratio': duplicates / report['checked'] if report['checked'] else 0.0
+        })
+        return report
+    
+    def save_vector_store(self) -> str:
+        """
+        Save vector store to disk as a new snapshot and publish it atomically
+        
+        Returns:
+            Snapshot version
+        """
+        logger.info("💾 Saving vector store to disk")
+        
+        # One immutable state is written, so ingestion continues meanwhile
+        state = self._state
+        index_bytes = (faiss.serialize_index_binary(state.index) if is_binary_index(state.index)
+                       else faiss.serialize_index(state.index))
+        chunks = state.chunks[:state.size]
+        chunks_bytes = pickle.dumps(chunks)
+        chunk_metadata = {chunk.id: self.chunk_metadata[chunk.id] for chunk in chunks
+                          if chunk.id in self.chunk_metadata}
+        delta_vectors = state.delta_vectors() if state.delta else None
         config = {
             'model_name': self.model_name,
             'index_type': self.index_type,
+            'index_params': dict(self.index_params),
+            'rerank': state.rerank,
+            'rerank_factor': self.rerank_factor,
             'embedding_dim': self.embedding_dim,
-            'total_chunks': len(self.chunks),
-            'performance_stats': self.performance_stats
+            'total_chunks': state.size,
+            'performance_stats': self.performance_stats.snapshot()
         }
         
-        with open(self.vector_store_path / "config.json", 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        def write_files(directory: Path):
+            index_bytes.tofile(str(directory / "faiss_index.bin"))
+            # Vectors added since the last compaction, indexed again on load
+            if delta_vectors is not None:
+                np.save(directory / "delta_vectors.npy", delta_vectors)
+            with open(directory / "chunks.pkl", 'wb') as f:
+                f.write(chunks_bytes)
+            with open(directory / "metadata.json", 'w', encoding='utf-8') as f:
+                json.dump(chunk_metadata, f, ensure_ascii=False, indent=2)
+            with open(directory / "config.json", 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+            # The live re-ranking file is append-only; the snapshot keeps a copy of the state's prefix
+            if config['rerank'] and state.vectors is not None:
+                block = max(1, (1 << 24) // (self.embedding_dim * 4))
+                with open(directory / "vectors.f32", 'wb') as dst:
+                    for start in range(0, state.size, block):
+                        dst.write(np.ascontiguousarray(state.vectors[start:start + block]).tobytes())
         
-        logger.info(f"✅ Vector store saved: {len(self.chunks)} chunks")
+        version = self.snapshots.write_snapshot(write_files, {'total_chunks': config['total_chunks'],
+                                                              'model_name': self.model_name})
+        logger.info(f"✅ Vector store saved: {config['total_chunks']} chunks ({version})")
+        return version
+    
+    def schedule_save(self):
+        """Request a background snapshot; bursts of requests are coalesced to one per flush_interval"""
+        if self._flusher is None:
+            self._flusher = BackgroundFlusher(self.save_vector_store, self.flush_interval)
+        self._flusher.request()
+    
+    def close(self):
+        """Flush pending background saves and stop the flush and writer threads"""
+        if self._flusher is not None:
+            self._flusher.close(flush=True)
+            self._flusher = None
+        self._writer.close()
     
-    def load_vector_store(self) -> bool:
-        """Load vector store from disk"""
+    def relocate(self, vector_store_path: str) -> str:
+        """
+        Move the store to another directory and save it there as a new snapshot
+        
+        Args:
+            vector_store_path: New store directory (e.g. a shard directory, or the live path
+                a migrated store takes over)
+            
+        Returns:
+            Snapshot version written in the new directory
+        """
+        if self._flusher is not None:
+            self._flusher.close(flush=False)
+            self._flusher = None
+        old_vectors_path = self.float_vectors_path
+        
+        def apply(draft: StoreDraft):
+            # Writer thread: nothing is appended to the re-ranking file during the copy
+            self.vector_store_path = Path(vector_store_path)
+            self.vector_store_path.mkdir(parents=True, exist_ok=True)
+            self.snapshots = SnapshotManager(self.vector_store_path, keep=self.snapshots.keep)
+            if draft.rerank and draft.published_size and old_vectors_path != self.float_vectors_path:
+                self._replace_float_vectors(old_vectors_path)
+        self._writer.run(apply)
+        return self.save_vector_store()
+    
+    def export_snapshot(self, archive_path: str) -> Path:
+        """Export the live snapshot as a single .tar.gz file for provisioning other nodes"""
+        return self.snapshots.export_snapshot(archive_path)
+    
+    def import_snapshot(self, archive_path: str) -> bool:
+        """Import an exported snapshot, publish it and load it (no re-embedding)"""
+        self.snapshots.import_snapshot(archive_path)
+        return self.load_vector_store()
+    
+    def load_vector_store(self, verify: bool = True) -> bool:
+        """
+        Load vector store from disk
+        
+        Args:
+            verify: Check snapshot files against their manifest checksums
+        """
         try:
             logger.info("📂 Loading vector store from disk")
             
+            # Live snapshot, or the flat pre-snapshot layout of older stores
+            store_dir = self.snapshots.current_dir() or self.vector_store_path
+            if store_dir != self.vector_store_path and verify:
+                self.snapshots.verify()
+            
             # Load configuration
-            config_path = self.vector_store_path / "config.json"
+            config_path = store_dir / "config.json"
             if not config_path.exists():
                 logger.warning("⚠️ No saved vector store found")
                 return False
@@ -376,56 +1497,140 @@ class FAISSVectorStore:
             
             # Verify model compatibility
             if config['model_name'] != self.model_name:
-                logger.warning(f"⚠️ Model mismatch: {config['model_name']} vs {self.model_name}")
+                logger.warning(f"⚠️ Model mismatch: {config['model_name']} vs {self.model_name} "
+                               f"(see model_migration.py to switch models without downtime)")
                 return False
             
             # Load FAISS index
-            index_path = self.vector_store_path / "faiss_index.bin"
+            index_path = store_dir / "faiss_index.bin"
             if index_path.exists():
-                self.index = faiss.read_index(str(index_path))
+                index_type = config.get('index_type', self.index_type)
+                index = (faiss.read_index_binary(str(index_path)) if index_type == "binary"
+                         else faiss.read_index(str(index_path)))
+                index_params = config.get('index_params', {})
+                if index_type == "hnsw" and 'ef_search' in index_params:
+                    base_index(index).hnsw.efSearch = index_params['ef_search']
+                delta_path = store_dir / "delta_vectors.npy"
+                delta_vectors = np.load(delta_path) if delta_path.exists() else None
             else:
                 logger.warning("⚠️ FAISS index not found")
                 return False
             
             # Load chunks
-            chunks_path = self.vector_store_path / "chunks.pkl"
+            chunks_path = store_dir / "chunks.pkl"
             if chunks_path.exists():
                 with open(chunks_path, 'rb') as f:
-                    self.chunks = pickle.load(f)
+                    chunks = pickle.load(f)
+                lexical_index = BM25Index()
+                lexical_index.add_documents(chunk.text for chunk in chunks)
             else:
                 logger.warning("⚠️ Chunks file not found")
                 return False
             
             # Load metadata
-            metadata_path = self.vector_store_path / "metadata.json"
+            chunk_metadata = {}
+            metadata_path = store_dir / "metadata.json"
             if metadata_path.exists():
                 with open(metadata_path, 'r', encoding='utf-8') as f:
-                    self.chunk_metadata = json.load(f)
+                    chunk_metadata = json.load(f)
             
-            # Update performance stats
-            self.performance_stats.update(config.get('performance_stats', {}))
+            delta = append_delta((), index.ntotal, delta_vectors) if delta_vectors is not None else ()
+            n_vectors = index.ntotal + (len(delta_vectors) if delta_vectors is not None else 0)
+            # Summaries are not saved; they are rebuilt from the stored vectors and cached title embeddings
+            title_vectors = self._encode_titles(chunks) if self.hierarchical else None
             
-            logger.info(f"✅ Vector store loaded: {len(self.chunks)} chunks")
+            def apply(draft: StoreDraft) -> bool:
+                # Runs on the writer thread: the live re-ranking file is not being appended to
+                rerank = config.get('rerank', False)
+                expected_bytes = n_vectors * self.embedding_dim * 4
+                snapshot_vectors = store_dir / "vectors.f32"
+                if rerank and store_dir != self.vector_store_path and snapshot_vectors.exists() and (
+                        not self.float_vectors_path.exists() or
+                        self.float_vectors_path.stat().st_size != expected_bytes):
+                    self._replace_float_vectors(snapshot_vectors)
+                if rerank and (not self.float_vectors_path.exists() or
+                               self.float_vectors_path.stat().st_size != expected_bytes):
+                    if index_type == "binary":
+                        logger.error("❌ Binary index needs its float32 re-ranking vectors, which are missing or stale")
+                        return False
+                    logger.warning("⚠️ Re-ranking vectors missing or stale, re-ranking disabled")
+                    rerank = False
+                
+                self.index_type = index_type
+                self.index_params = index_params
+                self.rerank_factor = config.get('rerank_factor', self.rerank_factor)
+                hierarchy = HierarchyState() if title_vectors is not None else None
+                if hierarchy is not None and chunks:
+                    loaded = StoreState(index=index, chunks=chunks, size=len(chunks), lexical_index=lexical_index,
+                                        rerank=rerank, delta=delta,
+                                        vectors=self._map_float_vectors(len(chunks)) if rerank else None)
+                    hierarchy = hierarchy.add(chunks, 0, self._get_vectors(np.arange(len(chunks)), loaded),
+                                              title_vectors)
+                draft.replace(index, delta, chunks, lexical_index, rerank, chunk_metadata, hierarchy)
+                
+                # Update performance stats
+                self.performance_stats.update(config.get('performance_stats', {}))
+                return True
+            
+            if not self._writer.run(apply):
+                return False
+            if self.near_duplicates is not None:
+                # Later ingestion is deduplicated against the loaded chunks too
+                near_duplicates = NearDuplicateIndex(self.near_duplicates.threshold)
+                for chunk in chunks:
+                    near_duplicates.register(chunk)
+                self.near_duplicates = near_duplicates
+            
+            logger.info(f"✅ Vector store loaded: {len(chunks)} chunks "
+                        f"({self.snapshots.current_version() or 'legacy layout'})")
             return True
             
+        except SnapshotError as e:
+            logger.error(f"❌ Snapshot verification failed: {e}")
+            return False
         except Exception as e:
             logger.error(f"❌ Failed to load vector store: {e}")
             return False
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get vector store statistics"""
+        state = self._state
+        chunks = state.chunks[:state.size]
         return {
-            'total_chunks': len(self.chunks),
+            'total_chunks': len(chunks),
             'chunk_types': {
-                chunk_type: len([c for c in self.chunks if c.chunk_type == chunk_type])
+                chunk_type: len([c for c in chunks if c.chunk_type == chunk_type])
                 for chunk_type in ['text', 'table', 'chart', 'ocr']
             },
-            'sources': list(set(chunk.source for chunk in self.chunks)),
-            'performance_stats': self.performance_stats,
+            'sources': list(set(chunk.source for chunk in chunks)),
+            'performance_stats': self.performance_stats.snapshot(),
+            'cache_stats': self.get_cache_stats(),
+            'lexical_index': state.lexical_index.get_stats(),
+            'embedding_cache': self.embedding_cache.get_stats() if self.embedding_cache else None,
+            'encoder_backend': self.encoder_backend,
+            'snapshot': {
+                'current': self.snapshots.current_version(),
+                'versions': self.snapshots.list_versions(),
+                'flusher': self._flusher.stats if self._flusher else None
+            },
             'index_info': {
                 'type': self.index_type,
+                'params': self.index_params,
+                'rerank': state.rerank,
+                'bytes_per_chunk': self._bytes_per_chunk(state),
                 'dimension': self.embedding_dim,
-                'total_vectors': self.index.ntotal
+                'stored_dimension': base_index(state.index).d,
+                'total_vectors': state.size
+            },
+            'hierarchy': state.hierarchy.get_stats() if state.hierarchy is not None else None,
+            'near_duplicates': self.get_near_duplicate_report(),
+            'concurrency': {
+                'generation': state.generation,
+                'main_vectors': state.index.ntotal,
+                'delta_vectors': state.delta_size,
+                'delta_pieces': len(state.delta),
+                'writer': self._writer.stats.snapshot(),
+                **self.write_stats.snapshot()
             }
         }
 
@@ -9,16 +9,18 @@ import time
 from typing import List, Dict, Optional, Tuple
 from groq import Groq
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 from turkish_prompt_optimizer import TurkishPromptOptimizer, PromptContext, DocumentType, QueryType
+from vector_store_snapshots import SnapshotManager
+from model_registry import acquire_encoder
 
 class GroqOptimizedRAG:
     """Advanced Groq RAG system with optimized Turkish prompts"""
     
-    def __init__(self, groq_api_key: str, vector_store_path: str = "vector_store"):
+    def __init__(self, groq_api_key: str, vector_store_path: str = "vector_store", encoder_backend: str = "torch"):
         self.groq_client = Groq(api_key=groq_api_key)
         self.vector_store_path = vector_store_path
+        self.encoder_backend = encoder_backend
         self.embedding_model = None
         self.faiss_index = None
         self.chunks = []
@@ -43,19 +45,23 @@ class GroqOptimizedRAG:
         try:
             # Load embedding model
             print("📥 Embedding model yükleniyor...")
-            self.embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-mpnet-base-v2')
+            self.embedding_model = acquire_encoder('sentence-transformers/paraphrase-multilingual-mpnet-base-v2',
+                                                   self.encoder_backend)
+            
+            # Live snapshot written by FAISSVectorStore, or the older flat layout
+            store_dir = str(SnapshotManager(self.vector_store_path).current_dir() or self.vector_store_path)
             
             # Load FAISS index
-            index_path = os.path.join(self.vector_store_path, "faiss_index.bin")
+            index_path = os.path.join(store_dir, "faiss_index.bin")
             self.faiss_index = faiss.read_index(index_path)
             
             # Load chunks and metadata
-            chunks_path = os.path.join(self.vector_store_path, "chunks.pkl")
+            chunks_path = os.path.join(store_dir, "chunks.pkl")
             import pickle
             with open(chunks_path, 'rb') as f:
                 self.chunks = pickle.load(f)
             
-            with open(os.path.join(self.vector_store_path, "metadata.json"), 'r', encoding='utf-8') as f:
+            with open(os.path.join(store_dir, "metadata.json"), 'r', encoding='utf-8') as f:
                 self.chunk_metadata = json.load(f)
             
             print(f"✅ Vector store yüklendi: {len(self.chunks)} chunk")
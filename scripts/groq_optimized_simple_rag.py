@@ -1,35 +1,81 @@
 """
 🚀 Groq Optimized Simple RAG Pipeline
 Advanced Turkish language RAG system with optimized prompts - Simple Version
+
+Serves one corpus across every analysis file in analysis_output/. The corpus
+is published as immutable generations (see rag_generations): uploads are
+indexed in the background and become visible with one atomic flip, while
+in-flight queries finish on the generation they started with. Each
+document's chunks occupy one contiguous id range of a segment, so queries
+scoped to a set of documents scan only those ranges.
 """
 
 import os
 import json
 import time
-from typing import List, Dict, Optional, Tuple
+import pickle
+import shutil
+import tempfile
+from typing import Iterable, List, Dict, Optional, Tuple
 from groq import Groq
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 try:
     from .turkish_prompt_optimizer import TurkishPromptOptimizer, PromptContext, DocumentType, QueryType
+    from .embedding_cache import EmbeddingCache
+    from .embedding_backends import cache_model_key
+    from .model_registry import acquire_encoder
+    from .adaptive_retrieval import AdaptiveKConfig, ContextTokenStats, estimate_tokens, select_adaptive_k
+    from .vector_store_snapshots import file_sha256
+    from .rag_generations import CorpusGeneration, GenerationalCorpus
 except ImportError:
     from turkish_prompt_optimizer import TurkishPromptOptimizer, PromptContext, DocumentType, QueryType
+    from embedding_cache import EmbeddingCache
+    from embedding_backends import cache_model_key
+    from model_registry import acquire_encoder
+    from adaptive_retrieval import AdaptiveKConfig, ContextTokenStats, estimate_tokens, select_adaptive_k
+    from vector_store_snapshots import file_sha256
+    from rag_generations import CorpusGeneration, GenerationalCorpus
+
+EMBEDDING_MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-mpnet-base-v2'
+
+# Persisted per-analysis-file index (<analysis name>.rag_index/ next to the JSON file)
+INDEX_CACHE_SUFFIX = ".rag_index"
+INDEX_CACHE_FORMAT = 2
+
+ANALYSIS_FILE_SUFFIX = "_complete_analysis.json"
+
+# Texts per encode call while indexing; the shared model is locked per call, so small
+# calls let query encodes interleave with an ingestion
+INGEST_ENCODE_BATCH = 32
+
+def document_id_for(analysis_path: str) -> str:
+    """Document id of an analysis file (the backend's upload id, or the bulletin name)"""
+    name = os.path.basename(analysis_path)
+    if name.endswith(ANALYSIS_FILE_SUFFIX):
+        return name[:-len(ANALYSIS_FILE_SUFFIX)]
+    return os.path.splitext(name)[0]
 
 class GroqOptimizedSimpleRAG:
     """Simple optimized Groq RAG system with Turkish prompts"""
     
-    def __init__(self, groq_api_key: str, specific_analysis_file: Optional[str] = None):
+    def __init__(self, groq_api_key: str, specific_analysis_file: Optional[str] = None,
+                 encoder_backend: str = "torch", onnx_path: Optional[str] = None,
+                 adaptive_k: bool = True, analysis_dir: Optional[str] = None):
         self.groq_client = Groq(api_key=groq_api_key)
-        self.embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-mpnet-base-v2')
+        # Loaded once per process; rebuilding the pipeline after an upload reuses it
+        self.embedding_model = acquire_encoder(EMBEDDING_MODEL_NAME, encoder_backend, onnx_path)
+        self.encoder_backend = encoder_backend
+        self.embedding_cache = EmbeddingCache(cache_model_key(EMBEDDING_MODEL_NAME, encoder_backend))
         
         # Initialize prompt optimizer
         self.prompt_optimizer = TurkishPromptOptimizer()
         
-        # Load extracted data
-        self.chunks = []
-        self.faiss_index = None
+        # Load extracted data into a corpus read through immutable generations
+        self.corpus = GenerationalCorpus()
         self.specific_analysis_file = specific_analysis_file
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.analysis_dir = analysis_dir or os.path.join(project_root, "analysis_output")
         self._load_extracted_data()
         
         # Performance tracking
@@ -40,216 +86,321 @@ class GroqOptimizedSimpleRAG:
             'query_types': [],
             'document_types': []
         }
+        
+        # Score-aware number of chunks sent to the LLM (at most 5), and tokens sent per query type
+        self.adaptive_config = AdaptiveKConfig(max_k=5) if adaptive_k else None
+        self.context_token_stats = ContextTokenStats()
     
     def _load_extracted_data(self):
-        """Load extracted data from integrated analyzer"""
+        """Load every analysis file into the corpus (or only `specific_analysis_file`)"""
         try:
-            # Load from analysis output - get correct path relative to project root
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            analysis_dir = os.path.join(project_root, "analysis_output")
-            
-            if not os.path.exists(analysis_dir):
-                print(f"❌ Analysis directory not found: {analysis_dir}")
-                print(f"📁 Current working directory: {os.getcwd()}")
-                print(f"📁 Project root: {project_root}")
-                return
-            
-            # Use specific file if provided, otherwise find the latest analysis file
             if self.specific_analysis_file and os.path.exists(self.specific_analysis_file):
-                analysis_path = self.specific_analysis_file
-                latest_file = os.path.basename(analysis_path)
+                analysis_paths = [self.specific_analysis_file]
             else:
-                analysis_files = [f for f in os.listdir(analysis_dir) if f.endswith('.json')]
-                if not analysis_files:
-                    print(f"❌ No analysis files found in {analysis_dir}")
+                if not os.path.exists(self.analysis_dir):
+                    print(f"❌ Analysis directory not found: {self.analysis_dir}")
+                    print(f"📁 Current working directory: {os.getcwd()}")
                     return
-                
-                # Find the latest file by modification time, not alphabetically
-                latest_file = max(analysis_files, key=lambda f: os.path.getmtime(os.path.join(analysis_dir, f)))
-                analysis_path = os.path.join(analysis_dir, latest_file)
-            
-            print(f"📄 Loading analysis from: {latest_file}")
-            
-            with open(analysis_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Extract chunks from analysis
-            self.chunks = []
-            
-            # First try to load pre-made chunks if available (new format)
-            if 'chunks' in data and data['chunks']:
-                print(f"🔍 Found pre-made chunks in new format: {len(data['chunks'])}")
-                for chunk_data in data['chunks']:
-                    self.chunks.append({
-                        'content': chunk_data.get('text', ''),
+    
+                analysis_paths = [os.path.join(self.analysis_dir, f) for f in os.listdir(self.analysis_dir)
+                                  if f.endswith('.json')]
+                if not analysis_paths:
+                    print(f"❌ No analysis files found in {self.analysis_dir}")
+                    return
+    
+                # Oldest first, so document id ranges follow ingestion order
+                analysis_paths.sort(key=os.path.getmtime)
+    
+            print(f"📚 Loading {len(analysis_paths)} analysis file(s)")
+            start_time = time.time()
+            # Streamed into segments and published as a single generation
+            self.corpus.add_documents(self._iter_documents(analysis_paths))
+            print(f"✅ Corpus ready: {len(self.documents)} documents, {self.corpus.current.size} chunks "
+                  f"({time.time() - start_time:.1f}s)")
+    
+        except Exception as e:
+            print(f"❌ Error loading data: {e}")
+    
+    def _iter_documents(self, analysis_paths: List[str]):
+        """Load analysis files one at a time as corpus documents, skipping unreadable ones"""
+        for analysis_path in analysis_paths:
+            try:
+                source_sha256 = file_sha256(analysis_path)
+                chunks, embeddings = self._load_document(analysis_path, source_sha256)
+            except Exception as e:
+                print(f"❌ Error loading {os.path.basename(analysis_path)}: {e}")
+                continue
+            document_id = document_id_for(analysis_path)
+            for chunk in chunks:
+                chunk['document_id'] = document_id
+            yield document_id, {'path': analysis_path, 'sha256': source_sha256}, chunks, embeddings
+    
+    @property
+    def documents(self) -> Dict[str, Dict]:
+        """document_id -> {'path', 'sha256', 'chunks'} of the current generation"""
+        return self.corpus.current.documents
+    
+    @property
+    def chunks(self) -> List[Dict]:
+        """All chunks of the current generation (a copy; prefer get_corpus_stats for counts)"""
+        return list(self.corpus.current.iter_chunks())
+    
+    @property
+    def faiss_index(self):
+        """First index segment of the current generation, or None before anything is indexed"""
+        segments = self.corpus.current.segments
+        return segments[0].index if segments else None
+    
+    def add_document(self, analysis_path: str) -> int:
+        """
+        Index one analysis file in the background and publish it as a new generation
+    
+        Parsing, encoding and segment building happen before the flip; queries keep
+        running on the previous generation meanwhile. A file already loaded with the
+        same content is skipped; a changed file replaces its earlier version.
+    
+        Args:
+            analysis_path: Analysis JSON file
+    
+        Returns:
+            Number of chunks added
+        """
+        loaded = self.documents.get(document_id_for(analysis_path))
+        if loaded is not None and loaded['sha256'] == file_sha256(analysis_path):
+            return 0
+        return self.corpus.add_documents(self._iter_documents([analysis_path]))
+    
+    def remove_document(self, document_id: str) -> bool:
+        """Remove a document from the corpus; returns False if it was not loaded"""
+        return self.corpus.remove_document(document_id)
+    
+    def _load_document(self, analysis_path: str, source_sha256: str) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """Chunks and embeddings of one analysis file, from its index cache or freshly encoded"""
+        cached = self._load_index_cache(analysis_path, source_sha256)
+        if cached is not None:
+            return cached
+    
+        with open(analysis_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        chunks = self._parse_analysis(data)
+        if not chunks:
+            print(f"⚠️ No chunks in {os.path.basename(analysis_path)}")
+            return [], None
+    
+        embeddings = self._embed_chunks(chunks)
+        self._save_index_cache(analysis_path, source_sha256, chunks, embeddings)
+        print(f"📄 Indexed {os.path.basename(analysis_path)}: {len(chunks)} chunks "
+              f"(embedding cache hit ratio: {self.embedding_cache.get_stats()['hit_ratio']:.1%})")
+        return chunks, embeddings
+    
+    def _parse_analysis(self, data: Dict) -> List[Dict]:
+        """Extract chunks from an integrated analyzer result (pre-made chunks or pages/charts)"""
+        chunks = []
+    
+        # First try to load pre-made chunks if available (new format)
+        if 'chunks' in data and data['chunks']:
+            for chunk_data in data['chunks']:
+                chunks.append({
+                    'content': chunk_data.get('text', ''),
+                    'type': 'text',
+                    'page': chunk_data.get('metadata', {}).get('page', 0),
+                    'metadata': chunk_data.get('metadata', {})
+                })
+            return chunks
+    
+        # Fallback to old format processing
+        # Add PDF content pages
+        pdf_content = data.get('pdf_content', {})
+        content = data.get('content', {})
+    
+        # Try both old and new formats
+        pages = pdf_content.get('pages', []) or content.get('pages_data', [])
+    
+        for page in pages:
+            page_num = page.get('sayfa', 0)
+    
+            # Add title as a chunk
+            title = page.get('başlık', '').strip()
+            if title:
+                chunks.append({
+                    'content': title,
+                    'type': 'title',
+                    'page': page_num,
+                    'metadata': {'type': 'title', 'page': page_num}
+                })
+    
+            # Add paragraphs as chunks
+            paragraphs = page.get('paragraflar', [])
+    
+            # Handle both string and list formats
+            if isinstance(paragraphs, str):
+                try:
+                    import ast
+                    paragraphs = ast.literal_eval(paragraphs)
+                except:
+                    # If it's a string, split by common delimiters
+                    paragraphs = [p.strip() for p in paragraphs.split('\n') if p.strip()]
+    
+            for i, para in enumerate(paragraphs):
+                if isinstance(para, str) and para.strip():
+                    chunks.append({
+                        'content': para.strip(),
                         'type': 'text',
-                        'page': 0,
-                        'metadata': chunk_data.get('metadata', {})
-                    })
-                print(f"✅ Loaded {len(self.chunks)} pre-made chunks")
-                
-                # Create FAISS index
-                if self.chunks:
-                    self._create_faiss_index()
-                return
-            
-            # Fallback to old format processing
-            # Add PDF content pages
-            pdf_content = data.get('pdf_content', {})
-            content = data.get('content', {})
-            
-            # Try both old and new formats
-            pages = pdf_content.get('pages', []) or content.get('pages_data', [])
-            
-            print(f"🔍 Found {len(pages)} pages in PDF content")
-            
-            for page in pages:
-                page_num = page.get('sayfa', 0)
-                print(f"📄 Processing page {page_num}")
-                
-                # Add title as a chunk
-                title = page.get('başlık', '').strip()
-                if title:
-                    self.chunks.append({
-                        'content': title,
-                        'type': 'title',
                         'page': page_num,
-                        'metadata': {'type': 'title', 'page': page_num}
-                    })
-                    print(f"   ✅ Added title: {title[:50]}...")
-                
-                # Add paragraphs as chunks
-                paragraphs = page.get('paragraflar', [])
-                
-                # Handle both string and list formats
-                if isinstance(paragraphs, str):
-                    try:
-                        import ast
-                        paragraphs = ast.literal_eval(paragraphs)
-                    except:
-                        # If it's a string, split by common delimiters
-                        paragraphs = [p.strip() for p in paragraphs.split('\n') if p.strip()]
-                
-                print(f"   📝 Found {len(paragraphs)} paragraphs")
-                
-                for i, para in enumerate(paragraphs):
-                    if isinstance(para, str) and para.strip():
-                        self.chunks.append({
-                            'content': para.strip(),
-                            'type': 'text',
-                            'page': page_num,
-                            'metadata': {'type': 'text', 'page': page_num, 'paragraph_index': i}
-                        })
-                        print(f"     ✅ Added paragraph {i+1}: {para[:30]}...")
-            
-            # Add chart data from charts key
-            charts = data.get('charts', [])
-            print(f"🔍 Found {len(charts)} charts")
-            
-            for chart in charts:
-                if chart.get('ocr_text', '').strip():
-                    self.chunks.append({
-                        'content': chart['ocr_text'],
-                        'type': 'chart',
-                        'page': chart.get('page', 0),
-                        'metadata': chart
-                    })
-                    print(f"   ✅ Added chart OCR: {chart['ocr_text'][:50]}...")
-                    
-                # Also add chart analysis if available
-                if chart.get('analysis', '').strip():
-                    self.chunks.append({
-                        'content': chart['analysis'],
-                        'type': 'chart_analysis',
-                        'page': chart.get('page', 0),
-                        'metadata': chart
+                        'metadata': {'type': 'text', 'page': page_num, 'paragraph_index': i}
                     })
-                    print(f"   ✅ Added chart analysis: {chart['analysis'][:50]}...")
-            
-            # Add chart analysis from main chart_analysis key
-            chart_analysis = data.get('chart_analysis', {})
-            if chart_analysis:
-                print(f"🔍 Found chart_analysis section")
-                for key, value in chart_analysis.items():
-                    if isinstance(value, str) and value.strip():
-                        self.chunks.append({
-                            'content': value,
-                            'type': 'chart_analysis',
-                            'page': 0,
-                            'metadata': {'type': 'chart_analysis', 'section': key}
-                        })
-                        print(f"   ✅ Added chart analysis section {key}: {value[:50]}...")
-            
-            print(f"✅ Loaded {len(self.chunks)} chunks")
-            
-            # Create FAISS index
-            if self.chunks:
-                self._create_faiss_index()
-            
+    
+        # Add chart data from charts key
+        for chart in data.get('charts', []):
+            if chart.get('ocr_text', '').strip():
+                chunks.append({
+                    'content': chart['ocr_text'],
+                    'type': 'chart',
+                    'page': chart.get('page', 0),
+                    'metadata': chart
+                })
+    
+            # Also add chart analysis if available
+            if chart.get('analysis', '').strip():
+                chunks.append({
+                    'content': chart['analysis'],
+                    'type': 'chart_analysis',
+                    'page': chart.get('page', 0),
+                    'metadata': chart
+                })
+    
+        # Add chart analysis from main chart_analysis key
+        for key, value in data.get('chart_analysis', {}).items():
+            if isinstance(value, str) and value.strip():
+                chunks.append({
+                    'content': value,
+                    'type': 'chart_analysis',
+                    'page': 0,
+                    'metadata': {'type': 'chart_analysis', 'section': key}
+                })
+    
+        return chunks
+    
+    def _index_cache_dir(self, analysis_path: str) -> str:
+        """Index cache directory next to an analysis file (<name>.rag_index/)"""
+        return os.path.splitext(analysis_path)[0] + INDEX_CACHE_SUFFIX
+    
+    def _index_cache_key(self, source_sha256: str) -> Dict:
+        """Identity of a cached index: source file content, embedding model and backend"""
+        return {
+            'source_sha256': source_sha256,
+            'model_name': EMBEDDING_MODEL_NAME,
+            'encoder_backend': self.encoder_backend,
+            'format': INDEX_CACHE_FORMAT
+        }
+    
+    def _load_index_cache(self, analysis_path: str, source_sha256: str) -> Optional[Tuple[List[Dict], np.ndarray]]:
+        """Persisted chunks and embeddings, if they were built from this file content and model"""
+        cache_dir = self._index_cache_dir(analysis_path)
+        try:
+            with open(os.path.join(cache_dir, "cache_key.json"), 'r', encoding='utf-8') as f:
+                cached_key = json.load(f)
+            if cached_key != self._index_cache_key(source_sha256):
+                print(f"🔄 {os.path.basename(analysis_path)} or model changed, rebuilding its index")
+                return None
+            with open(os.path.join(cache_dir, "chunks.pkl"), 'rb') as f:
+                chunks = pickle.load(f)
+            embeddings = np.load(os.path.join(cache_dir, "embeddings.npy"))
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            print(f"❌ Error loading data: {e}")
+            print(f"⚠️ Index cache unreadable, rebuilding: {e}")
+            return None
+        if len(embeddings) != len(chunks):
+            return None
+        return chunks, embeddings
     
-    def _create_faiss_index(self):
-        """Create FAISS index from chunks"""
+    def _save_index_cache(self, analysis_path: str, source_sha256: str, chunks: List[Dict], embeddings: np.ndarray):
+        """Persist a document's chunks and embeddings next to its analysis file (written atomically)"""
+        cache_dir = self._index_cache_dir(analysis_path)
+        staging = tempfile.mkdtemp(prefix=".rag_index-", dir=os.path.dirname(os.path.abspath(cache_dir)))
         try:
-            print("🔄 Creating FAISS index...")
-            
-            # Extract content for embedding
-            contents = [chunk['content'] for chunk in self.chunks]
-            
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(contents, show_progress_bar=True)
-            
-            # Create FAISS index
-            dimension = embeddings.shape[1]
-            self.faiss_index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-            
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
-            
-            # Add to index - convert to float32 numpy array for FAISS
-            embeddings_f32 = embeddings.astype(np.float32)
-            self.faiss_index.add(embeddings_f32)  # type: ignore
-            
-            print(f"✅ FAISS index created with {len(self.chunks)} chunks")
-            
+            np.save(os.path.join(staging, "embeddings.npy"), embeddings)
+            with open(os.path.join(staging, "chunks.pkl"), 'wb') as f:
+                pickle.dump(chunks, f)
+            # Written last: a cache without a key is never trusted
+            with open(os.path.join(staging, "cache_key.json"), 'w', encoding='utf-8') as f:
+                json.dump(self._index_cache_key(source_sha256), f, indent=2)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.rename(staging, cache_dir)
         except Exception as e:
-            print(f"❌ Error creating FAISS index: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            print(f"⚠️ Could not persist index cache: {e}")
     
-    def _search_similar_chunks(self, query: str, k: int = 5) -> List[Dict]:
+    def _embed_chunks(self, chunks: List[Dict]) -> np.ndarray:
+        """Normalized float32 embeddings of chunk contents, reusing cached vectors for seen content"""
+        def encode(texts: List[str]) -> np.ndarray:
+            return np.vstack([
+                self.embedding_model.encode(texts[start:start + INGEST_ENCODE_BATCH],
+                                            show_progress_bar=False, normalize_embeddings=True)
+                for start in range(0, len(texts), INGEST_ENCODE_BATCH)
+            ])
+    
+        embeddings = self.embedding_cache.encode([chunk['content'] for chunk in chunks], encode)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _search_similar_chunks(self, query: str, k: int = 5,
+                               document_ids: Optional[Iterable[str]] = None) -> List[Dict]:
         """Search for similar chunks using FAISS"""
-        if self.faiss_index is None or not self.chunks:
-            return []
-        
+        return self._search_similar_chunks_many([query], k, document_ids)[0]
+    
+    def _search_similar_chunks_many(self, queries: List[str], k: int = 5,
+                                    document_ids: Optional[Iterable[str]] = None) -> List[List[Dict]]:
+        """Search for several queries with one batched encode and one FAISS search"""
+        # Pinned for the whole search; a concurrent ingestion publishes a new generation instead
+        with self.corpus.snapshot() as generation:
+            return self._search_generation(generation, queries, k, document_ids)
+    
+    def _search_generation(self, generation: CorpusGeneration, queries: List[str], k: int,
+                           document_ids: Optional[Iterable[str]]) -> List[List[Dict]]:
+        if not generation.segments or not queries:
+            return [[] for _ in queries]
+    
         try:
-            # Create query embedding
-            query_embedding = self.embedding_model.encode([query])
-            
+            # Create query embeddings in one forward pass
+            query_embeddings = self.embedding_model.encode(queries)
+    
             # Normalize for cosine similarity
-            faiss.normalize_L2(query_embedding)
-            
+            faiss.normalize_L2(query_embeddings)
+    
             # Search in FAISS index - convert to float32 numpy array
-            query_f32 = query_embedding.astype(np.float32)
-            similarities, indices = self.faiss_index.search(query_f32, k)  # type: ignore
-            
-            # Prepare results
-            results = []
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-                if 0 <= idx < len(self.chunks):
+            query_f32 = query_embeddings.astype(np.float32)
+    
+            # Prepare results per query
+            all_results = []
+            for query_matches in generation.search(query_f32, k, document_ids):
+                results = []
+                for i, (similarity, chunk) in enumerate(query_matches):
                     results.append({
-                        'content': self.chunks[idx]['content'],
-                        'metadata': self.chunks[idx]['metadata'],
-                        'type': self.chunks[idx]['type'],
-                        'page': self.chunks[idx]['page'],
-                        'similarity': float(similarity),
+                        'content': chunk['content'],
+                        'metadata': chunk['metadata'],
+                        'type': chunk['type'],
+                        'page': chunk['page'],
+                        'document_id': chunk.get('document_id'),
+                        'similarity': similarity,
                         'rank': i + 1
                     })
+                all_results.append(results)
             
-            return results
+            return all_results
             
         except Exception as e:
             print(f"❌ Search error: {e}")
-            return []
+            return [[] for _ in queries]
+    
+    def search_many(self, questions: List[str], k: int = 5,
+                    document_ids: Optional[Iterable[str]] = None) -> List[List[Dict]]:
+        """Retrieve context chunks for several questions at once (evaluation, multi-question requests)"""
+        return self._search_similar_chunks_many(questions, k, document_ids)
+    
+    def get_corpus_stats(self) -> Dict:
+        """Documents, chunks, segments, generation and reader counts of the served corpus"""
+        return self.corpus.get_stats()
     
     def _create_context_from_results(self, results: List[Dict]) -> str:
         """Create context string from search results"""
@@ -290,15 +441,20 @@ class GroqOptimizedSimpleRAG:
         
         return min(confidence, 1.0)
     
-    def query(self, question: str, max_context_length: int = 2000) -> Dict:
-        """Process query with optimized prompts"""
+    def query(self, question: str, max_context_length: int = 2000,
+              document_ids: Optional[Iterable[str]] = None) -> Dict:
+        """Process query with optimized prompts, optionally restricted to some documents"""
         start_time = time.time()
         
         try:
-            # 1. Search for relevant chunks
-            search_results = self._search_similar_chunks(question, k=5)
+            # 1. Search for relevant chunks, keeping the smallest sufficient set
+            search_results = self._search_similar_chunks(question, k=5, document_ids=document_ids)
+            if self.adaptive_config is not None:
+                keep = select_adaptive_k([r['similarity'] for r in search_results], self.adaptive_config)
+                search_results = search_results[:keep]
             
             if not search_results:
+                self.context_token_stats.record(self.prompt_optimizer.detect_query_type(question).value, 0, 0)
                 return {
                     'answer': 'Üzgünüm, sorunuzla ilgili bilgi bulunamadı.',
                     'confidence': 0.0,
@@ -312,13 +468,18 @@ class GroqOptimizedSimpleRAG:
             # 2. Create context
             context = self._create_context_from_results(search_results)
             
+            context_tokens = sum(r['metadata'].get('token_count') or estimate_tokens(r['content'])
+                                 for r in search_results)
+            
             # Limit context length
             if len(context) > max_context_length:
                 context = context[:max_context_length] + "..."
+                context_tokens = min(context_tokens, estimate_tokens(context))
             
             # 3. Detect query and document types
             query_type = self.prompt_optimizer.detect_query_type(question)
             doc_type = self.prompt_optimizer.detect_document_type(context)
+            self.context_token_stats.record(query_type.value, len(search_results), context_tokens)
             
             # 4. Create optimized prompt
             optimized_prompt = self.prompt_optimizer.create_optimized_prompt(
@@ -404,6 +565,7 @@ class GroqOptimizedSimpleRAG:
             'average_confidence': avg_confidence,
             'query_type_distribution': query_type_dist,
             'document_type_distribution': doc_type_dist,
+            'context_tokens': self.context_token_stats.report(),
             'confidence_distribution': {
                 'high (>0.8)': len([c for c in self.query_stats['confidence_scores'] if c > 0.8]),
                 'medium (0.6-0.8)': len([c for c in self.query_stats['confidence_scores'] if 0.6 <= c <= 0.8]),
@@ -435,6 +597,9 @@ class GroqOptimizedSimpleRAG:
                     print(f"   Ortalama güven: {stats.get('average_confidence', 0):.3f}")
                     if 'query_type_distribution' in stats:
                         print(f"   Sorgu türü dağılımı: {stats['query_type_distribution']}")
+                    for query_type, usage in stats.get('context_tokens', {}).items():
+                        print(f"   {query_type}: ort. {usage['avg_chunks']:.1f} kaynak, "
+                              f"{usage['avg_context_tokens']:.0f} bağlam token")
                     continue
                 
                 if not question:
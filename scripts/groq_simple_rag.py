@@ -10,10 +10,12 @@ import time
 import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from groq import Groq
 from faiss_vector_store import FAISSVectorStore
+from adaptive_retrieval import AdaptiveKConfig, ContextTokenStats, estimate_tokens
+from turkish_prompt_optimizer import TurkishPromptOptimizer
 import numpy as np
 
 # Configure logging
@@ -39,7 +41,9 @@ class SimpleGroqRAG:
     def __init__(self, 
                  groq_api_key: str,
                  vector_store_path: str = "vector_store",
-                 model_name: str = "llama-3.1-8b-instant"):
+                 model_name: str = "llama-3.1-8b-instant",
+                 encoder_backend: str = "torch",
+                 adaptive_k: bool = True):
         """
         Initialize Simple Groq RAG
         
@@ -47,13 +51,17 @@ class SimpleGroqRAG:
             groq_api_key: Groq API key
             vector_store_path: Path to FAISS vector store
             model_name: Groq model name
+            encoder_backend: Embedding backend ('torch', 'int8', 'onnx')
+            adaptive_k: Choose how many chunks to send from their scores (False = always k)
         """
         self.groq_client = Groq(api_key=groq_api_key)
         self.model_name = model_name
+        self.adaptive_config = AdaptiveKConfig() if adaptive_k else None
+        self.query_type_detector = TurkishPromptOptimizer()
         
         # Initialize FAISS vector store
         logger.info("🔄 Loading FAISS vector store...")
-        self.faiss_store = FAISSVectorStore(vector_store_path=vector_store_path)
+        self.faiss_store = FAISSVectorStore(vector_store_path=vector_store_path, encoder_backend=encoder_backend)
         
         # Try to load existing vector store
         if not self.faiss_store.load_vector_store():
@@ -68,6 +76,7 @@ class SimpleGroqRAG:
             'failed_responses': 0,
             'avg_confidence': 0.0
         }
+        self.context_token_stats = ContextTokenStats()
         
         logger.info("🚀 Simple Groq RAG initialized successfully")
     
@@ -138,7 +147,7 @@ YANIT:"""
         
         Args:
             question: User question
-            k: Number of chunks to retrieve
+            k: Number of chunks to retrieve (upper bound when adaptive_k is set)
             
         Returns:
             SimpleRAGResponse
@@ -147,8 +156,11 @@ YANIT:"""
         start_time = time.time()
         
         try:
-            # 1. Retrieve relevant chunks
-            search_results = self.faiss_store.search(question, k=k)
+            # 1. Retrieve relevant chunks (the smallest sufficient set when adaptive)
+            if self.adaptive_config is not None:
+                search_results = self.faiss_store.search_adaptive(question, replace(self.adaptive_config, max_k=k))
+            else:
+                search_results = self.faiss_store.search(question, k=k)
             
             if not search_results:
                 return SimpleRAGResponse(
@@ -162,6 +174,11 @@ YANIT:"""
             
             # 2. Create context
             context = self._create_context(search_results)
+            query_type = self.query_type_detector.detect_query_type(question)
+            self.context_token_stats.record(
+                query_type.value, len(search_results),
+                sum(r.chunk.metadata.get('token_count') or estimate_tokens(r.chunk.text) for r in search_results)
+            )
             
             # 3. Create prompt
             prompt = self._create_prompt(question, context)
@@ -241,6 +258,7 @@ YANIT:"""
         vector_stats = self.faiss_store.get_statistics()
         return {
             'pipeline_stats': self.stats,
+            'context_tokens': self.context_token_stats.report(),
             'vector_stats': vector_stats,
             'model': self.model_name
         }
@@ -271,6 +289,9 @@ YANIT:"""
                     print(f"   ❌ Başarısız: {stats['pipeline_stats']['failed_responses']}")
                     print(f"   🎯 Ortalama güven: {stats['pipeline_stats']['avg_confidence']:.3f}")
                     print(f"   📚 Toplam chunk: {stats['vector_stats']['total_chunks']}")
+                    for query_type, usage in stats['context_tokens'].items():
+                        print(f"   🧾 {query_type}: ort. {usage['avg_chunks']:.1f} chunk, "
+                              f"{usage['avg_context_tokens']:.0f} token")
                     print(f"   🤖 Model: {stats['model']}")
                     continue
                 
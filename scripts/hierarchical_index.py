@@ -0,0 +1,305 @@
+"""
+🌳 Hierarchical Index
+====================
+Document → section → chunk retrieval for large bulletin archives.
+
+Every document gets a summary vector at ingestion time: the mean of its chunk
+embeddings blended with the embedding of its title. Every section gets one the
+same way. A section is a run of chunks under one `başlık` page title or
+font-size heading (see HybridPDFExtractor). A query is answered in two stages:
+1. pick the best documents and sections by their summary vectors
+2. search chunks only inside them, using per-document exact sub-indexes
+Summary indexes switch from flat to HNSW pieces once they grow large, so the
+first stage grows with the log of the corpus. The second stage depends only on
+how many documents and sections are selected, not on the corpus size.
+
+Features:
+- Document and section summary vectors from chunk and heading embeddings
+- Per-document exact sub-indexes, restricted to selected sections by an ID selector
+- Immutable states published with the vector store state (lock-free reads)
+- A document ingested over several batches is merged into one entry
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+
+try:
+    from .vector_store_concurrency import DeltaPiece, append_delta, merge_top_k
+except ImportError:
+    from vector_store_concurrency import DeltaPiece, append_delta, merge_top_k
+
+logger = logging.getLogger(__name__)
+
+# Weight of the title embedding relative to the normalized mean of the chunk vectors
+TITLE_WEIGHT = 0.5
+
+# Summary pieces at least this large are HNSW graphs instead of exact flat indexes
+SUMMARY_HNSW_MIN = 2048
+SUMMARY_HNSW_M = 16
+SUMMARY_EF_SEARCH = 64
+
+# Summary rows fetched per wanted document/section; rows of merged documents go stale
+SUMMARY_OVERFETCH = 2
+
+def document_key(chunk: Any) -> str:
+    """Document a chunk belongs to"""
+    return chunk.source
+
+def document_title(chunk: Any) -> str:
+    """Title of a chunk's document (first page title, else the file name)"""
+    return chunk.metadata.get('document_title') or Path(chunk.source).stem
+
+def section_title(chunk: Any) -> str:
+    """Heading of a chunk's section (the document title before the first heading)"""
+    return chunk.metadata.get('section') or document_title(chunk)
+
+def hierarchy_titles(chunks: Sequence[Any]) -> List[str]:
+    """Distinct document and section titles of chunks, to be embedded before indexing"""
+    titles = {}
+    for chunk in chunks:
+        titles[document_title(chunk)] = None
+        titles[section_title(chunk)] = None
+    return list(titles)
+
+def summarize(vectors: np.ndarray, title_vector: np.ndarray, title_weight: float = TITLE_WEIGHT) -> np.ndarray:
+    """
+    Summary vector of a group of chunks
+
+    Args:
+        vectors: Normalized chunk vectors of the group
+        title_vector: Embedding of the group's title (zeros if unknown)
+        title_weight: Weight of the title relative to the chunk centroid
+
+    Returns:
+        Normalized float32 summary vector
+    """
+    centroid = vectors.mean(axis=0)
+    centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+    summary = centroid + title_weight * title_vector
+    return (summary / max(float(np.linalg.norm(summary)), 1e-12)).astype(np.float32)
+
+def _summary_piece(vectors: np.ndarray) -> Any:
+    """Exact flat piece for few summaries, HNSW graph for many"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if len(vectors) < SUMMARY_HNSW_MIN:
+        piece = faiss.IndexFlatIP(vectors.shape[1])
+    else:
+        piece = faiss.IndexHNSWFlat(vectors.shape[1], SUMMARY_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        piece.hnsw.efSearch = SUMMARY_EF_SEARCH
+    piece.add(vectors)  # type: ignore
+    return piece
+
+def _search_rows(pieces: Sequence[DeltaPiece], query_embedding: np.ndarray, k: int) -> List[int]:
+    """Best summary rows for one query, best first"""
+    parts = []
+    for offset, piece in pieces:
+        scores, ids = piece.search(query_embedding, min(k, piece.ntotal))
+        parts.append((scores, np.where(ids >= 0, ids + offset, -1)))
+    if not parts:
+        return []
+    _, rows = merge_top_k(parts, k)
+    return [int(row) for row in rows[0] if row >= 0]
+
+@dataclass(frozen=True)
+class DocumentIndex:
+    """Exact sub-index over one document's chunks"""
+    key: str
+    title: str
+    version: int
+    positions: np.ndarray  # store position of each local chunk
+    section_titles: Tuple[str, ...]
+    section_of: np.ndarray  # section number of each local chunk
+    title_vector: np.ndarray
+    heading_vectors: np.ndarray  # one title embedding per section
+    index: Any  # IndexFlatIP over the chunk vectors, in local order
+
+    def vectors(self) -> np.ndarray:
+        return self.index.reconstruct_n(0, self.index.ntotal)
+
+    def search(self, query_embedding: np.ndarray, k: int,
+               sections: Optional[Set[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best chunks of this document for one query
+
+        Args:
+            query_embedding: Query vector (1 x d)
+            k: Number of results
+            sections: Restrict to these section numbers (None = whole document)
+
+        Returns:
+            (scores, store positions), best first
+        """
+        if sections is None:
+            scores, ids = self.index.search(query_embedding, min(k, self.index.ntotal))
+        else:
+            local = np.flatnonzero(np.isin(self.section_of, list(sections))).astype(np.int64)
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(local))
+            scores, ids = self.index.search(query_embedding, min(k, len(local)), params=params)
+        valid = ids[0] >= 0
+        return scores[0][valid], self.positions[ids[0][valid]]
+
+@dataclass(frozen=True)
+class HierarchyState:
+    """
+    Immutable document/section summaries and per-document sub-indexes
+
+    Summary rows are append-only lists shared between states, like the store's
+    chunk list: each state reads only its first n rows. When a document gets
+    more chunks, its entry is rebuilt under a new version and new summary rows
+    are appended. Rows of older versions are skipped at query time.
+    """
+    documents: Dict[str, DocumentIndex] = field(default_factory=dict)
+    document_rows: List[Tuple[str, int]] = field(default_factory=list)  # (document, version)
+    section_rows: List[Tuple[str, int, int]] = field(default_factory=list)  # (document, version, section)
+    document_pieces: Tuple[DeltaPiece, ...] = ()
+    section_pieces: Tuple[DeltaPiece, ...] = ()
+    n_document_rows: int = 0
+    n_section_rows: int = 0
+
+    def add(self, chunks: Sequence[Any], start: int, embeddings: np.ndarray,
+            title_vectors: Dict[str, np.ndarray]) -> "HierarchyState":
+        """
+        State with a batch of chunks added (writer thread)
+
+        Args:
+            chunks: Chunks being appended to the store
+            start: Store position of the first chunk
+            embeddings: Normalized float32 chunk vectors
+            title_vectors: Embeddings of the batch's titles (see hierarchy_titles)
+
+        Returns:
+            New state; this one is unchanged for its readers
+        """
+        if not len(chunks):
+            return self
+        dim = embeddings.shape[1]
+        by_document: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(chunks):
+            by_document.setdefault(document_key(chunk), []).append(i)
+
+        documents = dict(self.documents)
+        document_rows, document_vectors = [], []
+        section_rows, section_vectors = [], []
+        for key, members in by_document.items():
+            local = np.asarray(members, dtype=np.int64)
+            vectors = embeddings[local]
+            positions = start + local
+            titles = [section_title(chunks[i]) for i in members]
+            heading_vectors = {title: title_vectors.get(title, np.zeros(dim, dtype=np.float32)) for title in titles}
+            previous = documents.get(key)
+            if previous is not None:
+                vectors = np.vstack([previous.vectors(), vectors])
+                positions = np.concatenate([previous.positions, positions])
+                titles = [previous.section_titles[s] for s in previous.section_of] + titles
+                heading_vectors.update(zip(previous.section_titles, previous.heading_vectors))
+                title, title_vector = previous.title, previous.title_vector
+            else:
+                title = document_title(chunks[members[0]])
+                title_vector = title_vectors.get(title, np.zeros(dim, dtype=np.float32))
+
+            section_titles = tuple(dict.fromkeys(titles))
+            number = {section: s for s, section in enumerate(section_titles)}
+            section_of = np.array([number[section] for section in titles], dtype=np.int64)
+            index = faiss.IndexFlatIP(dim)
+            index.add(np.ascontiguousarray(vectors, dtype=np.float32))  # type: ignore
+            document = DocumentIndex(key=key, title=title, version=previous.version + 1 if previous else 0,
+                                     positions=positions, section_titles=section_titles, section_of=section_of,
+                                     title_vector=title_vector,
+                                     heading_vectors=np.vstack([heading_vectors[s] for s in section_titles]),
+                                     index=index)
+            documents[key] = document
+
+            document_rows.append((key, document.version))
+            document_vectors.append(summarize(vectors, title_vector))
+            for s in range(len(section_titles)):
+                section_rows.append((key, document.version, s))
+                section_vectors.append(summarize(vectors[section_of == s], document.heading_vectors[s]))
+
+        # Rows past this state's counts belong to no published state (e.g. a failed batch)
+        del self.document_rows[self.n_document_rows:]
+        del self.section_rows[self.n_section_rows:]
+        self.document_rows.extend(document_rows)
+        self.section_rows.extend(section_rows)
+        return replace(
+            self,
+            documents=documents,
+            document_pieces=append_delta(self.document_pieces, self.n_document_rows,
+                                         np.vstack(document_vectors), build_piece=_summary_piece),
+            section_pieces=append_delta(self.section_pieces, self.n_section_rows,
+                                        np.vstack(section_vectors), build_piece=_summary_piece),
+            n_document_rows=self.n_document_rows + len(document_rows),
+            n_section_rows=self.n_section_rows + len(section_rows))
+
+    def select(self, query_embedding: np.ndarray, top_documents: int = 5,
+               top_sections: int = 10) -> Dict[str, Optional[Set[int]]]:
+        """
+        Documents and sections whose summaries best match one query
+
+        Args:
+            query_embedding: Query vector (1 x d)
+            top_documents: Documents searched entirely
+            top_sections: Sections searched (in any document)
+
+        Returns:
+            Document key -> selected section numbers (None = whole document)
+        """
+        selected: Dict[str, Optional[Set[int]]] = {}
+        if top_documents > 0:
+            for row in _search_rows(self.document_pieces, query_embedding, top_documents * SUMMARY_OVERFETCH):
+                key, version = self.document_rows[row]
+                if self.documents[key].version == version and key not in selected:
+                    selected[key] = None
+                    if len(selected) >= top_documents:
+                        break
+        if top_sections > 0:
+            found = 0
+            for row in _search_rows(self.section_pieces, query_embedding, top_sections * SUMMARY_OVERFETCH):
+                key, version, section = self.section_rows[row]
+                if self.documents[key].version != version:
+                    continue
+                if key not in selected:
+                    selected[key] = {section}
+                elif selected[key] is not None:
+                    selected[key].add(section)  # type: ignore
+                found += 1
+                if found >= top_sections:
+                    break
+        return selected
+
+    def search(self, query_embedding: np.ndarray, k: int, top_documents: int = 5,
+               top_sections: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Chunk search restricted to the selected documents and sections
+
+        Args:
+            query_embedding: Query vector (1 x d)
+            k: Number of results
+            top_documents: Documents searched entirely
+            top_sections: Sections searched (in any document)
+
+        Returns:
+            (scores, store positions), best first
+        """
+        parts = [self.documents[key].search(query_embedding, k, sections)
+                 for key, sections in self.select(query_embedding, top_documents, top_sections).items()]
+        if not parts:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        scores = np.concatenate([part[0] for part in parts])
+        positions = np.concatenate([part[1] for part in parts])
+        order = np.argsort(-scores, kind='stable')[:k]
+        return scores[order], positions[order]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry and summary-row counts"""
+        return {
+            'documents': len(self.documents),
+            'sections': sum(len(document.section_titles) for document in self.documents.values()),
+            'document_rows': self.n_document_rows,
+            'section_rows': self.n_section_rows,
+            'summary_pieces': len(self.document_pieces) + len(self.section_pieces)
+        }
@@ -14,6 +14,9 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bölüm başlığı sayılan satırın font boyutu / sayfa ortalaması oranı
+HEADING_FONT_RATIO = 1.2
+
 class HybridPDFExtractor:
     """
     Hybrid PDF Extraction System - Context7 Best Practice
@@ -77,11 +80,21 @@ class HybridPDFExtractor:
                     else:
                         avg_font_size = 12
                     
+                    # Font boyutu ortalamanın belirgin üstünde olan kısa satırlar bölüm başlığıdır
+                    headings = []
+                    for line in page.extract_text_lines():
+                        line_text = line.get('text', '').strip()
+                        sizes = [c.get('size', 0) for c in line.get('chars', []) if c.get('size')]
+                        if (sizes and 3 <= len(line_text) <= 100 and
+                                max(sizes) >= avg_font_size * HEADING_FONT_RATIO):
+                            headings.append(line_text)
+                    
                     text_data.append({
                         "sayfa": i + 1,
                         "metin": text,
                         "paragraflar": [p.strip() for p in text.split('\n') if p.strip()],
                         "ortalama_font_boyutu": avg_font_size,
+                        "başlıklar": headings,
                         "kaynak": "pdfplumber_alternative"
                     })
             
@@ -293,6 +306,10 @@ class HybridPDFExtractor:
         # Başlık çıkarımı
         titles = self.extract_titles_from_text(consensus_texts)
         
+        # Font boyutundan bulunan bölüm başlıkları (alternatif çıkarımdan, hangi metin seçilirse seçilsin)
+        headings = {page['sayfa']: page.get('başlıklar', [])
+                    for page in extraction_results.get('text_alternative', [])}
+        
         # Görseller (pdf2image öncelikli)
         images = extraction_results.get('images_pdf2image') or extraction_results.get('images_pdfplumber', [])
         
@@ -311,6 +328,7 @@ class HybridPDFExtractor:
             final_page = {
                 "sayfa": page_num,
                 "başlık": titles.get(page_num, f"Sayfa {page_num}"),
+                "bölüm_başlıkları": headings.get(page_num, []),
                 "paragraflar": page_data.get('paragraflar', []),
                 "tablolar": [t['data'] for t in page_tables],
                 "grafikler": [{
@@ -17,12 +17,32 @@ try:
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+try:
+    from model_registry import acquire_encoder
+    from bulk_embedder import plan_batches
+    from turkish_chunker import TokenAwareChunker
+except ImportError:
+    from .model_registry import acquire_encoder
+    from .bulk_embedder import plan_batches
+    from .turkish_chunker import TokenAwareChunker
+
 try:
     import faiss
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
 
+# Dense fallback when faiss wheels are unavailable (float16, pure NumPy)
+try:
+    from numpy_vector_index import NumpyFlatIndex
+except ImportError:
+    from .numpy_vector_index import NumpyFlatIndex
+
+try:
+    from lexical_index import BM25Index
+except ImportError:
+    from .lexical_index import BM25Index
+
 try:
     from turkish_prompt_optimizer import TurkishPromptOptimizer, PromptContext, DocumentType, QueryType
     PROMPT_OPTIMIZER_AVAILABLE = True
@@ -32,18 +52,20 @@ except ImportError:
 class MemoryOptimizedGroqRAG:
     """Memory optimized Groq RAG system"""
     
-    def __init__(self, groq_api_key: str, specific_analysis_file: Optional[str] = None, lite_mode: bool = True):
+    def __init__(self, groq_api_key: str, specific_analysis_file: Optional[str] = None, lite_mode: bool = True,
+                 encoder_backend: str = "torch"):
         self.groq_client = Groq(api_key=groq_api_key)
         self.lite_mode = lite_mode
         
         # Initialize components based on availability and lite mode
         self.embedding_model = None
         self.faiss_index = None
+        self.dense_backend = "faiss" if FAISS_AVAILABLE else "numpy"
         self.prompt_optimizer = None
         
         if not lite_mode and SENTENCE_TRANSFORMERS_AVAILABLE:
             print("🔄 Loading embedding model (may take time)...")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')  # Smaller model
+            self.embedding_model = acquire_encoder('all-MiniLM-L6-v2', encoder_backend)  # Smaller model
             print("✅ Embedding model loaded")
         
         if PROMPT_OPTIMIZER_AVAILABLE:
@@ -54,8 +76,12 @@ class MemoryOptimizedGroqRAG:
         self.specific_analysis_file = specific_analysis_file
         self._load_extracted_data_lightweight()
         
-        # Create index only if not in lite mode
-        if not lite_mode and self.chunks and FAISS_AVAILABLE and self.embedding_model:
+        # Keyword index (Turkish casefolding + stemming, BM25)
+        self.lexical_index = BM25Index()
+        self.lexical_index.add_documents(chunk['content'] for chunk in self.chunks)
+        
+        # Create index only if not in lite mode (FAISS, else the NumPy fallback)
+        if not lite_mode and self.chunks and self.embedding_model:
             self._create_lightweight_faiss_index()
         
         # Performance tracking
@@ -216,80 +242,61 @@ class MemoryOptimizedGroqRAG:
         return chunks
     
     def _create_lightweight_faiss_index(self):
-        """Create lightweight FAISS index"""
+        """Create lightweight dense index (FAISS, or NumPy float16 without faiss)"""
         try:
-            print("🔄 Creating lightweight FAISS index...")
+            print(f"🔄 Creating lightweight {self.dense_backend} index...")
             
-            # Use smaller batches to reduce memory usage
-            batch_size = 10
+            # Length-sorted batches under a small padded-token budget bound peak memory
+            # without padding short lines up to the longest table chunk
             contents = [chunk['content'] for chunk in self.chunks]
+            token_counts = TokenAwareChunker.from_model(self.embedding_model).count_tokens(contents)
+            batches = plan_batches(token_counts, max_batch_tokens=2048)
             
             embeddings = []
-            for i in range(0, len(contents), batch_size):
-                batch = contents[i:i+batch_size]
-                batch_embeddings = self.embedding_model.encode(batch, convert_to_numpy=True)
+            for i, batch in enumerate(batches):
+                batch_embeddings = self.embedding_model.encode([contents[j] for j in batch],
+                                                               batch_size=len(batch), convert_to_numpy=True,
+                                                               normalize_embeddings=True)
                 embeddings.append(batch_embeddings)
-                print(f"   Processed batch {i//batch_size + 1}/{(len(contents)-1)//batch_size + 1}")
+                print(f"   Processed batch {i + 1}/{len(batches)}")
             
-            # Combine embeddings
-            all_embeddings = np.vstack(embeddings)
+            # Combine embeddings back into chunk order
+            all_embeddings = np.empty((len(contents), embeddings[0].shape[1]), dtype=np.float32)
+            all_embeddings[np.concatenate(batches)] = np.vstack(embeddings)
             
-            # Create FAISS index
+            # Cosine similarity over normalized embeddings; both backends score the same way
             dimension = all_embeddings.shape[1]
-            self.faiss_index = faiss.IndexFlatL2(dimension)
+            self.faiss_index = faiss.IndexFlatIP(dimension) if FAISS_AVAILABLE else NumpyFlatIndex(dimension)
             self.faiss_index.add(all_embeddings.astype('float32'))
             
-            print(f"✅ FAISS index created with {len(self.chunks)} vectors")
+            print(f"✅ {self.dense_backend} index created with {len(self.chunks)} vectors")
             
         except Exception as e:
-            print(f"❌ Error creating FAISS index: {e}")
+            print(f"❌ Error creating {self.dense_backend} index: {e}")
             self.faiss_index = None
     
     def search_simple(self, query: str, k: int = 3) -> List[Dict]:
-        """Simple search without FAISS (keyword based)"""
-        query_lower = query.lower()
-        query_terms = query_lower.split()
-        
-        scored_chunks = []
-        for i, chunk in enumerate(self.chunks):
-            content_lower = chunk['content'].lower()
-            
-            # Simple scoring based on term frequency
-            score = 0
-            for term in query_terms:
-                score += content_lower.count(term)
-            
-            if score > 0:
-                scored_chunks.append({
-                    'chunk': chunk,
-                    'score': score,
-                    'rank': 0
-                })
-        
-        # Sort by score and return top k
-        scored_chunks.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Assign ranks
-        for i, item in enumerate(scored_chunks[:k]):
-            item['rank'] = i + 1
-        
-        return scored_chunks[:k]
+        """Simple search without FAISS (BM25 keyword based)"""
+        return [
+            {'chunk': self.chunks[idx], 'score': score, 'rank': rank}
+            for rank, (idx, score) in enumerate(self.lexical_index.search(query, k), 1)
+        ]
     
     def search_faiss(self, query: str, k: int = 3) -> List[Dict]:
-        """FAISS-based search"""
+        """Dense search (FAISS, or the NumPy fallback index)"""
         if not self.faiss_index or not self.embedding_model:
             return self.search_simple(query, k)
         
         try:
             # Encode query
-            query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
+            query_embedding = self.embedding_model.encode([query], convert_to_numpy=True, normalize_embeddings=True)
             
-            # Search FAISS index
+            # Search dense index
             scores, indices = self.faiss_index.search(query_embedding.astype('float32'), k)
             
             results = []
             for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.chunks):
+                if 0 <= idx < len(self.chunks):
                     results.append({
                         'chunk': self.chunks[idx],
                         'score': float(score),
@@ -299,7 +306,7 @@ class MemoryOptimizedGroqRAG:
             return results
             
         except Exception as e:
-            print(f"❌ FAISS search error: {e}")
+            print(f"❌ {self.dense_backend} search error: {e}")
             return self.search_simple(query, k)
     
     def retrieve_and_generate(self, query: str, k: int = 3) -> str:
@@ -313,7 +320,7 @@ class MemoryOptimizedGroqRAG:
                 search_method = "keyword"
             else:
                 search_results = self.search_faiss(query, k)
-                search_method = "faiss"
+                search_method = self.dense_backend
             
             search_time = time.time() - start_time
             
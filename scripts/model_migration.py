@@ -0,0 +1,456 @@
+"""
+🔀 Model Migration
+=================
+Online switch of a FAISSVectorStore to a new embedding model.
+
+The store keeps serving from its old-model index while a background thread
+re-embeds its chunks into a new-model store under <store>/migration/<model>.
+Documents added meanwhile are written to both stores. A sample of live queries
+is also run against the new index ("shadow reads"), and its top-k overlap with
+the served results is recorded. Once enough of the corpus is migrated and the
+shadow agreement is high enough, the new store is saved as the live snapshot
+of the store directory and takes over serving.
+
+The backfill is rate limited and resumable. The new store is snapshotted in
+the background as it grows, and a restarted migration skips every chunk whose
+id is already in the new store's snapshot. Chunks keep their existing
+boundaries; only their embeddings change.
+
+Features:
+- Zero-downtime model switch: the old index serves until cut-over
+- Rate-limited, resumable background re-embedding
+- Dual writes for documents added during the migration
+- Shadow top-k overlap on live queries, measured over migrated chunks only
+- Automatic cut-over at coverage and agreement thresholds (or forced)
+
+Usage:
+    python scripts/model_migration.py vector_store <new-model> --queries queries.txt [--rate 50]
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .faiss_vector_store import FAISSVectorStore, DocumentChunk, SearchResult
+    from .vector_store_snapshots import SnapshotManager
+    from .vector_store_concurrency import AtomicCounters
+except ImportError:
+    from faiss_vector_store import FAISSVectorStore, DocumentChunk, SearchResult
+    from vector_store_snapshots import SnapshotManager
+    from vector_store_concurrency import AtomicCounters
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_DIR = "migration"
+
+@dataclass
+class MigrationConfig:
+    """Backfill rate and cut-over thresholds"""
+    batch_size: int = 64
+    max_chunks_per_second: float = 50.0  # 0 = unlimited
+    min_coverage: float = 1.0  # fraction of the old corpus re-embedded
+    min_agreement: float = 0.6  # mean shadow top-k overlap
+    min_shadow_queries: int = 100
+    shadow_sample_rate: float = 0.25
+    shadow_window: int = 500  # agreement is averaged over the most recent shadow queries
+    max_pending_shadow: int = 4  # shadow batches queued beyond this are skipped
+
+def read_store_config(vector_store_path: str) -> Optional[Dict[str, Any]]:
+    """config.json of a store's live snapshot (or older flat layout); None if nothing was saved"""
+    path = Path(vector_store_path)
+    config_path = (SnapshotManager(path).current_dir() or path) / "config.json"
+    if not config_path.exists():
+        return None
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def migration_path(vector_store_path: str, model_name: str) -> Path:
+    """Directory where the new-model store is built"""
+    return Path(vector_store_path) / MIGRATION_DIR / re.sub(r'[^\w.-]', '_', model_name)
+
+def shadow_overlap(served_ids: Sequence[str], shadow_ids: Sequence[str], migrated: Any) -> Optional[float]:
+    """
+    Fraction of the served top-k that the shadow top-k also returned
+
+    Only served chunks that already exist in the new index are counted, so a
+    partially migrated index is not penalized for chunks it cannot return yet.
+
+    Returns:
+        Overlap in [0, 1], or None when no served chunk is migrated yet
+    """
+    expected = {chunk_id for chunk_id in served_ids if chunk_id in migrated}
+    if not expected:
+        return None
+    return len(expected & set(shadow_ids)) / len(expected)
+
+class MigratingVectorStore:
+    """Serves a vector store while migrating it to a new embedding model"""
+
+    def __init__(self, vector_store_path: str, new_model_name: str,
+                 config: Optional[MigrationConfig] = None, **store_kwargs):
+        """
+        Open the store with its saved model and resume or start the new-model store
+
+        Args:
+            vector_store_path: Directory of the store to migrate
+            new_model_name: Embedding model to migrate to
+            config: Backfill rate and cut-over thresholds
+            **store_kwargs: FAISSVectorStore options of the new store (index_type, rerank, ...);
+                the old store is loaded with its saved index settings
+        """
+        self.vector_store_path = Path(vector_store_path)
+        self.new_model_name = new_model_name
+        self.config = config or MigrationConfig()
+        saved = read_store_config(vector_store_path)
+        if saved is None:
+            raise ValueError(f"No saved vector store found at {vector_store_path}")
+        self.old_model_name = saved['model_name']
+        self.build_path = migration_path(vector_store_path, new_model_name)
+
+        self.old_store = FAISSVectorStore(model_name=self.old_model_name,
+                                          vector_store_path=vector_store_path, **store_kwargs)
+        if not self.old_store.load_vector_store():
+            raise ValueError(f"Failed to load the vector store at {vector_store_path}")
+
+        # Serialises dual writes, backfill batches and the cut-over
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._overlaps: deque = deque(maxlen=self.config.shadow_window)
+        self._shadow_pending = 0
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="migration-shadow")
+        self.stats = AtomicCounters({'backfilled_chunks': 0, 'dual_written_chunks': 0, 'shadow_queries': 0,
+                                     'shadow_skipped': 0, 'shadow_errors': 0, 'backfill_time': 0.0})
+        self.cutover_version: Optional[str] = None
+
+        if self.old_model_name == new_model_name:
+            # Already migrated (e.g. a restart after cut-over); drop any leftover build directory
+            logger.info(f"✅ Store already uses {new_model_name}, nothing to migrate")
+            self.new_store = self.active = self.old_store
+            self._migrated, self._pending, self._total = set(), set(), 0
+            self._remove_build_dir()
+            return
+
+        self.build_path.mkdir(parents=True, exist_ok=True)
+        self.new_store = FAISSVectorStore(model_name=new_model_name, vector_store_path=str(self.build_path),
+                                          **store_kwargs)
+        resumed = self.new_store.load_vector_store()
+        self.active = self.old_store
+
+        old_ids = {chunk.id for chunk in self.old_store.chunks}
+        self._migrated = {chunk.id for chunk in self.new_store.chunks}
+        self._pending = old_ids - self._migrated
+        self._total = len(old_ids)
+        logger.info(f"🔀 Migration {self.old_model_name} → {new_model_name}: "
+                    f"{self._total - len(self._pending)}/{self._total} chunks "
+                    f"{'already migrated (resumed)' if resumed else 'to migrate'}")
+
+    def _remove_build_dir(self):
+        shutil.rmtree(self.build_path, ignore_errors=True)
+        try:
+            self.build_path.parent.rmdir()  # only if no other migration is in progress
+        except OSError:
+            pass
+
+    @property
+    def cut_over_done(self) -> bool:
+        return self.active is self.new_store
+
+    def coverage(self) -> float:
+        """Fraction of the old corpus present in the new index"""
+        return 1.0 - len(self._pending) / self._total if self._total else 1.0
+
+    def agreement(self) -> Optional[float]:
+        """Mean shadow top-k overlap over the recent window (None before any shadow query)"""
+        with self._lock:
+            return float(np.mean(self._overlaps)) if self._overlaps else None
+
+    def start(self) -> "MigratingVectorStore":
+        """Start the background backfill"""
+        if self._thread is None and self._pending:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run_backfill, name="migration-backfill", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the backfill to finish; returns whether it has"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def _add_to_new_store(self, chunks: List[DocumentChunk]):
+        """Embed chunks with the new model (write lock held)"""
+        # Copies: the new store attaches its own embeddings to the chunk objects
+        copies = [replace(chunk, embedding=None, metadata=dict(chunk.metadata)) for chunk in chunks]
+        self.new_store._add_chunks(copies)
+        for chunk in chunks:
+            self._migrated.add(chunk.id)
+            self._pending.discard(chunk.id)
+        # Checkpoint: a restarted migration resumes from the last background snapshot
+        self.new_store.schedule_save()
+
+    def _run_backfill(self):
+        """Re-embed the old corpus into the new store at a bounded rate"""
+        source = self.old_store.chunks
+        position = 0
+        rate = self.config.max_chunks_per_second
+        while position < len(source) and self._pending and not self._stop.is_set():
+            started = time.time()
+            batch: List[DocumentChunk] = []
+            seen = set()
+            while position < len(source) and len(batch) < self.config.batch_size:
+                chunk = source[position]
+                position += 1
+                if chunk.id in self._pending and chunk.id not in seen:
+                    seen.add(chunk.id)
+                    batch.append(chunk)
+            if batch:
+                with self._write_lock:
+                    # Dual writes may have migrated some of them meanwhile
+                    batch = [chunk for chunk in batch if chunk.id in self._pending]
+                    if batch:
+                        self._add_to_new_store(batch)
+                self.stats.add('backfilled_chunks', len(batch))
+                self.stats.add('backfill_time', time.time() - started)
+            self._check_cutover()
+            if rate > 0 and batch:
+                self._stop.wait(max(0.0, len(batch) / rate - (time.time() - started)))
+        if not self._pending:
+            logger.info(f"✅ Backfill complete: {self._total} chunks embedded with {self.new_model_name}")
+            self._check_cutover()
+
+    def add_pdf_content(self, pdf_analysis: Dict[str, Any]):
+        """
+        Add a document to the served store and, during the migration, to the new store
+
+        Args:
+            pdf_analysis: PDF analysis results from hybrid extractor
+        """
+        with self._write_lock:
+            if self.cut_over_done:
+                self.active.add_pdf_content(pdf_analysis)
+                return
+            # One chunking for both stores, so chunk ids match across them
+            chunks = self.old_store.build_chunks(pdf_analysis)
+            self.old_store._add_chunks(chunks)
+            self.old_store.performance_stats.add('chunks_processed', len(chunks))
+            self._total += len({chunk.id for chunk in chunks} - self._migrated - self._pending)
+            self._add_to_new_store(chunks)
+            self.stats.add('dual_written_chunks', len(chunks))
+
+    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None,
+               mmr_lambda: Optional[float] = None, fetch_k: int = 100) -> List[SearchResult]:
+        """Search the served store (same signature as FAISSVectorStore.search)"""
+        if filter_type:
+            filters = {**(filters or {}), 'chunk_type': filter_type}
+        return self.search_many([query], k=k, filters=filters, mmr_lambda=mmr_lambda, fetch_k=fetch_k)[0]
+
+    def search_many(self, queries: List[str], k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None,
+                    mmr_lambda: Optional[float] = None, fetch_k: int = 100) -> List[List[SearchResult]]:
+        """
+        Search the served store; a sample of queries is also shadow-searched in the new index
+
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filters: Attribute/metadata filters
+            mmr_lambda: Enable MMR diversification
+            fetch_k: MMR candidate pool size
+
+        Returns:
+            One list of search results per query, from the served store
+        """
+        store = self.active
+        results = store.search_many(queries, k=k, filters=filters, mmr_lambda=mmr_lambda, fetch_k=fetch_k)
+        if store is self.old_store and random.random() < self.config.shadow_sample_rate:
+            self._submit_shadow(queries, results, k, filters, mmr_lambda, fetch_k)
+        return results
+
+    def search_hybrid(self, query: str, k: int = 10, **kwargs) -> List[SearchResult]:
+        """Hybrid search on the served store"""
+        return self.active.search_hybrid(query, k=k, **kwargs)
+
+    def search_lexical(self, query: str, k: int = 10, **kwargs) -> List[SearchResult]:
+        """BM25 search on the served store"""
+        return self.active.search_lexical(query, k=k, **kwargs)
+
+    def _submit_shadow(self, queries: List[str], served: List[List[SearchResult]], *search_args):
+        """Queue a shadow comparison without delaying the served response"""
+        with self._lock:
+            if self._shadow_pending >= self.config.max_pending_shadow:
+                self.stats.add('shadow_skipped', len(queries))
+                return
+            self._shadow_pending += 1
+        self._shadow_executor.submit(self._shadow_compare, queries, served, *search_args)
+
+    def _shadow_compare(self, queries: List[str], served: List[List[SearchResult]], k: int,
+                        filters: Optional[Dict[str, Any]], mmr_lambda: Optional[float], fetch_k: int):
+        """Search the new index with the same parameters and record the top-k overlap"""
+        try:
+            shadow = self.new_store.search_many(queries, k=k, filters=filters,
+                                                mmr_lambda=mmr_lambda, fetch_k=fetch_k)
+            for served_results, shadow_results in zip(served, shadow):
+                overlap = shadow_overlap([r.chunk.id for r in served_results],
+                                         [r.chunk.id for r in shadow_results], self._migrated)
+                if overlap is None:
+                    continue
+                with self._lock:
+                    self._overlaps.append(overlap)
+                self.stats.add('shadow_queries')
+            self._check_cutover()
+        except Exception as e:
+            self.stats.add('shadow_errors')
+            logger.warning(f"⚠️ Shadow search failed: {e}")
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+
+    def _check_cutover(self):
+        """Cut over once coverage and shadow agreement pass their thresholds"""
+        if self.cut_over_done:
+            return
+        config = self.config
+        agreement = self.agreement()
+        with self._lock:
+            samples = len(self._overlaps)
+        if (self.coverage() >= config.min_coverage and samples >= config.min_shadow_queries and
+                agreement is not None and agreement >= config.min_agreement):
+            logger.info(f"🎯 Cut-over thresholds met: coverage {self.coverage():.1%}, "
+                        f"agreement {agreement:.3f} over {samples} queries")
+            self.cut_over()
+
+    def cut_over(self) -> bool:
+        """
+        Make the new store the live store, regardless of thresholds
+
+        The new index is saved as the newest snapshot of the store directory (older
+        snapshots of the old model stay available for rollback until pruned), and
+        searches switch to it. Chunks not yet backfilled keep being added.
+
+        Returns:
+            False if the store was already cut over
+        """
+        with self._write_lock:
+            if self.cut_over_done:
+                return False
+            self.cutover_version = self.new_store.relocate(str(self.vector_store_path))
+            self.active = self.new_store
+        self._remove_build_dir()
+        logger.info(f"🔀 Cut over to {self.new_model_name} ({self.cutover_version}), "
+                    f"coverage {self.coverage():.1%}")
+        return True
+
+    def get_migration_status(self) -> Dict[str, Any]:
+        """Progress, agreement and cut-over state"""
+        stats = self.stats.snapshot()
+        with self._lock:
+            samples = len(self._overlaps)
+        rate = stats['backfilled_chunks'] / stats['backfill_time'] if stats['backfill_time'] else None
+        if self.cut_over_done:
+            phase = 'cut_over'
+        elif self._pending:
+            phase = 'backfilling' if self._thread is not None and self._thread.is_alive() else 'paused'
+        else:
+            phase = 'shadowing'
+        return {
+            'phase': phase,
+            'old_model': self.old_model_name,
+            'new_model': self.new_model_name,
+            'coverage': self.coverage(),
+            'migrated_chunks': self._total - len(self._pending),
+            'total_chunks': self._total,
+            'agreement': self.agreement(),
+            'shadow_window': samples,
+            'embed_chunks_per_s': rate,
+            'eta_s': len(self._pending) / min(rate, self.config.max_chunks_per_second or rate) if rate else None,
+            'cutover_version': self.cutover_version,
+            **stats
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistics of the served store plus migration status"""
+        return {**self.active.get_statistics(), 'migration': self.get_migration_status()}
+
+    def save_vector_store(self) -> str:
+        """Save the served store (the new store checkpoints itself in the background)"""
+        return self.active.save_vector_store()
+
+    def stop(self):
+        """Pause the backfill; a later start() or a new MigratingVectorStore resumes it"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop the backfill, checkpoint the new store and release both stores"""
+        self.stop()
+        self._shadow_executor.shutdown(wait=True)
+        self.new_store.close()
+        if self.old_store is not self.new_store:
+            self.old_store.close()
+
+def main():
+    """Run a migration offline, replaying sample queries as shadow traffic"""
+    parser = argparse.ArgumentParser(description="Online embedding-model migration of a vector store")
+    parser.add_argument('vector_store_path', help="Store directory saved with the old model")
+    parser.add_argument('new_model', help="Embedding model to migrate to")
+    parser.add_argument('--queries', help="Text file with one sample query per line (shadow traffic)")
+    parser.add_argument('--rate', type=float, default=50.0, help="Max chunks re-embedded per second (0 = unlimited)")
+    parser.add_argument('--min-agreement', type=float, default=0.6, help="Mean shadow top-k overlap to cut over")
+    parser.add_argument('--min-coverage', type=float, default=1.0, help="Migrated fraction to cut over")
+    parser.add_argument('--index-type', default="flat", help="Index type of the new store")
+    args = parser.parse_args()
+
+    queries = []
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    config = MigrationConfig(max_chunks_per_second=args.rate, min_agreement=args.min_agreement,
+                             min_coverage=args.min_coverage, shadow_sample_rate=1.0,
+                             min_shadow_queries=min(MigrationConfig.min_shadow_queries, len(queries)))
+
+    print("🔀 Model Migration")
+    print("=" * 40)
+    migration = MigratingVectorStore(args.vector_store_path, args.new_model, config,
+                                     index_type=args.index_type).start()
+    try:
+        while not migration.cut_over_done:
+            for query in queries:
+                migration.search(query, k=10)
+            status = migration.get_migration_status()
+            print(f"  {status['phase']}: {status['coverage']:.1%} migrated, agreement "
+                  f"{status['agreement'] if status['agreement'] is not None else float('nan'):.3f} "
+                  f"({status['shadow_window']} queries)")
+            if status['phase'] == 'shadowing' and not queries:
+                print("⚠️ Backfill complete but no shadow queries given; use --queries or cut over manually")
+                break
+            if status['phase'] == 'shadowing' and status['agreement'] is not None and \
+                    status['agreement'] < config.min_agreement and status['shadow_window'] >= len(queries):
+                print(f"⚠️ Agreement {status['agreement']:.3f} is below {config.min_agreement}; not cutting over")
+                break
+            time.sleep(5)
+    finally:
+        migration.close()
+    print(f"📊 {json.dumps(migration.get_migration_status(), ensure_ascii=False, indent=2)}")
+
+if __name__ == "__main__":
+    main()
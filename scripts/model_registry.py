@@ -0,0 +1,218 @@
+"""
+📚 Model Registry
+================
+Process-wide registry of embedding models, shared by every vector store and
+RAG pipeline in the process.
+
+Each (model, backend) pair is loaded once, on first use, no matter how many
+pipelines ask for it; rebuilding a RAG pipeline after an upload reuses the
+resident weights instead of loading them again.
+
+Features:
+- Lazy, load-once model initialization (concurrent first requests wait for one load)
+- Thread-safe shared encoders (encode calls on one model are serialized)
+- Reference counting through handles; models nobody holds are evicted LRU-first
+- Load count, hit count and resident model memory metrics
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .embedding_backends import load_encoder
+except ImportError:
+    from embedding_backends import load_encoder
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, Optional[str]]
+
+def model_memory_bytes(model: Any) -> int:
+    """Resident size of a model's weights (PyTorch parameters/buffers, or the ONNX graph file)"""
+    parameters = getattr(model, 'parameters', None)
+    if callable(parameters):
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        total += sum(b.numel() * b.element_size() for b in model.buffers())
+        # Dynamically quantized linear layers keep packed int8 weights outside parameters()
+        for module in model.modules():
+            packed = getattr(module, '_packed_params', None)
+            if packed is not None:
+                try:
+                    weight, _ = packed._weight_bias()
+                    total += weight.numel() * weight.element_size()
+                except Exception:
+                    pass
+        return int(total)
+    model_file = getattr(model, 'model_file', None)
+    if model_file and os.path.exists(model_file):
+        return os.path.getsize(model_file)
+    return 0
+
+@dataclass
+class _Entry:
+    """One resident model with its reference count"""
+    model: Any
+    memory_bytes: int
+    load_seconds: float
+    refs: int = 0
+    last_used: float = field(default_factory=time.time)
+    encode_lock: threading.Lock = field(default_factory=threading.Lock)
+
+class SharedEncoder:
+    """Handle to a registry model; behaves like the encoder and releases its reference when collected"""
+
+    def __init__(self, registry: "ModelRegistry", key: ModelKey, entry: _Entry):
+        self._registry = registry
+        self._key = key
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, registry._release, key, entry)
+
+    @property
+    def model_name(self) -> str:
+        return self._key[0]
+
+    @property
+    def backend(self) -> str:
+        return self._key[1]
+
+    def encode(self, *args, **kwargs):
+        """Thread-safe encode on the shared model"""
+        entry = self._entry
+        with entry.encode_lock:
+            entry.last_used = time.time()
+            return entry.model.encode(*args, **kwargs)
+
+    def release(self):
+        """Drop this handle's reference now instead of at garbage collection"""
+        self._finalizer()
+
+    def __getattr__(self, name: str) -> Any:
+        # tokenizer, max_seq_length, get_sentence_embedding_dimension, ...
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._entry.model, name)
+
+class ModelRegistry:
+    """Loads each embedding model once per process and shares it between consumers"""
+
+    def __init__(self, max_models: int = 2):
+        """
+        Initialize registry
+
+        Args:
+            max_models: Models kept resident; beyond this, unreferenced models are evicted
+                least recently used first (referenced models are never evicted)
+        """
+        self.max_models = max_models
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[ModelKey, threading.Event] = {}
+        self.stats = {'loads': 0, 'hits': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    def acquire(self, model_name: str, backend: str = "torch", onnx_path: Optional[str] = None,
+                num_threads: Optional[int] = None) -> SharedEncoder:
+        """
+        Get a handle to a model, loading it on first use
+
+        Args:
+            model_name: Sentence transformer model name
+            backend: Encoder backend ('torch', 'int8', 'onnx')
+            onnx_path: Export directory for the onnx backend
+            num_threads: CPU threads for inference, applied when the model is loaded
+
+        Returns:
+            Shared encoder handle (keep it for as long as the model is needed)
+        """
+        key: ModelKey = (model_name, backend, onnx_path if backend == "onnx" else None)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    entry.last_used = time.time()
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return SharedEncoder(self, key, entry)
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another thread is loading this model; wait and look again
+            loading.wait()
+
+        try:
+            logger.info(f"🤖 Loading embedding model: {model_name} ({backend})")
+            start_time = time.time()
+            model = load_encoder(model_name, backend, onnx_path, num_threads=num_threads)
+            entry = _Entry(model=model, memory_bytes=model_memory_bytes(model),
+                           load_seconds=time.time() - start_time, refs=1)
+            with self._lock:
+                self._entries[key] = entry
+                self.stats['loads'] += 1
+                self.stats['load_seconds'] += entry.load_seconds
+                self._evict()
+            logger.info(f"✅ Model loaded in {entry.load_seconds:.1f}s "
+                        f"({entry.memory_bytes / 2**20:.0f} MB resident)")
+            return SharedEncoder(self, key, entry)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+    def _release(self, key: ModelKey, entry: _Entry):
+        with self._lock:
+            # A handle to an already evicted (and maybe reloaded) model releases nothing
+            if self._entries.get(key) is entry:
+                entry.refs = max(0, entry.refs - 1)
+                self._evict()
+
+    def _evict(self):
+        """Drop unreferenced models, least recently used first, while over max_models (lock held)"""
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_models:
+                break
+            if self._entries[key].refs == 0:
+                del self._entries[key]
+                self.stats['evictions'] += 1
+                logger.info(f"🧹 Evicted embedding model: {key[0]} ({key[1]})")
+
+    def clear(self):
+        """Drop every unreferenced model"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+                del self._entries[key]
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Load/hit counts and resident model memory"""
+        with self._lock:
+            models: List[Dict[str, Any]] = [{
+                'model_name': key[0],
+                'backend': key[1],
+                'refs': entry.refs,
+                'memory_mb': entry.memory_bytes / 2**20,
+                'load_seconds': entry.load_seconds,
+                'idle_seconds': time.time() - entry.last_used
+            } for key, entry in self._entries.items()]
+            return {
+                **self.stats,
+                'resident_models': len(models),
+                'resident_memory_mb': sum(model['memory_mb'] for model in models),
+                'models': models
+            }
+
+_registry = ModelRegistry()
+
+def get_registry() -> ModelRegistry:
+    """The process-wide model registry"""
+    return _registry
+
+def acquire_encoder(model_name: str, backend: str = "torch", onnx_path: Optional[str] = None,
+                    num_threads: Optional[int] = None) -> SharedEncoder:
+    """Shared encoder from the process-wide registry (see ModelRegistry.acquire)"""
+    return _registry.acquire(model_name, backend, onnx_path, num_threads)
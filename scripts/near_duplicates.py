@@ -0,0 +1,236 @@
+"""
+🧬 Near-Duplicate Detection
+==========================
+Streaming MinHash LSH detector for chunks repeated across bulletins.
+
+Consecutive daily bulletins repeat disclaimers, headers and unchanged
+commentary almost word for word. Each chunk gets a MinHash signature over its
+word shingles. Its LSH bands are looked up among the indexed chunks, and a
+candidate whose estimated Jaccard similarity passes the threshold becomes the
+chunk's canonical copy. The duplicate is then linked to it instead of being
+embedded and indexed again.
+
+Figures matter more than wording in financial text. Two chunks are therefore
+never merged unless their numbers are identical, so "BIST-100 yüzde 1,2 arttı"
+never swallows the next day's "BIST-100 yüzde 0,8 arttı".
+
+Features:
+- Word 3-gram shingles over the Turkish lexical tokenizer (casefolded, stemmed)
+- 128-permutation MinHash in NumPy, 16 bands x 8 rows (no extra dependency)
+- Exact duplicates recognized by content hash, independent of banding
+- Numeric-token guard against merging chunks with different figures
+- Thread-safe streaming updates and savings counters
+"""
+
+import logging
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .lexical_index import tokenize
+    from .embedding_cache import content_hash
+    from .vector_store_concurrency import AtomicCounters
+except ImportError:
+    from lexical_index import tokenize
+    from embedding_cache import content_hash
+    from vector_store_concurrency import AtomicCounters
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: a pair at 0.8 Jaccard shares a band with ~95% probability
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NUMBER_PATTERN = re.compile(r"\d")
+
+def shingles(tokens: Sequence[str], size: int = SHINGLE_SIZE) -> List[str]:
+    """Overlapping word n-grams (the whole text if it is shorter than one n-gram)"""
+    if len(tokens) <= size:
+        return [' '.join(tokens)]
+    return [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+class MinHasher:
+    """MinHash signatures from universal hashing of 32-bit shingle hashes"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Sequence[str]) -> np.ndarray:
+        """Signature (num_perm uint32 values) of a token sequence"""
+        hashes = np.array([zlib.crc32(s.encode('utf-8')) for s in shingles(tokens)], dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+@dataclass
+class DuplicateMatch:
+    """A chunk's canonical copy"""
+    canonical: Any
+    similarity: float
+    exact: bool
+
+class _Canonicals:
+    """Canonical chunks with exact-hash and LSH band lookups"""
+
+    def __init__(self, bands: int):
+        self.chunks: List[Any] = []
+        self._signatures: List[np.ndarray] = []
+        self._numbers: List[Tuple[str, ...]] = []
+        self._exact: Dict[str, int] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+
+    def __contains__(self, text_hash: str) -> bool:
+        return text_hash in self._exact
+
+    def find(self, fingerprint: Tuple, threshold: float) -> Optional[DuplicateMatch]:
+        """Exact match, else the most similar candidate at or above the threshold with the same numbers"""
+        text_hash, _, numbers, signature, band_keys = fingerprint
+        if text_hash in self._exact:
+            return DuplicateMatch(self.chunks[self._exact[text_hash]], 1.0, exact=True)
+        candidates = {i for band, key in enumerate(band_keys) for i in self._buckets[band].get(key, ())}
+        best, best_similarity = None, threshold
+        for i in candidates:
+            if self._numbers[i] != numbers:
+                continue
+            similarity = float(np.mean(self._signatures[i] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = i, similarity
+        return DuplicateMatch(self.chunks[best], best_similarity, exact=False) if best is not None else None
+
+    def add(self, chunk: Any, fingerprint: Tuple):
+        text_hash, _, numbers, signature, band_keys = fingerprint
+        position = len(self.chunks)
+        self.chunks.append(chunk)
+        self._signatures.append(signature)
+        self._numbers.append(numbers)
+        self._exact[text_hash] = position
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(position)
+
+class NearDuplicateIndex:
+    """
+    Streaming near-duplicate detector over chunks
+
+    `split(chunks)` finds each chunk's canonical copy among the registered
+    chunks and the earlier chunks of the same call, without registering
+    anything. Chunks become canonical through `register` only once they are
+    indexed, so a failed ingestion leaves no canonical copy that the store does
+    not hold. Lookups and registration are serialized with a lock; chunks that
+    another call is still indexing are not canonical yet.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                 bands: int = BANDS, chunk_types: Tuple[str, ...] = ('text',)):
+        """
+        Initialize the detector
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of word shingles
+            num_perm: MinHash signature length (must be divisible by bands)
+            bands: LSH bands; fewer, wider bands find fewer, more similar candidates
+            chunk_types: Chunk types checked (tables and charts carry figures and are kept)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.chunk_types = chunk_types
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._canonicals = _Canonicals(bands)
+        self.stats = AtomicCounters({'checked': 0, 'exact_duplicates': 0, 'near_duplicates': 0,
+                                     'tokens_skipped': 0})
+
+    def __len__(self) -> int:
+        return len(self._canonicals.chunks)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def check(self, chunk: Any) -> Optional[DuplicateMatch]:
+        """
+        Find the canonical copy of a chunk among the registered chunks
+
+        Args:
+            chunk: DocumentChunk about to be embedded
+
+        Returns:
+            The match if the chunk is a duplicate, otherwise None (the chunk is not registered)
+        """
+        _, duplicates = self.split([chunk])
+        return duplicates[0][1] if duplicates else None
+
+    def register(self, chunk: Any):
+        """Add an indexed chunk as a canonical candidate (after ingestion, or when a store is loaded)"""
+        fingerprint = self._fingerprint(chunk)
+        if fingerprint is not None:
+            with self._lock:
+                if fingerprint[0] not in self._canonicals:
+                    self._canonicals.add(chunk, fingerprint)
+
+    def _fingerprint(self, chunk: Any) -> Optional[Tuple[str, List[str], Tuple[str, ...], np.ndarray, List[bytes]]]:
+        """Content hash, tokens, numbers, signature and band keys of a checked chunk type"""
+        if chunk.chunk_type not in self.chunk_types:
+            return None
+        tokens = tokenize(chunk.text)
+        if not tokens:
+            return None
+        numbers = tuple(token for token in tokens if _NUMBER_PATTERN.search(token))
+        signature = self.hasher.signature(tokens)
+        return content_hash(chunk.text), tokens, numbers, signature, self._band_keys(signature)
+
+    def split(self, chunks: Sequence[Any]) -> Tuple[List[Any], List[Tuple[Any, DuplicateMatch]]]:
+        """
+        Separate duplicates from chunks to embed
+
+        A duplicate may match a chunk earlier in the same call; link it only
+        after that chunk is indexed, then `register` the indexed chunks and
+        `record` the linked duplicates.
+
+        Args:
+            chunks: Chunks of one ingestion call, in order
+
+        Returns:
+            (chunks to embed and index, [(duplicate, match)])
+        """
+        unique, duplicates = [], []
+        batch = _Canonicals(self.bands)
+        for chunk in chunks:
+            fingerprint = self._fingerprint(chunk)
+            if fingerprint is None:
+                unique.append(chunk)
+                continue
+            self.stats.add('checked')
+            with self._lock:
+                match = self._canonicals.find(fingerprint, self.threshold)
+            match = match or batch.find(fingerprint, self.threshold)
+            if match is None:
+                batch.add(chunk, fingerprint)
+                unique.append(chunk)
+                continue
+            duplicates.append((chunk, match))
+        return unique, duplicates
+
+    def record(self, duplicates: Sequence[Tuple[Any, DuplicateMatch]]):
+        """Count duplicates that were linked instead of indexed"""
+        for chunk, match in duplicates:
+            self.stats.add('exact_duplicates' if match.exact else 'near_duplicates')
+            self.stats.add('tokens_skipped', chunk.metadata.get('token_count', len(tokenize(chunk.text))))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Detector counters"""
+        stats = self.stats.snapshot()
+        stats['canonical_chunks'] = len(self)
+        stats['threshold'] = self.threshold
+        return stats
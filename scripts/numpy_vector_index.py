@@ -0,0 +1,646 @@
+"""
+🧮 NumPy Vector Index
+====================
+Pure-NumPy dense retrieval for hosts where FAISS cannot be installed.
+
+`NumpyFlatIndex` is an exact inner-product index with the subset of the FAISS
+index interface the pipelines use (`d`, `ntotal`, `add`, `search`,
+`reconstruct_n`). Vectors are stored as float16, either in memory or in an
+append-only file that is memory-mapped read-only, so the index costs half the
+RAM of a float32 flat index and a large one is paged in by the OS. A search
+scans the rows in blocks: each block is cast to float32, multiplied by all
+queries in one BLAS call and reduced to its best k with `argpartition`. Only
+the final k candidates per query are sorted.
+
+`NumpyVectorStore` wraps the index with the chunking, filters, caches, BM25
+and snapshots of FAISSVectorStore and has the same core interface
+(add_pdf_content, search, search_many, search_embeddings, search_lexical,
+search_hybrid, save/load). A store it saves is not readable by
+FAISSVectorStore and vice versa; re-ingestion reuses the shared embedding
+cache, so switching backends does not re-encode anything.
+
+Features:
+- Exact float16 flat index, about 2 bytes per dimension
+- Blocked matrix multiply with per-block argpartition top-k
+- Memory-mapped append-only vector file (vectors.f16)
+- Lock-free searches over immutable store states
+- No FAISS import anywhere in the module
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .retrieval_cache import LRUCache, normalize_query, freeze_filters
+    from .embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH
+    from .lexical_index import BM25Index, reciprocal_rank_fusion
+    from .turkish_chunker import TokenAwareChunker
+    from .vector_store_snapshots import SnapshotManager, BackgroundFlusher, SnapshotError
+    from .embedding_backends import cache_model_key
+    from .model_registry import acquire_encoder
+    from .document_chunks import FILTER_OVERSAMPLE, DocumentChunk, SearchResult, build_chunks, matches_filters
+except ImportError:
+    from retrieval_cache import LRUCache, normalize_query, freeze_filters
+    from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH
+    from lexical_index import BM25Index, reciprocal_rank_fusion
+    from turkish_chunker import TokenAwareChunker
+    from vector_store_snapshots import SnapshotManager, BackgroundFlusher, SnapshotError
+    from embedding_backends import cache_model_key
+    from model_registry import acquire_encoder
+    from document_chunks import FILTER_OVERSAMPLE, DocumentChunk, SearchResult, build_chunks, matches_filters
+
+logger = logging.getLogger(__name__)
+
+# Rows scanned per matrix multiply: 8192 x 768 float32 is a 24 MB working block
+DEFAULT_BLOCK_SIZE = 8192
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Unsorted columns of the k largest scores per row (all columns if there are at most k)"""
+    if scores.shape[1] <= k:
+        columns = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        return scores, columns
+    columns = np.argpartition(scores, -k, axis=1)[:, -k:]
+    return np.take_along_axis(scores, columns, axis=1), columns
+
+class NumpyFlatIndex:
+    """Exact inner-product index over float16 vectors (FAISS IndexFlatIP-compatible subset)"""
+
+    def __init__(self, d: int, path: Optional[str] = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the index
+
+        Args:
+            d: Vector dimension
+            path: Append-only float16 file to map (existing rows are loaded); None keeps vectors in memory
+            block_size: Rows per matrix multiply in search
+        """
+        self.d = d
+        self.is_trained = True
+        self.block_size = block_size
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._buffer = np.zeros((0, d), dtype=np.float16)
+        # Published prefix; replaced, never resized, so searches read it without locking
+        self._vectors = self._buffer
+        if self.path is not None and self.path.exists():
+            rows = self.path.stat().st_size // (2 * d)
+            self._vectors = self._map(rows)
+
+    @property
+    def ntotal(self) -> int:
+        return len(self._vectors)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ntotal * self.d * 2
+
+    def _map(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.zeros((0, self.d), dtype=np.float16)
+        return np.memmap(self.path, dtype=np.float16, mode='r', shape=(rows, self.d))
+
+    def add(self, x: np.ndarray):
+        """Append vectors (stored as float16)"""
+        x = np.ascontiguousarray(x, dtype=np.float16).reshape(-1, self.d)
+        with self._lock:
+            n = self.ntotal
+            if self.path is not None:
+                with open(self.path, 'r+b' if self.path.exists() else 'wb') as f:
+                    f.seek(n * self.d * 2)
+                    f.write(x.tobytes())
+                    # Drop anything left behind by a failed earlier write
+                    f.truncate()
+                self._vectors = self._map(n + len(x))
+                return
+            if n + len(x) > len(self._buffer):
+                # Capacity doubling; earlier prefixes keep pointing at the old buffer
+                grown = np.empty((max(2 * len(self._buffer), n + len(x), 1024), self.d), dtype=np.float16)
+                grown[:n] = self._buffer[:n]
+                self._buffer = grown
+            self._buffer[n:n + len(x)] = x
+            self._vectors = self._buffer[:n + len(x)]
+
+    def vectors(self) -> np.ndarray:
+        """Float16 rows published so far (a read-only view that later adds do not change)"""
+        return self._vectors
+
+    def reconstruct_n(self, i0: int, n: int) -> np.ndarray:
+        return np.asarray(self._vectors[i0:i0 + n], dtype=np.float32)
+
+    def search(self, x: np.ndarray, k: int, vectors: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact inner-product top-k
+
+        Args:
+            x: Query vectors (nq x d)
+            k: Number of results per query
+            vectors: Float16 rows to scan (default: all published rows)
+
+        Returns:
+            (scores, ids) of shape (nq x k), best first; missing slots are -inf / -1 as in FAISS
+        """
+        vectors = self._vectors if vectors is None else vectors
+        queries = np.ascontiguousarray(x, dtype=np.float32).reshape(-1, self.d)
+        nq, n = len(queries), len(vectors)
+        scores = np.full((nq, k), -np.inf, dtype=np.float32)
+        ids = np.full((nq, k), -1, dtype=np.int64)
+        if n == 0 or k <= 0:
+            return scores, ids
+
+        block_scores, block_ids = [], []
+        for start in range(0, n, self.block_size):
+            block = np.asarray(vectors[start:start + self.block_size], dtype=np.float32)
+            best, columns = top_k(queries @ block.T, k)
+            block_scores.append(best)
+            block_ids.append(columns + start)
+        candidates, positions = top_k(np.hstack(block_scores), k)
+        candidate_ids = np.take_along_axis(np.hstack(block_ids), positions, axis=1)
+        order = np.argsort(-candidates, axis=1, kind='stable')
+        found = candidates.shape[1]
+        scores[:, :found] = np.take_along_axis(candidates, order, axis=1)
+        ids[:, :found] = np.take_along_axis(candidate_ids, order, axis=1)
+        return scores, ids
+
+@dataclass(frozen=True)
+class NumpyStoreState:
+    """Immutable view of a NumPy store's searchable contents"""
+    index: NumpyFlatIndex
+    vectors: np.ndarray  # float16 rows of this state (a prefix view of the index)
+    chunks: List[DocumentChunk]  # append-only, shared between states; only the first `size` are visible
+    size: int
+    lexical_index: BM25Index
+    generation: int = 0
+
+class NumpyVectorStore:
+    """NumPy-only vector store with the FAISSVectorStore search interface"""
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 vector_store_path: str = "vector_store_numpy",
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 query_cache_size: int = 2048,
+                 result_cache_size: int = 512,
+                 cache_ttl: Optional[float] = 3600.0,
+                 embedding_cache_path: Optional[str] = str(DEFAULT_CACHE_PATH),
+                 model: Optional[Any] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 snapshot_keep: int = 3,
+                 flush_interval: float = 30.0,
+                 encoder_backend: str = "torch",
+                 onnx_path: Optional[str] = None):
+        """
+        Initialize NumPy vector store
+
+        Args:
+            model_name: Sentence transformer model name
+            vector_store_path: Path to store vector database
+            block_size: Rows per matrix multiply in search
+            query_cache_size: Max cached query embeddings (0 disables)
+            result_cache_size: Max cached top-k result lists (0 disables)
+            cache_ttl: Cache entry lifetime in seconds (None = no expiry)
+            embedding_cache_path: SQLite file for the persistent chunk embedding cache (None disables)
+            model: Already loaded embedding model to share
+            embedding_cache: Already opened embedding cache to share
+            snapshot_keep: Number of on-disk snapshot versions to keep
+            flush_interval: Minimum seconds between background snapshot flushes
+            encoder_backend: Embedding backend ('torch', 'int8', 'onnx'); see embedding_backends.py
+            onnx_path: Exported ONNX model directory for the 'onnx' backend
+        """
+        self.model_name = model_name
+        self.block_size = block_size
+        self.vector_store_path = Path(vector_store_path)
+        self.vector_store_path.mkdir(exist_ok=True)
+
+        self.encoder_backend = encoder_backend
+        if model is None:
+            model = acquire_encoder(model_name, encoder_backend, onnx_path)
+        self.model = model
+        self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        self.chunker = TokenAwareChunker.from_model(self.model)
+
+        # Same cache key as FAISSVectorStore, so either backend reuses the other's embeddings
+        if embedding_cache is None and embedding_cache_path:
+            embedding_cache = EmbeddingCache(cache_model_key(model_name, encoder_backend), embedding_cache_path)
+        self.embedding_cache = embedding_cache
+
+        # A fresh store starts a fresh vector file; unlinking leaves maps of the old one intact
+        self.vectors_path.unlink(missing_ok=True)
+        index = NumpyFlatIndex(self.embedding_dim, str(self.vectors_path), block_size)
+        self._state = NumpyStoreState(index=index, vectors=index.vectors(), chunks=[], size=0,
+                                      lexical_index=BM25Index())
+        self._write_lock = threading.Lock()
+        self.chunk_metadata: Dict[str, Dict[str, Any]] = {}
+
+        self.snapshots = SnapshotManager(self.vector_store_path, keep=snapshot_keep)
+        self.flush_interval = flush_interval
+        self._flusher: Optional[BackgroundFlusher] = None
+
+        self.query_embedding_cache = LRUCache(query_cache_size, cache_ttl)
+        self.result_cache = LRUCache(result_cache_size, cache_ttl)
+
+        self.performance_stats = {
+            'embedding_time': 0.0,
+            'indexing_time': 0.0,
+            'search_time': 0.0,
+            'chunks_processed': 0,
+            'searches_performed': 0
+        }
+        self._stats_lock = threading.Lock()
+
+        logger.info(f"🚀 NumPy Vector Store initialized (dimension: {self.embedding_dim})")
+
+    @property
+    def vectors_path(self) -> Path:
+        """Live append-only float16 vector file"""
+        return self.vector_store_path / "vectors.f16"
+
+    @property
+    def index(self) -> NumpyFlatIndex:
+        return self._state.index
+
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        """Chunks of the current state, in index position order (a copy)"""
+        state = self._state
+        return state.chunks[:state.size]
+
+    @property
+    def total_vectors(self) -> int:
+        return self._state.size
+
+    @property
+    def index_generation(self) -> int:
+        return self._state.generation
+
+    def _add_stats(self, **values: float):
+        with self._stats_lock:
+            for name, value in values.items():
+                self.performance_stats[name] += value
+
+    def add_pdf_content(self, pdf_analysis: Dict[str, Any]):
+        """
+        Add PDF content to vector store
+
+        Args:
+            pdf_analysis: PDF analysis results from hybrid extractor
+        """
+        logger.info("📄 Adding PDF content to NumPy vector store")
+        start_time = time.time()
+        chunks = self.build_chunks(pdf_analysis)
+        self.add_chunks(chunks)
+        self._add_stats(chunks_processed=len(chunks))
+        logger.info(f"✅ PDF content added: {len(chunks)} chunks in {time.time() - start_time:.2f}s")
+
+    def build_chunks(self, pdf_analysis: Dict[str, Any]) -> List[DocumentChunk]:
+        """Turn PDF analysis results into chunks without embedding them (see document_chunks.py)"""
+        return build_chunks(pdf_analysis, self.chunker)
+
+    def add_chunks(self, chunks: List[DocumentChunk]):
+        """Embed chunks and append them to the index"""
+        if not chunks:
+            return
+        start_time = time.time()
+        embeddings = self._encode_documents([chunk.text for chunk in chunks])
+        embedding_time = time.time() - start_time
+        self.add_embeddings(chunks, embeddings)
+        self._add_stats(embedding_time=embedding_time, indexing_time=time.time() - start_time - embedding_time)
+
+    def add_embeddings(self, chunks: List[DocumentChunk], embeddings: np.ndarray):
+        """
+        Append chunks with precomputed normalized embeddings
+
+        Args:
+            chunks: Chunks to add
+            embeddings: One vector per chunk (nq x d)
+        """
+        with self._write_lock:
+            state = self._state
+            # Vectors first: if the file write fails, nothing else has changed
+            state.index.add(embeddings)
+            state.chunks.extend(chunks)
+            state.lexical_index.add_documents(chunk.text for chunk in chunks)
+            for chunk in chunks:
+                self.chunk_metadata[chunk.id] = {
+                    'source': chunk.source,
+                    'page_number': chunk.page_number,
+                    'chunk_type': chunk.chunk_type,
+                    'metadata': chunk.metadata
+                }
+            self._state = replace(state, vectors=state.index.vectors(), size=len(state.chunks),
+                                  generation=state.generation + 1)
+
+    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search for one query (same signature as FAISSVectorStore.search without MMR)"""
+        if filter_type:
+            filters = {**(filters or {}), 'chunk_type': filter_type}
+        return self.search_many([query], k=k, filters=filters)[0]
+
+    def search_many(self, queries: List[str], k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """
+        Search for several queries with one batched encode and one blocked scan
+
+        Args:
+            queries: Search queries
+            k: Number of results to return per query
+            filters: Chunk attribute or metadata filters (see FAISSVectorStore.search_many)
+
+        Returns:
+            One list of search results per query, in query order
+        """
+        if not queries:
+            return []
+        state = self._state
+        if state.size == 0:
+            logger.warning("⚠️ Vector store is empty")
+            return [[] for _ in queries]
+
+        start_time = time.time()
+        query_keys = [normalize_query(query) for query in queries]
+        filters_key = freeze_filters(filters)
+        results: List[Optional[List[SearchResult]]] = [None] * len(queries)
+        pending = []
+        for i, query_key in enumerate(query_keys):
+            cached = self.result_cache.get((query_key, k, filters_key, state.generation))
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending.append(i)
+
+        if pending:
+            query_embeddings = self._encode_queries([queries[i] for i in pending],
+                                                    [query_keys[i] for i in pending])
+            for i, query_results in zip(pending, self._search_state(state, query_embeddings, k, filters)):
+                results[i] = query_results
+                # Cached as a tuple: callers get their own list and cannot change later hits
+                self.result_cache.put((query_keys[i], k, filters_key, state.generation), tuple(query_results))
+
+        self._add_stats(search_time=time.time() - start_time, searches_performed=len(queries))
+        return results
+
+    def search_embeddings(self, query_embeddings: np.ndarray, k: int = 10,
+                          filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Search with precomputed normalized query embeddings (no encoding, no result cache)"""
+        return self._search_state(self._state, query_embeddings, k, filters)
+
+    def _search_state(self, state: NumpyStoreState, query_embeddings: np.ndarray, k: int,
+                      filters: Optional[Dict[str, Any]]) -> List[List[SearchResult]]:
+        if state.size == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        fetch_k = min(k * FILTER_OVERSAMPLE if filters else k, state.size)
+        scores, indices = state.index.search(query_embeddings, fetch_k, state.vectors)
+        results = [self._collect_results(row_scores, row_indices, k, filters, state)
+                   for row_scores, row_indices in zip(scores, indices)]
+        # Queries whose filters rejected too many candidates are searched again, deeper
+        pending = [q for q, query_results in enumerate(results) if len(query_results) < k]
+        while pending and fetch_k < state.size:
+            fetch_k = min(fetch_k * FILTER_OVERSAMPLE, state.size)
+            scores, indices = state.index.search(query_embeddings[pending], fetch_k, state.vectors)
+            for q, row_scores, row_indices in zip(pending, scores, indices):
+                results[q] = self._collect_results(row_scores, row_indices, k, filters, state)
+            pending = [q for q in pending if len(results[q]) < k]
+        return results
+
+    def _collect_results(self, scores: np.ndarray, indices: np.ndarray, k: int,
+                         filters: Optional[Dict[str, Any]], state: NumpyStoreState) -> List[SearchResult]:
+        """Filtered, ranked search results of one query's candidates"""
+        results: List[SearchResult] = []
+        for score, idx in zip(scores, indices):
+            if idx < 0:
+                continue
+            chunk = state.chunks[idx]
+            if filters and not matches_filters(chunk, filters):
+                continue
+            results.append(SearchResult(chunk=chunk, score=float(score), rank=len(results)))
+            if len(results) >= k:
+                break
+        return results
+
+    def search_lexical(self, query: str, k: int = 10,
+                       filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """BM25 keyword search with Turkish casefolding and stemming"""
+        state = self._state
+        fetch_k = k * FILTER_OVERSAMPLE if filters else k
+        while True:
+            hits = state.lexical_index.search(query, fetch_k, max_doc=state.size)
+            results: List[SearchResult] = []
+            for idx, score in hits:
+                chunk = state.chunks[idx]
+                if filters and not matches_filters(chunk, filters):
+                    continue
+                results.append(SearchResult(chunk=chunk, score=score, rank=len(results), lexical_score=score))
+                if len(results) >= k:
+                    break
+            if len(results) >= k or len(hits) < fetch_k or fetch_k >= state.size:
+                return results
+            fetch_k *= FILTER_OVERSAMPLE
+
+    def search_hybrid(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None,
+                      candidates: int = 50, lexical_weight: float = 1.0, rrf_k: int = 60) -> List[SearchResult]:
+        """Fuse dense and BM25 rankings with reciprocal rank fusion (see FAISSVectorStore.search_hybrid)"""
+        state = self._state
+        if state.size == 0:
+            logger.warning("⚠️ Vector store is empty")
+            return []
+        start_time = time.time()
+        candidates = min(max(candidates, k), state.size)
+        query_embedding = self._encode_queries([query])
+        while True:
+            scores, indices = state.index.search(query_embedding, candidates, state.vectors)
+            dense = {int(idx): float(score) for score, idx in zip(scores[0], indices[0]) if idx >= 0}
+            lexical = dict(state.lexical_index.search(query, candidates, max_doc=state.size))
+            fused = reciprocal_rank_fusion([list(dense), list(lexical)], k=rrf_k, weights=[1.0, lexical_weight])
+
+            results: List[SearchResult] = []
+            for idx, score in fused:
+                chunk = state.chunks[idx]
+                if filters and not matches_filters(chunk, filters):
+                    continue
+                results.append(SearchResult(chunk=chunk, score=score, rank=len(results),
+                                            dense_score=dense.get(idx), lexical_score=lexical.get(idx)))
+                if len(results) >= k:
+                    break
+            # Deepen both rankings while filters leave fewer than k fused results
+            if len(results) >= k or candidates >= state.size:
+                break
+            candidates = min(candidates * FILTER_OVERSAMPLE, state.size)
+        self._add_stats(search_time=time.time() - start_time, searches_performed=1)
+        return results
+
+    def _encode_documents(self, texts: List[str]) -> np.ndarray:
+        """Encode chunk texts through the persistent embedding cache"""
+        def encode(batch: List[str]) -> np.ndarray:
+            return self.model.encode(batch, convert_to_numpy=True, normalize_embeddings=True)
+
+        if self.embedding_cache is None:
+            return encode(texts)
+        return self.embedding_cache.encode(texts, encode)
+
+    def _encode_queries(self, queries: List[str], query_keys: Optional[List[str]] = None) -> np.ndarray:
+        """Encode queries, reusing cached embeddings and batching the misses"""
+        query_keys = query_keys or [normalize_query(query) for query in queries]
+        embeddings: List[Optional[np.ndarray]] = [self.query_embedding_cache.get(key) for key in query_keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.model.encode([queries[i] for i in missing],
+                                        convert_to_numpy=True, normalize_embeddings=True)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self.query_embedding_cache.put(query_keys[i], embedding)
+        return np.vstack(embeddings).astype(np.float32)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get retrieval cache hit-rate metrics"""
+        return {
+            'index_generation': self.index_generation,
+            'query_embeddings': self.query_embedding_cache.get_stats(),
+            'results': self.result_cache.get_stats()
+        }
+
+    def save_vector_store(self) -> str:
+        """
+        Save vector store to disk as a new snapshot and publish it atomically
+
+        Returns:
+            Snapshot version
+        """
+        state = self._state
+        chunks = state.chunks[:state.size]
+        chunks_bytes = pickle.dumps(chunks)
+        chunk_metadata = {chunk.id: self.chunk_metadata[chunk.id] for chunk in chunks
+                          if chunk.id in self.chunk_metadata}
+        with self._stats_lock:
+            performance_stats = dict(self.performance_stats)
+        config = {
+            'model_name': self.model_name,
+            'index_type': 'numpy_flat_f16',
+            'embedding_dim': self.embedding_dim,
+            'total_chunks': state.size,
+            'performance_stats': performance_stats
+        }
+
+        def write_files(directory: Path):
+            # The live vector file is append-only; the snapshot keeps a copy of the state's prefix
+            block = max(1, (1 << 24) // (self.embedding_dim * 2))
+            with open(directory / "vectors.f16", 'wb') as f:
+                for start in range(0, state.size, block):
+                    f.write(np.ascontiguousarray(state.vectors[start:start + block]).tobytes())
+            with open(directory / "chunks.pkl", 'wb') as f:
+                f.write(chunks_bytes)
+            with open(directory / "metadata.json", 'w', encoding='utf-8') as f:
+                json.dump(chunk_metadata, f, ensure_ascii=False, indent=2)
+            with open(directory / "config.json", 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+
+        version = self.snapshots.write_snapshot(write_files, {'total_chunks': state.size,
+                                                              'model_name': self.model_name})
+        logger.info(f"✅ NumPy vector store saved: {state.size} chunks ({version})")
+        return version
+
+    def schedule_save(self):
+        """Request a background snapshot; bursts of requests are coalesced to one per flush_interval"""
+        if self._flusher is None:
+            self._flusher = BackgroundFlusher(self.save_vector_store, self.flush_interval)
+        self._flusher.request()
+
+    def close(self):
+        """Flush pending background saves"""
+        if self._flusher is not None:
+            self._flusher.close(flush=True)
+            self._flusher = None
+
+    def load_vector_store(self, verify: bool = True) -> bool:
+        """
+        Load the live snapshot, memory-mapping its vectors
+
+        Args:
+            verify: Check snapshot files against their manifest checksums
+        """
+        try:
+            store_dir = self.snapshots.current_dir()
+            if store_dir is None or not (store_dir / "config.json").exists():
+                logger.warning("⚠️ No saved vector store found")
+                return False
+            if verify:
+                self.snapshots.verify()
+            with open(store_dir / "config.json", 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if config['model_name'] != self.model_name:
+                logger.warning(f"⚠️ Model mismatch: {config['model_name']} vs {self.model_name}")
+                return False
+            if config.get('index_type') != 'numpy_flat_f16':
+                logger.warning(f"⚠️ Not a NumPy vector store: {config.get('index_type')}")
+                return False
+            with open(store_dir / "chunks.pkl", 'rb') as f:
+                chunks = pickle.load(f)
+            with open(store_dir / "metadata.json", 'r', encoding='utf-8') as f:
+                chunk_metadata = json.load(f)
+            lexical_index = BM25Index()
+            lexical_index.add_documents(chunk.text for chunk in chunks)
+
+            with self._write_lock:
+                # The live file may hold other vectors of the same size; searches keep their old mapping
+                staging = self.vectors_path.with_suffix(".f16.tmp")
+                shutil.copyfile(store_dir / "vectors.f16", staging)
+                os.replace(staging, self.vectors_path)
+                index = NumpyFlatIndex(self.embedding_dim, str(self.vectors_path), self.block_size)
+                if index.ntotal != len(chunks):
+                    logger.error(f"❌ Vector file holds {index.ntotal} vectors for {len(chunks)} chunks")
+                    return False
+                self._state = NumpyStoreState(index=index, vectors=index.vectors(), chunks=chunks,
+                                              size=len(chunks), lexical_index=lexical_index,
+                                              generation=self._state.generation + 1)
+                self.chunk_metadata = chunk_metadata
+            with self._stats_lock:
+                self.performance_stats.update(config.get('performance_stats', {}))
+            logger.info(f"✅ NumPy vector store loaded: {len(chunks)} chunks ({self.snapshots.current_version()})")
+            return True
+        except SnapshotError as e:
+            logger.error(f"❌ Snapshot verification failed: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Failed to load vector store: {e}")
+            return False
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get vector store statistics"""
+        state = self._state
+        chunks = state.chunks[:state.size]
+        with self._stats_lock:
+            performance_stats = dict(self.performance_stats)
+        return {
+            'total_chunks': len(chunks),
+            'chunk_types': {
+                chunk_type: len([c for c in chunks if c.chunk_type == chunk_type])
+                for chunk_type in ['text', 'table', 'chart', 'ocr']
+            },
+            'sources': list(set(chunk.source for chunk in chunks)),
+            'performance_stats': performance_stats,
+            'cache_stats': self.get_cache_stats(),
+            'lexical_index': state.lexical_index.get_stats(),
+            'embedding_cache': self.embedding_cache.get_stats() if self.embedding_cache else None,
+            'encoder_backend': self.encoder_backend,
+            'snapshot': {
+                'current': self.snapshots.current_version(),
+                'versions': self.snapshots.list_versions(),
+                'flusher': self._flusher.stats if self._flusher else None
+            },
+            'index_info': {
+                'type': 'numpy_flat_f16',
+                'bytes_per_chunk': 2 * self.embedding_dim,
+                'dimension': self.embedding_dim,
+                'block_size': self.block_size,
+                'total_vectors': state.size
+            }
+        }
@@ -0,0 +1,304 @@
+"""
+🔁 RAG Generations
+=================
+Snapshot-isolated, incrementally updated corpus for the serving RAG.
+
+The corpus is a list of immutable segments, each a flat FAISS index with its
+chunk table. A generation is an immutable list of segments. Writers build the
+next generation in the background and publish it with a single reference
+assignment. A query pins the generation it started with and keeps using it
+until it finishes, without waiting for ingestion. Segments are shared between
+generations, so adding a document costs only that document's vectors. Small
+trailing segments are merged size-tiered, up to `max_segment_chunks`, so a
+query scans a logarithmic number of segments.
+
+Features:
+- Lock-free reads: pinning the current generation is one attribute read
+- Single writer: appends and removals are serialized and published atomically
+- Old generations are released once their last reader drains (reference counted)
+- Bounded extra memory during updates (only the new or merged segment is built)
+- Reader, generation and segment metrics
+"""
+
+import heapq
+import itertools
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+# Scoped searches over more document ranges than this in one segment use one filtered scan
+MAX_SCOPED_RANGES = 64
+
+# (document_id, metadata, chunks, normalized float32 embeddings)
+DocumentBatch = Tuple[str, Dict[str, Any], List[Dict], Optional[np.ndarray]]
+
+class CorpusSegment:
+    """Immutable flat index over a few documents; each document owns one contiguous id range"""
+
+    def __init__(self, index: Any, chunks: List[Dict], ranges: Dict[str, Tuple[int, int]]):
+        self.index = index
+        self.chunks = chunks
+        self.ranges = ranges
+
+    @property
+    def size(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.index.ntotal * self.index.d * 4
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, List[Dict], np.ndarray]]) -> Optional["CorpusSegment"]:
+        """Segment over (document_id, chunks, embeddings) triples; None if there are no chunks"""
+        index, chunks, ranges = None, [], {}
+        for document_id, document_chunks, embeddings in documents:
+            if not document_chunks:
+                continue
+            if index is None:
+                index = faiss.IndexFlatIP(embeddings.shape[1])  # Inner product for cosine similarity
+            index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+            ranges[document_id] = (len(chunks), len(chunks) + len(document_chunks))
+            chunks.extend(document_chunks)
+        return cls(index, chunks, ranges) if index is not None else None
+
+    def documents(self) -> Iterator[Tuple[str, List[Dict], np.ndarray]]:
+        """Documents of this segment with their vectors (copied out of the index)"""
+        for document_id, (start, end) in self.ranges.items():
+            yield document_id, self.chunks[start:end], self.index.reconstruct_n(start, end - start)
+
+    def without(self, document_id: str) -> Optional["CorpusSegment"]:
+        """Copy of this segment without one document; None if nothing remains"""
+        return CorpusSegment.build(document for document in self.documents() if document[0] != document_id)
+
+    def _scoped_ranges(self, document_ids: Sequence[str]) -> List[List[int]]:
+        """Sorted, coalesced local id ranges of the scoped documents in this segment"""
+        ranges = sorted(self.ranges[document_id] for document_id in document_ids if document_id in self.ranges)
+        merged: List[List[int]] = []
+        for start, end in ranges:
+            if merged and merged[-1][1] == start:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        return merged
+
+    def search(self, query_embeddings: np.ndarray, k: int,
+               document_ids: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k inner products within this segment
+
+        Args:
+            query_embeddings: Normalized float32 query vectors
+            k: Results per query
+            document_ids: Restrict to these documents (None = whole segment)
+
+        Returns:
+            (scores, local positions), -1 positions for missing results
+        """
+        if document_ids is None:
+            return self.index.search(query_embeddings, min(k, self.size))
+
+        ranges = self._scoped_ranges(document_ids)
+        if not ranges:
+            return (np.full((len(query_embeddings), 0), -np.inf, dtype=np.float32),
+                    np.full((len(query_embeddings), 0), -1, dtype=np.int64))
+        if len(ranges) > MAX_SCOPED_RANGES:
+            # Scattered scope: one scan with a membership filter
+            ids = np.concatenate([np.arange(start, end, dtype=np.int64) for start, end in ranges])
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(ids))
+            return self.index.search(query_embeddings, min(k, len(ids)), params=params)
+
+        # A range selector scans only that range of a flat index, so cost follows the scope size
+        all_scores, all_positions = [], []
+        for start, end in ranges:
+            params = faiss.SearchParameters(sel=faiss.IDSelectorRange(start, end))
+            scores, positions = self.index.search(query_embeddings, min(k, end - start), params=params)
+            all_scores.append(scores)
+            all_positions.append(positions)
+        return np.hstack(all_scores), np.hstack(all_positions)
+
+class CorpusGeneration:
+    """Immutable view of the corpus: segments plus document metadata"""
+
+    def __init__(self, number: int, segments: Tuple[CorpusSegment, ...], documents: Dict[str, Dict[str, Any]]):
+        self.number = number
+        self.segments = segments
+        self.documents = documents
+        self.readers = 0
+
+    @property
+    def size(self) -> int:
+        return sum(segment.size for segment in self.segments)
+
+    def iter_chunks(self) -> Iterator[Dict]:
+        for segment in self.segments:
+            yield from segment.chunks
+
+    def search(self, query_embeddings: np.ndarray, k: int,
+               document_ids: Optional[Iterable[str]] = None) -> List[List[Tuple[float, Dict]]]:
+        """
+        Top-k chunks across all segments
+
+        Args:
+            query_embeddings: Normalized float32 query vectors
+            k: Results per query
+            document_ids: Restrict to these documents (None = whole corpus)
+
+        Returns:
+            Per query, (similarity, chunk) pairs best first
+        """
+        scope = None if document_ids is None else list(set(document_ids))
+        candidates: List[List[Tuple[float, Dict]]] = [[] for _ in range(len(query_embeddings))]
+        for segment in self.segments:
+            if scope is not None and not any(document_id in segment.ranges for document_id in scope):
+                continue
+            scores, positions = segment.search(query_embeddings, k, scope)
+            for row, (row_scores, row_positions) in enumerate(zip(scores, positions)):
+                candidates[row].extend((float(score), segment.chunks[position])
+                                       for score, position in zip(row_scores, row_positions) if position >= 0)
+        return [heapq.nlargest(k, row, key=lambda candidate: candidate[0]) for row in candidates]
+
+class GenerationalCorpus:
+    """Single-writer, many-reader corpus published as immutable generations"""
+
+    def __init__(self, max_segment_chunks: int = 200_000, merge_factor: int = 2):
+        """
+        Initialize corpus
+
+        Args:
+            max_segment_chunks: Largest segment a merge may produce (bounds the memory and
+                time of one merge: 200k chunks x 768 dims x 4 bytes ≈ 600 MB)
+            merge_factor: A trailing segment is merged into the one before it until that one
+                is at least this many times larger
+        """
+        self.max_segment_chunks = max_segment_chunks
+        self.merge_factor = merge_factor
+        self._current = CorpusGeneration(0, (), {})
+        self._writer_lock = threading.Lock()
+        self._readers_lock = threading.Lock()
+        self._retired: "weakref.WeakSet[CorpusGeneration]" = weakref.WeakSet()
+        self.stats = {'published': 0, 'merges': 0, 'merged_chunks': 0}
+
+    @property
+    def current(self) -> CorpusGeneration:
+        """The latest published generation"""
+        return self._current
+
+    @contextmanager
+    def snapshot(self) -> Iterator[CorpusGeneration]:
+        """Pin the current generation for the duration of a read"""
+        generation = self._current
+        with self._readers_lock:
+            generation.readers += 1
+        try:
+            yield generation
+        finally:
+            with self._readers_lock:
+                generation.readers -= 1
+
+    def _publish(self, segments: List[CorpusSegment], documents: Dict[str, Dict[str, Any]]):
+        """Atomically replace the current generation (writer lock held)"""
+        previous = self._current
+        self._current = CorpusGeneration(previous.number + 1, tuple(segments), documents)
+        # Held only by its remaining readers; freed when the last one finishes
+        self._retired.add(previous)
+        self.stats['published'] += 1
+
+    def _compact(self, segments: List[CorpusSegment]) -> List[CorpusSegment]:
+        """Size-tiered merging of the trailing segments (writer lock held)"""
+        while (len(segments) >= 2 and segments[-2].size < self.merge_factor * segments[-1].size and
+               segments[-2].size + segments[-1].size <= self.max_segment_chunks):
+            merged = CorpusSegment.build(itertools.chain(segments[-2].documents(), segments[-1].documents()))
+            self.stats['merges'] += 1
+            self.stats['merged_chunks'] += merged.size
+            segments[-2:] = [merged]
+        return segments
+
+    def _without(self, segments: List[CorpusSegment], document_id: str) -> List[CorpusSegment]:
+        """Segments with one document removed (only its segment is rebuilt)"""
+        result = []
+        for segment in segments:
+            if document_id in segment.ranges:
+                segment = segment.without(document_id)
+            if segment is not None:
+                result.append(segment)
+        return result
+
+    def add_documents(self, documents: Iterable[DocumentBatch]) -> int:
+        """
+        Add (or replace) documents and publish them as one new generation
+
+        Documents are streamed into new segments of at most `max_segment_chunks`
+        chunks, so a bulk load never holds more than one segment being built.
+
+        Args:
+            documents: (document_id, metadata, chunks, embeddings) tuples
+
+        Returns:
+            Number of chunks added
+        """
+        with self._writer_lock:
+            current = self._current
+            segments = list(current.segments)
+            metadata = dict(current.documents)
+            pending: List[Tuple[str, List[Dict], np.ndarray]] = []
+            pending_size, added = 0, 0
+
+            def flush():
+                nonlocal pending, pending_size
+                segment = CorpusSegment.build(pending)
+                if segment is not None:
+                    segments.append(segment)
+                pending, pending_size = [], 0
+
+            for document_id, document_metadata, chunks, embeddings in documents:
+                if document_id in metadata:
+                    segments[:] = self._without(segments, document_id)
+                    pending = [document for document in pending if document[0] != document_id]
+                    pending_size = sum(len(document[1]) for document in pending)
+                if chunks and pending_size + len(chunks) > self.max_segment_chunks:
+                    flush()
+                if chunks:
+                    pending.append((document_id, chunks, embeddings))
+                    pending_size += len(chunks)
+                metadata[document_id] = {**document_metadata, 'chunks': len(chunks)}
+                added += len(chunks)
+            flush()
+            self._publish(self._compact(segments), metadata)
+            return added
+
+    def add_document(self, document_id: str, metadata: Dict[str, Any],
+                     chunks: List[Dict], embeddings: Optional[np.ndarray]) -> int:
+        """Add (or replace) one document and publish a new generation"""
+        return self.add_documents([(document_id, metadata, chunks, embeddings)])
+
+    def remove_document(self, document_id: str) -> bool:
+        """Remove a document and publish a new generation; False if it is not in the corpus"""
+        with self._writer_lock:
+            current = self._current
+            if document_id not in current.documents:
+                return False
+            metadata = {key: value for key, value in current.documents.items() if key != document_id}
+            self._publish(self._without(list(current.segments), document_id), metadata)
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Generation, segment, reader and memory metrics"""
+        generation = self._current
+        with self._readers_lock:
+            retired = [old for old in self._retired if old is not generation]
+            return {
+                **self.stats,
+                'generation': generation.number,
+                'documents': len(generation.documents),
+                'chunks': generation.size,
+                'segments': [segment.size for segment in generation.segments],
+                'index_memory_mb': sum(segment.memory_bytes for segment in generation.segments) / 2**20,
+                'active_readers': generation.readers,
+                'retired_generations_alive': len(retired),
+                'retired_readers': sum(old.readers for old in retired)
+            }
@@ -0,0 +1,109 @@
+"""
+🧠 Retrieval Cache
+=================
+Bounded, thread-safe LRU caches with TTL for the retrieval path.
+
+Used by FAISSVectorStore for two levels of caching:
+- Query-embedding cache keyed by normalized query text
+- Top-k result cache keyed by (query key, k, filters, index generation)
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache keys (unicode form, whitespace)
+
+    Case is kept: a cased model encodes "Faiz" and "faiz" differently, and
+    str.lower() mangles Turkish dotted/dotless I ("İ" -> "i̇").
+    """
+    return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+def freeze_filters(filters: Optional[Dict[str, Any]]) -> Hashable:
+    """Turn a search filter dict into a hashable, order-independent key"""
+    if not filters:
+        return ()
+    frozen = []
+    for key, value in sorted(filters.items()):
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = tuple(sorted(value, key=str))
+        frozen.append((key, value))
+    return tuple(frozen)
+
+class LRUCache:
+    """Size-bounded LRU cache with optional time-to-live and hit-rate metrics"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of entries (0 disables the cache)
+            ttl: Entry lifetime in seconds (None = no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            if self.ttl is not None and self._expires[key] < time.monotonic():
+                del self._data[key]
+                del self._expires[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or refresh an entry, evicting the least recently used if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                self._expires.pop(old_key, None)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (metrics are kept)"""
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit-rate metrics"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
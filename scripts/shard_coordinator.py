@@ -0,0 +1,283 @@
+"""
+🧭 Shard Coordinator
+===================
+Scatter-gather search over shard servers on several nodes (see shard_server.py).
+
+Documents are assigned to nodes with a consistent-hash ring: every node owns
+many virtual points on a 64-bit ring, and a document belongs to the first
+point after the hash of its source filename. Adding or removing a node
+therefore moves only about 1/N of the documents instead of reshuffling all of
+them, as `hash(source) % N` would.
+
+A search is sent to every node in parallel and bounded by one deadline. Nodes
+that answer in time are merged into a global top-k by score. All shards use
+the same model and normalized inner-product scores, so their scores are
+comparable. A node that is slow, down or failing is reported as missing
+instead of failing the whole query, so the caller gets partial results and
+knows which shards they lack.
+
+Features:
+- Consistent hashing with virtual nodes for document placement
+- Parallel fan-out with a per-query deadline and per-shard failure reporting
+- Heap merge of per-shard top-k into a global top-k
+- Node health checks
+"""
+
+import bisect
+import hashlib
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .document_chunks import SearchResult, document_source, result_from_dict
+    from .vector_store_concurrency import AtomicCounters
+except ImportError:
+    from document_chunks import SearchResult, document_source, result_from_dict
+    from vector_store_concurrency import AtomicCounters
+
+logger = logging.getLogger(__name__)
+
+# Virtual points per node; more points even out the share of documents per node
+DEFAULT_REPLICAS = 128
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+def parse_nodes(spec: str) -> Dict[str, str]:
+    """
+    Parse a node list such as "node1=http://10.0.0.1:8101,node2=http://10.0.0.2:8101"
+
+    Args:
+        spec: Comma-separated name=url pairs (e.g. the SHARD_NODES environment variable)
+
+    Returns:
+        Node name -> base URL
+    """
+    nodes = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, url = item.partition('=')
+        if not url:
+            raise ValueError(f"Invalid shard node '{item}', expected name=url")
+        nodes[name.strip()] = url.strip().rstrip('/')
+    return nodes
+
+class ConsistentHashRing:
+    """Consistent-hash assignment of keys to nodes"""
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners))
+
+    def add_node(self, node: str):
+        """Add a node's virtual points; it takes over about 1/N of the keys"""
+        if node in self._owners:
+            return
+        points = list(zip(self._points, self._owners))
+        points.extend((_ring_hash(f"{node}#{i}"), node) for i in range(self.replicas))
+        points.sort()
+        # Replaced, never mutated, so lookups need no lock
+        self._points, self._owners = [p for p, _ in points], [o for _, o in points]
+
+    def remove_node(self, node: str):
+        """Remove a node; only its keys move, to the next nodes on the ring"""
+        points = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points, self._owners = [p for p, _ in points], [o for _, o in points]
+
+    def node_for(self, key: str) -> str:
+        """Node owning a key"""
+        points, owners = self._points, self._owners
+        if not points:
+            raise ValueError("Hash ring has no nodes")
+        return owners[bisect.bisect(points, _ring_hash(key)) % len(points)]
+
+    def assignment(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Keys grouped by owning node"""
+        groups: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            groups[self.node_for(key)].append(key)
+        return groups
+
+@dataclass
+class GatherResult:
+    """Merged results of one scatter-gather search"""
+    results: List[List[SearchResult]]
+    responded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # shard -> 'timeout' or error message
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed)
+
+def _json_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Filters with set/tuple values turned into JSON lists"""
+    if not filters:
+        return None
+    return {key: sorted(value, key=str) if isinstance(value, (set, frozenset, tuple)) else value
+            for key, value in filters.items()}
+
+class ShardCoordinator:
+    """Fans searches out to shard servers and merges their top-k"""
+
+    def __init__(self, nodes: Dict[str, str], timeout: float = 2.0, ingest_timeout: float = 600.0,
+                 replicas: int = DEFAULT_REPLICAS, max_workers: int = 32):
+        """
+        Initialize the coordinator
+
+        Args:
+            nodes: Node name -> shard server base URL (see parse_nodes)
+            timeout: Default search deadline in seconds; shards answering later are reported as missing
+            ingest_timeout: Timeout of a document ingestion request
+            replicas: Virtual points per node on the hash ring
+            max_workers: Concurrent shard requests
+        """
+        if not nodes:
+            raise ValueError("At least one shard node is required")
+        self.nodes = dict(nodes)
+        self.ring = ConsistentHashRing(self.nodes, replicas)
+        self.timeout = timeout
+        self.ingest_timeout = ingest_timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.nodes), pool_maxsize=max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-fanout")
+        self.stats = AtomicCounters({'searches': 0, 'partial_searches': 0, 'shard_timeouts': 0,
+                                     'shard_errors': 0, 'documents_routed': 0})
+        logger.info(f"🧭 Shard coordinator initialized: {', '.join(sorted(self.nodes))}")
+
+    def add_node(self, name: str, url: str):
+        """Add a node; documents routed afterwards may go to it (existing ones are not moved)"""
+        self.nodes = {**self.nodes, name: url.rstrip('/')}
+        self.ring.add_node(name)
+
+    def remove_node(self, name: str):
+        """Stop routing documents and queries to a node"""
+        self.ring.remove_node(name)
+        self.nodes = {n: url for n, url in self.nodes.items() if n != name}
+
+    def node_for(self, source: str) -> str:
+        """Node owning a document (by source filename)"""
+        return self.ring.node_for(source)
+
+    def add_pdf_content(self, pdf_analysis: Dict[str, Any]) -> str:
+        """
+        Index a document on the node that owns it
+
+        Args:
+            pdf_analysis: PDF analysis results from hybrid extractor
+
+        Returns:
+            Name of the node that indexed the document
+        """
+        name = self.node_for(document_source(pdf_analysis))
+        response = self._session.post(f"{self.nodes[name]}/documents", json={'pdf_analysis': pdf_analysis},
+                                      timeout=self.ingest_timeout)
+        response.raise_for_status()
+        self.stats.add('documents_routed')
+        logger.info(f"✅ {document_source(pdf_analysis)} indexed on shard '{name}'")
+        return name
+
+    def _search_node(self, name: str, payload: Dict[str, Any], timeout: float) -> List[List[SearchResult]]:
+        response = self._session.post(f"{self.nodes[name]}/search", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return [[result_from_dict(result) for result in query_results]
+                for query_results in response.json()['results']]
+
+    def scatter(self, queries: List[str], k: int = 10, filters: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> GatherResult:
+        """
+        Search every node in parallel and merge what arrives before the deadline
+
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filters: Attribute/metadata filters applied on each node
+            timeout: Deadline in seconds for the whole fan-out (default: self.timeout)
+
+        Returns:
+            Merged results with the shards that answered and the ones that did not
+        """
+        timeout = self.timeout if timeout is None else timeout
+        nodes = self.nodes
+        if not queries:
+            return GatherResult(results=[])
+        payload = {'queries': queries, 'k': k, 'filters': _json_filters(filters)}
+        futures = {self._executor.submit(self._search_node, name, payload, timeout): name for name in nodes}
+        done, not_done = wait(futures, timeout=timeout)
+
+        gathered = GatherResult(results=[])
+        per_shard = []
+        for future in not_done:
+            future.cancel()
+            gathered.failed[futures[future]] = 'timeout'
+            self.stats.add('shard_timeouts')
+        for future in done:
+            name = futures[future]
+            try:
+                per_shard.append(future.result())
+                gathered.responded.append(name)
+            except Exception as e:
+                gathered.failed[name] = 'timeout' if isinstance(e, requests.Timeout) else str(e)
+                self.stats.add('shard_timeouts' if isinstance(e, requests.Timeout) else 'shard_errors')
+
+        for qi in range(len(queries)):
+            candidates = (result for shard_results in per_shard for result in shard_results[qi])
+            top = heapq.nlargest(k, candidates, key=lambda r: r.score)
+            gathered.results.append([SearchResult(chunk=r.chunk, score=r.score, rank=rank,
+                                                  dense_score=r.dense_score, lexical_score=r.lexical_score)
+                                     for rank, r in enumerate(top)])
+        gathered.responded.sort()
+        self.stats.add('searches', len(queries))
+        if gathered.partial:
+            self.stats.add('partial_searches', len(queries))
+            logger.warning(f"⚠️ Partial results: missing shards {gathered.failed}")
+        return gathered
+
+    def search_many(self, queries: List[str], k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Scatter-gather search returning only the merged results"""
+        return self.scatter(queries, k, filters).results
+
+    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search all nodes for one query (same signature as FAISSVectorStore.search)"""
+        if filter_type:
+            filters = {**(filters or {}), 'chunk_type': filter_type}
+        return self.search_many([query], k=k, filters=filters)[0]
+
+    def health(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Health of every node ('unreachable' with the error for nodes that do not answer)"""
+        timeout = self.timeout if timeout is None else timeout
+
+        def check(name: str) -> Dict[str, Any]:
+            try:
+                response = self._session.get(f"{self.nodes[name]}/health", timeout=timeout)
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                return {'shard': name, 'status': 'unreachable', 'error': str(e)}
+
+        names = sorted(self.nodes)
+        return dict(zip(names, self._executor.map(check, names)))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Fan-out counters and node list"""
+        return {'nodes': dict(self.nodes), 'timeout': self.timeout, **self.stats.snapshot()}
+
+    def close(self):
+        """Shut down the fan-out thread pool"""
+        self._executor.shutdown(wait=False)
+        self._session.close()
@@ -0,0 +1,144 @@
+"""
+🛰️ Shard Server
+==============
+HTTP serving mode for one FAISSVectorStore shard in a multi-node deployment.
+
+Each node holds the documents that the consistent-hash ring (see
+shard_coordinator.py) assigns to it and answers search requests for them.
+The coordinator in the backend fans queries out to every node and merges
+their top-k. Nodes share nothing but the embedding model name, so a node can
+be restarted, moved or provisioned from an exported snapshot independently.
+
+Endpoints:
+    GET  /health      shard name, chunk/document counts, state generation
+    POST /search      {"queries": [...], "k": 10, "filters": {...}} -> per-query results
+    POST /documents   {"pdf_analysis": {...}} -> index one document and schedule a save
+    GET  /documents   sources held by this shard
+
+Usage:
+    python scripts/shard_server.py --name node1 --port 8101
+    python scripts/shard_server.py --name node2 --port 8102 --vector-store-path /data/node2
+
+Features:
+- FAISSVectorStore.search_many over HTTP (batched encode, result cache)
+- Synchronous endpoints run in the server's thread pool; searches are lock-free
+- Background snapshot flushing after ingestion
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+try:
+    from .faiss_vector_store import FAISSVectorStore
+    from .embedding_cache import DEFAULT_CACHE_PATH
+    from .document_chunks import document_source, result_to_dict
+except ImportError:
+    from faiss_vector_store import FAISSVectorStore
+    from embedding_cache import DEFAULT_CACHE_PATH
+    from document_chunks import document_source, result_to_dict
+
+logger = logging.getLogger(__name__)
+
+class SearchRequest(BaseModel):
+    queries: List[str]
+    k: int = 10
+    filters: Optional[Dict[str, Any]] = None
+
+class DocumentRequest(BaseModel):
+    pdf_analysis: Dict[str, Any]
+
+def create_shard_app(store: FAISSVectorStore, name: str) -> FastAPI:
+    """
+    HTTP application serving one shard
+
+    Args:
+        store: Loaded vector store holding this shard's documents
+        name: Shard name reported to the coordinator
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title=f"Vector Store Shard {name}", version="1.0.0")
+
+    @app.get("/health")
+    def health():
+        chunks = store.chunks
+        return {
+            "shard": name,
+            "status": "healthy",
+            "total_chunks": len(chunks),
+            "documents": len({chunk.source for chunk in chunks}),
+            "generation": store.index_generation
+        }
+
+    @app.post("/search")
+    def search(request: SearchRequest):
+        start_time = time.time()
+        try:
+            results = store.search_many(request.queries, k=request.k, filters=request.filters)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+        return {
+            "shard": name,
+            "generation": store.index_generation,
+            "results": [[result_to_dict(result) for result in query_results] for query_results in results],
+            "search_time": time.time() - start_time
+        }
+
+    @app.post("/documents")
+    def add_document(request: DocumentRequest):
+        try:
+            store.add_pdf_content(request.pdf_analysis)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Ingestion error: {str(e)}")
+        store.schedule_save()
+        return {
+            "shard": name,
+            "source": document_source(request.pdf_analysis),
+            "total_chunks": store.total_vectors
+        }
+
+    @app.get("/documents")
+    def list_documents():
+        return sorted({chunk.source for chunk in store.chunks})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one vector store shard over HTTP")
+    parser.add_argument("--name", required=True, help="Shard name (as listed in the coordinator's nodes)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--vector-store-path", help="Shard directory (default: vector_store_shards/<name>)")
+    parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    parser.add_argument("--index-type", default="flat", help="FAISS index type of the shard")
+    parser.add_argument("--encoder-backend", default="torch", help="Embedding backend ('torch', 'int8', 'onnx')")
+    parser.add_argument("--embedding-cache-path", default=str(DEFAULT_CACHE_PATH),
+                        help="Embedding cache file (give each process on one host its own)")
+    parser.add_argument("--flush-interval", type=float, default=30.0, help="Seconds between background saves")
+    args = parser.parse_args()
+
+    vector_store_path = Path(args.vector_store_path or f"vector_store_shards/{args.name}")
+    vector_store_path.mkdir(parents=True, exist_ok=True)
+    store = FAISSVectorStore(model_name=args.model,
+                             index_type=args.index_type,
+                             vector_store_path=str(vector_store_path),
+                             encoder_backend=args.encoder_backend,
+                             embedding_cache_path=args.embedding_cache_path,
+                             flush_interval=args.flush_interval)
+    store.load_vector_store()
+    logger.info(f"🛰️ Shard '{args.name}' serving {store.total_vectors} chunks on {args.host}:{args.port}")
+    try:
+        uvicorn.run(create_shard_app(store, args.name), host=args.host, port=args.port, log_level="warning")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+🧩 Sharded Vector Store
+======================
+Per-source or per-period FAISS shards with parallel scatter-gather search.
+
+Each shard is an independent FAISSVectorStore with its own index files under
+<vector_store_path>/shards/<shard_name>/, so adding a new daily bulletin only
+touches one shard and a bad document can be dropped by removing its shard.
+Queries are encoded once, searched on every shard in a thread pool (FAISS
+releases the GIL during search) and merged into a global top-k with a heap.
+"""
+
+import heapq
+import json
+import logging
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+try:
+    from .faiss_vector_store import FAISSVectorStore, SearchResult
+    from .document_chunks import document_source
+    from .embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH
+    from .retrieval_cache import LRUCache, normalize_query
+    from .embedding_backends import cache_model_key
+    from .model_registry import acquire_encoder
+except ImportError:
+    from faiss_vector_store import FAISSVectorStore, SearchResult
+    from document_chunks import document_source
+    from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH
+    from retrieval_cache import LRUCache, normalize_query
+    from embedding_backends import cache_model_key
+    from model_registry import acquire_encoder
+
+logger = logging.getLogger(__name__)
+
+_DATE_PATTERN = re.compile(r'(20\d{2})[_-]?(\d{2})[_-]?(\d{2})')
+
+def shard_by_source(pdf_analysis: Dict[str, Any]) -> str:
+    """One shard per source document"""
+    return Path(document_source(pdf_analysis)).stem
+
+def shard_by_month(pdf_analysis: Dict[str, Any]) -> str:
+    """One shard per month, from the bulletin date in the filename or the analysis timestamp"""
+    candidates = [
+        document_source(pdf_analysis),
+        pdf_analysis.get('document_info', {}).get('analysis_timestamp', ''),
+        pdf_analysis.get('processed_at', ''),
+    ]
+    for candidate in candidates:
+        match = _DATE_PATTERN.search(str(candidate))
+        if match:
+            return f"{match.group(1)}-{match.group(2)}"
+    return "undated"
+
+SHARD_KEY_FUNCTIONS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    'source': shard_by_source,
+    'month': shard_by_month,
+}
+
+def _safe_shard_name(name: str) -> str:
+    """Shard name usable as a directory name"""
+    return re.sub(r'[^\w.-]', '_', name) or "shard"
+
+class ShardedVectorStore:
+    """Collection of independent FAISS shards searched in parallel"""
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 vector_store_path: str = "vector_store_sharded",
+                 shard_by: str = "month",
+                 max_workers: int = 8,
+                 embedding_cache_path: Optional[str] = str(DEFAULT_CACHE_PATH),
+                 encoder_backend: str = "torch",
+                 onnx_path: Optional[str] = None,
+                 **store_kwargs):
+        """
+        Initialize sharded vector store
+
+        Args:
+            model_name: Sentence transformer model name (loaded once, shared by all shards)
+            vector_store_path: Root directory; shards live in <root>/shards/<name>
+            shard_by: Shard assignment ('source', 'month')
+            max_workers: Thread pool size for scatter-gather search
+            embedding_cache_path: Shared persistent embedding cache (None disables)
+            encoder_backend: Embedding backend ('torch', 'int8', 'onnx')
+            onnx_path: Exported ONNX model directory for the 'onnx' backend
+            **store_kwargs: Passed to every FAISSVectorStore shard (index_type, rerank, ...)
+        """
+        if shard_by not in SHARD_KEY_FUNCTIONS:
+            raise ValueError(f"Unsupported shard_by: {shard_by}")
+        self.model_name = model_name
+        self.vector_store_path = Path(vector_store_path)
+        (self.vector_store_path / "shards").mkdir(parents=True, exist_ok=True)
+        self.shard_by = shard_by
+        self.shard_key = SHARD_KEY_FUNCTIONS[shard_by]
+        self.store_kwargs = store_kwargs
+        self.encoder_backend = encoder_backend
+
+        self.model = acquire_encoder(model_name, encoder_backend, onnx_path)
+        self.embedding_cache = (EmbeddingCache(cache_model_key(model_name, encoder_backend), embedding_cache_path)
+                                if embedding_cache_path else None)
+        self.query_embedding_cache = LRUCache(store_kwargs.get('query_cache_size', 2048),
+                                              store_kwargs.get('cache_ttl', 3600.0))
+
+        # Shard map is replaced, never mutated, so searches can read it without locking
+        self.shards: Dict[str, FAISSVectorStore] = {}
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-search")
+
+        logger.info(f"🚀 Sharded Vector Store initialized (shard_by={shard_by})")
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.vector_store_path / "shards.json"
+
+    def _shard_path(self, name: str) -> Path:
+        return self.vector_store_path / "shards" / name
+
+    def _new_shard(self, name: str) -> FAISSVectorStore:
+        return FAISSVectorStore(model_name=self.model_name,
+                                vector_store_path=str(self._shard_path(name)),
+                                model=self.model,
+                                embedding_cache=self.embedding_cache,
+                                embedding_cache_path=None,
+                                encoder_backend=self.encoder_backend,
+                                **self.store_kwargs)
+
+    def _write_manifest(self):
+        manifest = {
+            'model_name': self.model_name,
+            'shard_by': self.shard_by,
+            'shards': {name: {'total_chunks': len(shard.chunks)} for name, shard in self.shards.items()}
+        }
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    def add_pdf_content(self, pdf_analysis: Dict[str, Any]) -> str:
+        """
+        Add a document to its shard and persist only that shard
+
+        Args:
+            pdf_analysis: PDF analysis results from hybrid extractor
+
+        Returns:
+            Name of the shard that received the document
+        """
+        name = _safe_shard_name(self.shard_key(pdf_analysis))
+        with self._write_lock:
+            shard = self.shards.get(name)
+            if shard is None:
+                shard = self._new_shard(name)
+                shard.load_vector_store()
+            shard.add_pdf_content(pdf_analysis)
+            shard.save_vector_store()
+            if name not in self.shards:
+                self.shards = {**self.shards, name: shard}
+            self._write_manifest()
+        logger.info(f"✅ Document added to shard '{name}'")
+        return name
+
+    def add_shard(self, name: str, store: Optional[FAISSVectorStore] = None) -> FAISSVectorStore:
+        """
+        Attach a shard, loading it from <root>/shards/<name> unless a store is given
+
+        Args:
+            name: Shard name
+            store: Already built store to attach (saved into the shard directory)
+
+        Returns:
+            The attached shard
+        """
+        name = _safe_shard_name(name)
+        with self._write_lock:
+            if store is None:
+                store = self._new_shard(name)
+                if not store.load_vector_store():
+                    raise ValueError(f"No saved shard found at {self._shard_path(name)}")
+            elif Path(store.vector_store_path) != self._shard_path(name):
+                store.relocate(str(self._shard_path(name)))
+            self.shards = {**self.shards, name: store}
+            self._write_manifest()
+        logger.info(f"➕ Shard attached: {name} ({len(store.chunks)} chunks)")
+        return store
+
+    def remove_shard(self, name: str, delete_files: bool = True):
+        """
+        Detach a shard without touching the others
+
+        Args:
+            name: Shard name
+            delete_files: Also delete the shard's index files
+        """
+        with self._write_lock:
+            if name not in self.shards:
+                raise KeyError(f"Unknown shard: {name}")
+            shard = self.shards[name]
+            self.shards = {n: s for n, s in self.shards.items() if n != name}
+            self._write_manifest()
+        # Stops its flusher and writer first, so no pending save recreates deleted files
+        shard.close()
+        if delete_files:
+            shutil.rmtree(self._shard_path(name), ignore_errors=True)
+        logger.info(f"➖ Shard removed: {name}")
+
+    def load_vector_store(self) -> bool:
+        """Load all shards listed in the manifest"""
+        if not self.manifest_path.exists():
+            logger.warning("⚠️ No shard manifest found")
+            return False
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('model_name') != self.model_name:
+            logger.warning(f"⚠️ Model mismatch: {manifest.get('model_name')} vs {self.model_name}")
+            return False
+
+        shards = {}
+        for name in manifest.get('shards', {}):
+            shard = self._new_shard(name)
+            if shard.load_vector_store():
+                shards[name] = shard
+            else:
+                logger.error(f"❌ Failed to load shard '{name}', skipping")
+        self.shards = shards
+        logger.info(f"✅ Loaded {len(shards)} shards")
+        return bool(shards)
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode queries once for all shards, reusing cached embeddings"""
+        keys = [normalize_query(query) for query in queries]
+        embeddings: List[Optional[np.ndarray]] = [self.query_embedding_cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.model.encode([queries[i] for i in missing],
+                                        convert_to_numpy=True, normalize_embeddings=True)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self.query_embedding_cache.put(keys[i], embedding)
+        return np.vstack(embeddings).astype(np.float32)
+
+    def search_many(self, queries: List[str], k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None,
+                    shard_names: Optional[List[str]] = None) -> List[List[SearchResult]]:
+        """
+        Scatter queries to all shards in parallel and gather the global top-k
+
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filters: Attribute/metadata filters applied inside each shard
+            shard_names: Restrict the search to these shards
+
+        Returns:
+            One list of search results per query
+        """
+        shards = self.shards
+        targets = [shards[n] for n in shard_names if n in shards] if shard_names else list(shards.values())
+        if not queries:
+            return []
+        if not targets:
+            return [[] for _ in queries]
+
+        query_embeddings = self._encode_queries(queries)
+        per_shard = list(self._executor.map(
+            lambda shard: shard.search_embeddings(query_embeddings, k, filters), targets))
+
+        merged = []
+        for qi in range(len(queries)):
+            candidates = (result for shard_results in per_shard for result in shard_results[qi])
+            top = heapq.nlargest(k, candidates, key=lambda r: r.score)
+            merged.append([SearchResult(chunk=r.chunk, score=r.score, rank=rank) for rank, r in enumerate(top)])
+        return merged
+
+    def search(self, query: str, k: int = 10, filter_type: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search all shards for one query (same signature as FAISSVectorStore.search)"""
+        if filter_type:
+            filters = {**(filters or {}), 'chunk_type': filter_type}
+        return self.search_many([query], k=k, filters=filters)[0]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get per-shard and total statistics"""
+        shards = self.shards
+        return {
+            'total_chunks': sum(len(s.chunks) for s in shards.values()),
+            'shard_by': self.shard_by,
+            'shards': {name: {'total_chunks': len(s.chunks), 'total_vectors': s.total_vectors}
+                       for name, s in shards.items()},
+            'query_embedding_cache': self.query_embedding_cache.get_stats(),
+            'embedding_cache': self.embedding_cache.get_stats() if self.embedding_cache else None
+        }
+
+    def close(self):
+        """Close every shard (flushing pending saves), then shut down the search thread pool"""
+        for shard in self.shards.values():
+            shard.close()
+        self._executor.shutdown(wait=True)
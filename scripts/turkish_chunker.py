@@ -0,0 +1,228 @@
+"""
+✂️ Turkish Chunker
+=================
+Streaming Turkish sentence segmentation and tokenizer-aware chunking.
+
+Chunks are sized with the embedding model's own tokenizer so that no chunk
+exceeds the model's max sequence length (128 tokens for multilingual mpnet)
+and nothing is silently truncated during embedding.
+
+Features:
+- Streaming sentence segmenter (text can arrive page by page or block by block)
+- Turkish abbreviations ("vb.", "Doç.", "A.Ş.") and ordinals ("3. çeyrek") do not end sentences
+- Numbers like "1.234,5" and "%2,5" are never split
+- Sentence packing with token-budgeted overlap; over-long sentences are split on words
+- Exact per-chunk token counts for later context packing
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lowercased, without the trailing period
+TURKISH_ABBREVIATIONS = frozenset({
+    'vb', 'vs', 'vd', 'bkz', 'örn', 'krş', 'bk', 'yy', 'çev', 'haz', 'ed', 'bşk', 'gn', 'gnl',
+    'dr', 'prof', 'doç', 'yrd', 'öğr', 'gör', 'av', 'müh', 'sn', 'hz', 'alb', 'org',
+    'no', 'nr', 'tel', 'faks', 'fax', 'mah', 'cad', 'sok', 'sk', 'apt', 'blv', 'mh',
+    'a.ş', 'ltd', 'şti', 'inc', 'corp', 'co', 'tic', 'san', 'ort', 'yak', 'maks', 'min',
+    'oca', 'şub', 'nis', 'ağu', 'eyl',
+    'mn', 'mlr', 'mly', 'st', 'sf', 'bl', 'md', 'tbl', 'şkl',
+})
+
+# Sentence-final punctuation, optional closing quotes/brackets, then whitespace
+_BOUNDARY_PATTERN = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)')
+_NEXT_START_PATTERN = re.compile(r'\s+(["\'“‘(\[]*)(\S)')
+_WORD_BEFORE_PATTERN = re.compile(r'(\S+)$')
+
+# Multilingual mpnet pads every input with <s> ... </s>
+SPECIAL_TOKENS_PER_INPUT = 2
+# Used when no tokenizer is available; XLM-R averages well above 3 characters per token on Turkish
+APPROX_CHARS_PER_TOKEN = 3
+
+def _turkish_lower(text: str) -> str:
+    return text.replace('İ', 'i').replace('I', 'ı').lower()
+
+def _is_sentence_end(text: str, boundary: re.Match) -> bool:
+    """Decide whether the punctuation at `boundary` really ends a sentence"""
+    punctuation = boundary.group(0)
+    if punctuation[0] != '.' or len(punctuation.rstrip('"\'”’)]')) > 1:
+        return True  # "!", "?", "..." always end a sentence
+
+    word_match = _WORD_BEFORE_PATTERN.search(text, 0, boundary.start())
+    word = word_match.group(1) if word_match else ''
+    word = word.lstrip('("\'“‘[')
+    lowered = _turkish_lower(word)
+    if lowered in TURKISH_ABBREVIATIONS:
+        return False
+    # Initials and dotted abbreviations: "M.", "A.Ş", "T.C"
+    if re.fullmatch(r'(?:\w\.)*\w', word) and len(word.replace('.', '')) <= 3 and word[-1:].isalpha():
+        if len(word) == 1 or '.' in word:
+            return False
+
+    next_match = _NEXT_START_PATTERN.match(text, boundary.end())
+    if next_match is None:
+        return True
+    next_char = next_match.group(2)
+    # Ordinals and lowercase continuations: "3. çeyrek", "2024. yılın"
+    if next_char.islower():
+        return False
+    return True
+
+def split_sentences(text: str) -> List[str]:
+    """Split a complete text into sentences"""
+    return list(iter_sentences([text]))
+
+def iter_sentences(pieces: Iterable[str], break_between_pieces: bool = True) -> Iterator[str]:
+    """
+    Stream sentences out of text pieces
+
+    Args:
+        pieces: Text pieces (paragraphs, pages or arbitrary blocks of a stream)
+        break_between_pieces: Treat the end of every piece as a sentence boundary
+            (paragraphs); disable for blocks cut at arbitrary positions
+
+    Yields:
+        Sentences with normalized whitespace
+    """
+    buffer = ''
+    for piece in pieces:
+        if not piece:
+            continue
+        buffer += piece
+        start = 0
+        for boundary in _BOUNDARY_PATTERN.finditer(buffer):
+            # The boundary needs a look at the next sentence's first character
+            if _NEXT_START_PATTERN.match(buffer, boundary.end()) is None and not break_between_pieces:
+                break
+            if _is_sentence_end(buffer, boundary):
+                sentence = ' '.join(buffer[start:boundary.end()].split())
+                if sentence:
+                    yield sentence
+                start = boundary.end()
+        buffer = buffer[start:]
+        if break_between_pieces:
+            sentence = ' '.join(buffer.split())
+            if sentence:
+                yield sentence
+            buffer = ''
+    sentence = ' '.join(buffer.split())
+    if sentence:
+        yield sentence
+
+@dataclass
+class TextChunk:
+    """Chunk text with its exact token count (without special tokens)"""
+    text: str
+    token_count: int
+
+class TokenAwareChunker:
+    """Packs sentences into chunks that fit the embedding model's sequence length"""
+
+    def __init__(self, tokenizer: Optional[Any] = None, max_tokens: int = 126, overlap_tokens: int = 16):
+        """
+        Initialize chunker
+
+        Args:
+            tokenizer: Hugging Face tokenizer of the embedding model (None = character estimate)
+            max_tokens: Token budget per chunk, excluding special tokens
+            overlap_tokens: Token budget of trailing sentences repeated at the start of the next chunk
+        """
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        if tokenizer is None:
+            logger.warning("⚠️ No tokenizer available, estimating token counts from characters")
+
+    @classmethod
+    def from_model(cls, model: Any, overlap_tokens: int = 16) -> "TokenAwareChunker":
+        """Chunker sized for a loaded SentenceTransformer (uses its tokenizer and max_seq_length)"""
+        max_seq_length = getattr(model, 'max_seq_length', None) or 128
+        return cls(tokenizer=getattr(model, 'tokenizer', None),
+                   max_tokens=max_seq_length - SPECIAL_TOKENS_PER_INPUT,
+                   overlap_tokens=overlap_tokens)
+
+    @classmethod
+    def from_pretrained(cls, model_name: str, max_seq_length: int = 128,
+                        overlap_tokens: int = 16) -> "TokenAwareChunker":
+        """Chunker that loads only the tokenizer of a model (no weights)"""
+        tokenizer = None
+        try:
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load tokenizer for {model_name}: {e}")
+        return cls(tokenizer=tokenizer, max_tokens=max_seq_length - SPECIAL_TOKENS_PER_INPUT,
+                   overlap_tokens=overlap_tokens)
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts (without special tokens) for a batch of texts"""
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            return [math.ceil(len(text) / APPROX_CHARS_PER_TOKEN) for text in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=False)['input_ids']
+        return [len(ids) for ids in encoded]
+
+    def _split_long_sentence(self, sentence: str) -> List[TextChunk]:
+        """Split a sentence longer than the budget on word boundaries"""
+        words = sentence.split()
+        counts = self.count_tokens(words)
+        pieces, current, current_tokens = [], [], 0
+        for word, count in zip(words, counts):
+            if current and current_tokens + count > self.max_tokens:
+                pieces.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += count
+        if current:
+            pieces.append(' '.join(current))
+        return [TextChunk(text, count) for text, count in zip(pieces, self.count_tokens(pieces))]
+
+    def chunk_stream(self, pieces: Iterable[str], break_between_pieces: bool = True) -> Iterator[TextChunk]:
+        """
+        Stream chunks out of text pieces
+
+        Args:
+            pieces: Text pieces (see iter_sentences)
+            break_between_pieces: Treat the end of every piece as a sentence boundary
+
+        Yields:
+            Chunks of whole sentences within max_tokens, with exact token counts
+        """
+        window: List[TextChunk] = []  # sentences of the chunk being built
+        window_tokens = 0
+
+        def emit() -> TextChunk:
+            text = ' '.join(s.text for s in window)
+            return TextChunk(text, self.count_tokens([text])[0])
+
+        for sentence in iter_sentences(pieces, break_between_pieces):
+            token_count = self.count_tokens([sentence])[0]
+            parts = ([TextChunk(sentence, token_count)] if token_count <= self.max_tokens
+                     else self._split_long_sentence(sentence))
+            for part in parts:
+                if window and window_tokens + part.token_count > self.max_tokens:
+                    yield emit()
+                    # Carry trailing sentences into the next chunk within the overlap budget
+                    carried, carried_tokens = [], 0
+                    for previous in reversed(window):
+                        if carried_tokens + previous.token_count > self.overlap_tokens or \
+                                carried_tokens + previous.token_count + part.token_count > self.max_tokens:
+                            break
+                        carried.insert(0, previous)
+                        carried_tokens += previous.token_count
+                    window, window_tokens = carried, carried_tokens
+                window.append(part)
+                window_tokens += part.token_count
+        if window:
+            yield emit()
+
+    def chunk_text(self, text: str) -> List[TextChunk]:
+        """Chunk a single text"""
+        return list(self.chunk_stream([text]))
@@ -0,0 +1,292 @@
+"""
+🔒 Vector Store Concurrency
+==========================
+Concurrency model of FAISSVectorStore: lock-free reads over immutable state
+snapshots, and one writer thread that applies every mutation.
+
+Readers
+    A search reads `store._state` once and uses only that `StoreState` until it
+    returns. Nothing a state references is ever modified in a way its readers
+    can observe:
+    - `index`, the main FAISS index, is never mutated after publication
+      (except efSearch, a plain search parameter set by set_ef_search)
+    - `delta` holds vectors added since the last compaction, as small exact
+      flat indexes ("pieces"). A write adds a new piece or publishes merged
+      copies; it never grows a piece that a reader may be scanning.
+    - `chunks`, the float32 re-ranking file and the BM25 index are append-only
+      and shared between states. Each state reads only its first `size`
+      entries (the BM25 index through max_doc), so later appends stay invisible.
+      `vectors` is memory-mapped when the state is published, so a reload
+      that replaces the file does not change what older states read.
+    Publishing a state is one attribute assignment, so readers never wait for
+    ingestion and read throughput scales with the threads FAISS can use.
+
+Writer
+    All mutations are submitted to a `SingleWriter` queue and applied by its
+    thread. Callers encode their chunks first and then block on a future.
+    Jobs that queue up while a batch is applied are folded into the next
+    batch and published as one state. Once the delta outgrows its limit,
+    the writer copies the main index (clone_index), adds the delta to
+    the copy and publishes it. The copy cost is therefore amortized over
+    many added vectors.
+
+Counters
+    Statistics updated from reader threads use `AtomicCounters`.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (global position of the piece's first vector, exact flat index)
+DeltaPiece = Tuple[int, Any]
+
+class AtomicCounters:
+    """Named numeric counters safe to update from many threads"""
+
+    def __init__(self, initial: Optional[Dict[str, float]] = None):
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = dict(initial or {})
+
+    def add(self, name: str, value: float = 1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def update(self, values: Dict[str, float]):
+        """Overwrite counters (e.g. restored from a saved store)"""
+        with self._lock:
+            self._values.update(values)
+
+    def __getitem__(self, name: str) -> float:
+        with self._lock:
+            return self._values[name]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Consistent copy of all counters"""
+        with self._lock:
+            return dict(self._values)
+
+@dataclass(frozen=True)
+class StoreState:
+    """Immutable view of a vector store's searchable contents"""
+    index: Any
+    chunks: List[Any]
+    size: int
+    lexical_index: Any
+    rerank: bool
+    generation: int = 0
+    delta: Tuple[DeltaPiece, ...] = ()
+    vectors: Optional[np.ndarray] = None  # float32 re-ranking vectors (memmap of the first `size`)
+    hierarchy: Any = None  # document/section summaries of hierarchical stores (see hierarchical_index.py)
+
+    @property
+    def delta_size(self) -> int:
+        return sum(piece.ntotal for _, piece in self.delta)
+
+    def delta_vectors(self) -> np.ndarray:
+        """Float32 vectors held in the delta, in position order"""
+        if not self.delta:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([piece.reconstruct_n(0, piece.ntotal) for _, piece in self.delta])
+
+class StoreDraft:
+    """Next state of a store, prepared by the writer thread and never seen by readers"""
+
+    def __init__(self, state: StoreState):
+        self.base = state
+        self.index = state.index
+        self.delta = state.delta
+        self.chunks = state.chunks
+        self.lexical_index = state.lexical_index
+        self.rerank = state.rerank
+        self.hierarchy = state.hierarchy
+        # Entries already in the shared chunk list and re-ranking file
+        self.published_size = state.size
+        self.pending_chunks: List[Any] = []
+        self.pending_embeddings: List[np.ndarray] = []
+        self.chunk_metadata: Optional[Dict[str, Dict[str, Any]]] = None
+        self.changed = False
+
+    @property
+    def size(self) -> int:
+        return self.published_size + len(self.pending_chunks)
+
+    def append(self, chunks: List[Any], embeddings: np.ndarray, merge_factor: int = 2):
+        """Add chunks to the delta; they are written to shared storage at publication"""
+        self.delta = append_delta(self.delta, self.size, embeddings, merge_factor)
+        self.pending_chunks.extend(chunks)
+        self.pending_embeddings.append(embeddings)
+        self.changed = True
+
+    def replace(self, index: Any, delta: Tuple[DeltaPiece, ...], chunks: List[Any], lexical_index: Any,
+                rerank: bool, chunk_metadata: Dict[str, Dict[str, Any]], hierarchy: Any = None):
+        """Swap in entirely new contents (e.g. a loaded snapshot), dropping pending additions"""
+        self.index, self.delta, self.chunks = index, delta, chunks
+        self.lexical_index, self.rerank, self.hierarchy = lexical_index, rerank, hierarchy
+        self.published_size = len(chunks)
+        self.pending_chunks, self.pending_embeddings = [], []
+        self.chunk_metadata = chunk_metadata
+        self.changed = True
+
+def _copy_transform(transform: Any) -> Any:
+    """Deep copy of a VectorTransform through serialization"""
+    writer = faiss.VectorIOWriter()
+    faiss.write_VectorTransform(transform, writer)
+    reader = faiss.VectorIOReader()
+    reader.data = writer.data
+    return faiss.read_VectorTransform(reader)
+
+def clone_index(index: Any) -> Any:
+    """Deep copy of a float or binary FAISS index"""
+    if isinstance(index, faiss.IndexBinary):
+        return faiss.clone_binary_index(index)
+    if isinstance(index, faiss.IndexPreTransform):
+        # faiss.clone_index does not support every transform (e.g. the NormalizationTransform of
+        # projected stores): the chain is rebuilt around a clone of the inner index instead.
+        # Serialized transforms come back as trained matrices only (OPQ reads as LinearTransform).
+        if not index.is_trained:
+            raise ValueError("Untrained pre-transform indexes cannot be cloned; build a new one")
+        copy = faiss.IndexPreTransform(clone_index(faiss.downcast_index(index.index)))
+        for i in reversed(range(index.chain.size())):
+            copy.prepend_transform(_copy_transform(index.chain.at(i)))
+        return copy
+    return faiss.clone_index(index)
+
+def _flat_piece(embeddings: np.ndarray) -> Any:
+    piece = faiss.IndexFlatIP(embeddings.shape[1])
+    piece.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+    return piece
+
+def append_delta(delta: Sequence[DeltaPiece], offset: int, embeddings: np.ndarray,
+                 merge_factor: int = 2,
+                 build_piece: Callable[[np.ndarray], Any] = _flat_piece) -> Tuple[DeltaPiece, ...]:
+    """
+    Delta pieces with new vectors appended as a new piece
+
+    Trailing pieces are merged (copied) size-tiered, so the number of pieces
+    stays logarithmic and each vector is copied O(log n) times. Pieces already
+    published are never modified.
+
+    Args:
+        delta: Current pieces
+        offset: Global position of the first new vector
+        embeddings: New float32 vectors
+        merge_factor: Merge the last two pieces until the earlier one is this many times larger
+        build_piece: Index factory for new and merged pieces (default: exact flat)
+
+    Returns:
+        New tuple of pieces
+    """
+    pieces = list(delta) + [(offset, build_piece(embeddings))]
+    while len(pieces) >= 2 and pieces[-2][1].ntotal < merge_factor * pieces[-1][1].ntotal:
+        (start, earlier), (_, later) = pieces[-2], pieces[-1]
+        merged = np.vstack([earlier.reconstruct_n(0, earlier.ntotal), later.reconstruct_n(0, later.ntotal)])
+        pieces[-2:] = [(start, build_piece(merged))]
+    return tuple(pieces)
+
+def merge_top_k(parts: Sequence[Tuple[np.ndarray, np.ndarray]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge per-part (scores, ids) results into one best-first top-k (ids of -1 are empty slots)"""
+    if len(parts) == 1:
+        return parts[0]
+    scores = np.hstack([part[0] for part in parts])
+    ids = np.hstack([part[1] for part in parts])
+    scores = np.where(ids >= 0, scores, -np.inf)
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+@dataclass
+class _Job:
+    apply: Callable[[Any], Any]
+    future: Future = field(default_factory=Future)
+
+class SingleWriter:
+    """
+    One thread applying queued mutations in batches
+
+    `begin()` returns a draft of the next state, every job of a batch is applied
+    to it, and `publish(draft)` makes the result visible. A job that raises
+    fails only its own future and must leave the draft unchanged; if publish
+    raises, the whole batch fails.
+    """
+
+    def __init__(self, begin: Callable[[], Any], publish: Callable[[Any], None],
+                 name: str = "vector-store-writer", max_batch: int = 64):
+        self._begin = begin
+        self._publish = publish
+        self._name = name
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = AtomicCounters({'jobs': 0, 'batches': 0, 'failed_jobs': 0})
+
+    def submit(self, apply: Callable[[Any], Any]) -> Future:
+        """Queue a mutation; its future resolves once the resulting state is published"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Writer jobs cannot submit further jobs")
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+        job = _Job(apply)
+        self._queue.put(job)
+        return job.future
+
+    def run(self, apply: Callable[[Any], Any]) -> Any:
+        """Submit a mutation and wait for it to be published"""
+        return self.submit(apply).result()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            # Coalesce whatever queued up meanwhile into the same published state
+            while len(batch) < self.max_batch:
+                try:
+                    queued = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is None:
+                    self._queue.put(None)
+                    break
+                batch.append(queued)
+            self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[_Job]):
+        results = []
+        try:
+            draft = self._begin()
+            for job in batch:
+                try:
+                    results.append((job, job.apply(draft)))
+                except BaseException as e:
+                    self.stats.add('failed_jobs')
+                    job.future.set_exception(e)
+            self._publish(draft)
+        except BaseException as e:
+            logger.error(f"❌ Vector store write batch failed: {e}")
+            for job, _ in results:
+                job.future.set_exception(e)
+            return
+        self.stats.add('jobs', len(batch))
+        self.stats.add('batches')
+        for job, result in results:
+            job.future.set_result(result)
+
+    def close(self):
+        """Finish queued jobs and stop the writer thread"""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
@@ -0,0 +1,348 @@
+"""
+📸 Vector Store Snapshots
+========================
+Atomic, versioned on-disk snapshots for FAISSVectorStore.
+
+Layout under the vector store path:
+    snapshots/v000001/   faiss_index.bin, chunks.pkl, metadata.json, config.json, manifest.json
+    snapshots/v000002/   ...
+    CURRENT              name of the live snapshot
+
+A snapshot is written into a temporary directory, checksummed, fsynced and
+renamed into place; only then is CURRENT swapped with os.replace. Readers
+therefore always see either the previous or the new complete snapshot.
+
+Features:
+- Versioned snapshot directories with a sha256 manifest
+- Atomic CURRENT pointer swap and pruning of old versions
+- Rate-limited background flushing that coalesces bursts of writes
+- Single-file (.tar.gz) export/import for provisioning serving nodes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+POINTER_NAME = "CURRENT"
+SNAPSHOT_PREFIX = "v"
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, incomplete or fails verification"""
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hex sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _fsync_path(path: Path):
+    """fsync a file or directory (directories are skipped where unsupported)"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class SnapshotManager:
+    """Writes, publishes, verifies and prunes versioned snapshots"""
+
+    def __init__(self, root: Union[str, Path], keep: int = 3):
+        """
+        Initialize snapshot manager
+
+        Args:
+            root: Vector store directory
+            keep: Number of most recent snapshots to keep (the live one is always kept)
+        """
+        self.root = Path(root)
+        self.snapshots_dir = self.root / "snapshots"
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+
+    @property
+    def pointer_path(self) -> Path:
+        return self.root / POINTER_NAME
+
+    def list_versions(self) -> List[str]:
+        """Published snapshot versions, oldest first"""
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(p.name for p in self.snapshots_dir.iterdir()
+                      if p.is_dir() and p.name.startswith(SNAPSHOT_PREFIX) and (p / MANIFEST_NAME).exists())
+
+    def current_version(self) -> Optional[str]:
+        """Version named by the CURRENT pointer"""
+        try:
+            version = self.pointer_path.read_text(encoding='utf-8').strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def current_dir(self) -> Optional[Path]:
+        """Directory of the live snapshot, or None when no snapshot has been published"""
+        version = self.current_version()
+        return self.snapshots_dir / version if version else None
+
+    def _next_version(self) -> str:
+        versions = self.list_versions()
+        last = int(versions[-1][len(SNAPSHOT_PREFIX):]) if versions else 0
+        return f"{SNAPSHOT_PREFIX}{last + 1:06d}"
+
+    def _write_manifest(self, directory: Path, version: str, extra: Optional[Dict[str, Any]] = None):
+        files = {}
+        for path in sorted(directory.iterdir()):
+            if path.is_file() and path.name != MANIFEST_NAME:
+                files[path.name] = {'sha256': file_sha256(path), 'bytes': path.stat().st_size}
+                _fsync_path(path)
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'files': files,
+            **(extra or {})
+        }
+        with open(directory / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _publish(self, version: str):
+        """Atomically point CURRENT at a snapshot"""
+        tmp_pointer = self.root / f".{POINTER_NAME}.tmp"
+        with open(tmp_pointer, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, self.pointer_path)
+        _fsync_path(self.root)
+
+    def write_snapshot(self, write_fn: Callable[[Path], None],
+                       manifest_extra: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write and publish a new snapshot
+
+        Args:
+            write_fn: Writes the snapshot files into the directory it is given
+            manifest_extra: Additional manifest fields (e.g. total_chunks)
+
+        Returns:
+            Published version name
+        """
+        with self._lock:
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+            version = self._next_version()
+            staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=self.snapshots_dir))
+            try:
+                write_fn(staging)
+                self._write_manifest(staging, version, manifest_extra)
+                final_dir = self.snapshots_dir / version
+                os.rename(staging, final_dir)
+                _fsync_path(self.snapshots_dir)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            self._publish(version)
+            self._prune()
+        logger.info(f"📸 Snapshot published: {version}")
+        return version
+
+    def read_manifest(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """Manifest of a snapshot (default: the live one)"""
+        version = version or self.current_version()
+        if not version:
+            raise SnapshotError("No snapshot has been published")
+        manifest_path = self.snapshots_dir / version / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise SnapshotError(f"Snapshot {version} has no manifest")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def verify(self, version: Optional[str] = None, directory: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Check every file of a snapshot against its manifest checksums
+
+        Returns:
+            The verified manifest
+
+        Raises:
+            SnapshotError: If a file is missing or its checksum does not match
+        """
+        if directory is None:
+            manifest = self.read_manifest(version)
+            directory = self.snapshots_dir / manifest['version']
+        else:
+            with open(directory / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        for name, entry in manifest.get('files', {}).items():
+            path = directory / name
+            if not path.exists():
+                raise SnapshotError(f"Snapshot {manifest['version']} is missing {name}")
+            if path.stat().st_size != entry['bytes'] or file_sha256(path) != entry['sha256']:
+                raise SnapshotError(f"Snapshot {manifest['version']} has a corrupt {name}")
+        return manifest
+
+    def _prune(self):
+        """Delete old snapshots beyond `keep`, never the live one"""
+        current = self.current_version()
+        versions = self.list_versions()
+        for version in versions[:-self.keep]:
+            if version != current:
+                shutil.rmtree(self.snapshots_dir / version, ignore_errors=True)
+                logger.info(f"🧹 Pruned snapshot {version}")
+        # Staging directories left behind by a crash mid-write
+        for leftover in self.snapshots_dir.glob(f".{SNAPSHOT_PREFIX}*"):
+            if leftover.is_dir() and time.time() - leftover.stat().st_mtime > 3600:
+                shutil.rmtree(leftover, ignore_errors=True)
+
+    def export_snapshot(self, archive_path: Union[str, Path], version: Optional[str] = None) -> Path:
+        """
+        Export a snapshot as a single .tar.gz file
+
+        Args:
+            archive_path: Destination archive
+            version: Snapshot to export (default: the live one)
+
+        Returns:
+            Archive path
+        """
+        manifest = self.verify(version)
+        archive_path = Path(archive_path)
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+        with tarfile.open(tmp_path, 'w:gz') as tar:
+            tar.add(self.snapshots_dir / manifest['version'], arcname=manifest['version'])
+        os.replace(tmp_path, archive_path)
+        logger.info(f"📦 Snapshot {manifest['version']} exported to {archive_path}")
+        return archive_path
+
+    def import_snapshot(self, archive_path: Union[str, Path]) -> str:
+        """
+        Import an exported snapshot as a new version and publish it
+
+        Args:
+            archive_path: Archive created by export_snapshot
+
+        Returns:
+            Published version name
+
+        Raises:
+            SnapshotError: If the archive is malformed or fails verification
+        """
+        with self._lock:
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=f".{SNAPSHOT_PREFIX}import-", dir=self.snapshots_dir))
+            try:
+                with tarfile.open(archive_path, 'r:gz') as tar:
+                    members = tar.getmembers()
+                    for member in members:
+                        parts = Path(member.name).parts
+                        if member.name.startswith('/') or '..' in parts or len(parts) > 2 or \
+                                not (member.isfile() or member.isdir()):
+                            raise SnapshotError(f"Unsafe archive member: {member.name}")
+                    tar.extractall(staging, members=members)
+                extracted = [p for p in staging.iterdir() if p.is_dir()]
+                if len(extracted) != 1 or not (extracted[0] / MANIFEST_NAME).exists():
+                    raise SnapshotError("Archive does not contain exactly one snapshot")
+                source_version = self.verify(directory=extracted[0])['version']
+
+                # Imported snapshots get the next local version number
+                version = self._next_version()
+                with open(extracted[0] / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                manifest.update({'version': version, 'imported_from': source_version})
+                with open(extracted[0] / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, ensure_ascii=False, indent=2)
+                os.rename(extracted[0], self.snapshots_dir / version)
+                _fsync_path(self.snapshots_dir)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            self._publish(version)
+            self._prune()
+        logger.info(f"📥 Snapshot {source_version} imported as {version}")
+        return version
+
+class BackgroundFlusher:
+    """Runs a flush function in a background thread, at most once per interval"""
+
+    def __init__(self, flush_fn: Callable[[], Any], min_interval: float = 30.0, name: str = "snapshot-flush"):
+        """
+        Initialize flusher
+
+        Args:
+            flush_fn: Function that persists the current state
+            min_interval: Minimum seconds between two flushes; requests in between are coalesced
+            name: Worker thread name
+        """
+        self.flush_fn = flush_fn
+        self.min_interval = min_interval
+        self._dirty = False
+        self._closed = False
+        self._last_flush = 0.0
+        self._condition = threading.Condition()
+        self.stats = {'requests': 0, 'flushes': 0, 'errors': 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Mark state as dirty; a flush happens within min_interval"""
+        with self._condition:
+            self._dirty = True
+            self.stats['requests'] += 1
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._dirty:
+                    return
+                # Rate limit: wait out the rest of the interval, collecting more requests
+                remaining = self._last_flush + self.min_interval - time.monotonic()
+                while remaining > 0 and not self._closed:
+                    self._condition.wait(remaining)
+                    remaining = self._last_flush + self.min_interval - time.monotonic()
+                self._dirty = False
+            self._flush()
+
+    def _flush(self):
+        try:
+            self.flush_fn()
+            self.stats['flushes'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Background flush failed: {e}")
+        finally:
+            self._last_flush = time.monotonic()
+
+    def close(self, flush: bool = True):
+        """
+        Stop the worker thread
+
+        Args:
+            flush: Flush pending changes before returning
+        """
+        with self._condition:
+            if not flush:
+                self._dirty = False
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()